@@ -0,0 +1,123 @@
+"""
+Load-test the API in process, without a server or network.
+
+Seeds a SQLite database with synthetic Pokemon (reused between runs when
+the row count matches) and drives each scenario through an ASGI client
+with a fixed number of concurrent clients:
+
+- list: ``/api/pokemon`` pages 1-10
+- deep_offset: OFFSET pages in the last tenth of the table
+- deep_keyset: the same depth through ``after`` cursors
+- by_id: ``/api/pokemon/{id}`` for random IDs
+
+Reports requests/s and p50/p95/p99 latency per scenario, and writes them
+to ``--output`` for ``compare.py``.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_api.py --rows 100000 --concurrency 32 --output api.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from common import Timer, latency_summary, seed_database, write_results
+
+SCENARIOS = ('list', 'deep_offset', 'deep_keyset', 'by_id')
+
+
+def scenario_urls(scenario, rows, limit, count, rng):
+    from palmon.api.pagination import encode_cursor
+
+    pages = max(1, rows // limit)
+    deep = max(1, pages - pages // 10)
+    for _ in range(count):
+        if scenario == 'list':
+            yield f"/api/pokemon?page={rng.randint(1, min(10, pages))}&limit={limit}"
+        elif scenario == 'deep_offset':
+            yield f"/api/pokemon?page={rng.randint(deep, pages)}&limit={limit}"
+        elif scenario == 'deep_keyset':
+            after = (rng.randint(deep, pages) - 1) * limit
+            yield f"/api/pokemon?after={encode_cursor(after)}&limit={limit}"
+        else:
+            yield f"/api/pokemon/{rng.randint(1, rows)}"
+
+
+async def run_scenario(client, urls, concurrency):
+    """Send ``urls`` from ``concurrency`` clients; returns (latencies, errors, elapsed)."""
+    urls = iter(urls)
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        loop = asyncio.get_running_loop()
+        for url in urls:
+            started = loop.time()
+            response = await client.get(url)
+            latencies.append(loop.time() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    with Timer() as timer:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, timer.elapsed
+
+
+async def main(args):
+    import httpx
+    from palmon.api.app import app
+
+    with Timer() as seeding:
+        seeded = await seed_database(args.rows)
+    if seeded:
+        print(f"seeded {args.rows} rows in {seeding.elapsed:.1f}s")
+
+    rng = random.Random(args.seed)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in args.scenarios:
+                warmup = scenario_urls(scenario, args.rows, args.limit, args.warmup, rng)
+                await run_scenario(client, warmup, args.concurrency)
+
+                urls = scenario_urls(scenario, args.rows, args.limit, args.requests, rng)
+                latencies, errors, elapsed = await run_scenario(client, urls, args.concurrency)
+                results[scenario] = summary = latency_summary(latencies, elapsed, errors)
+                print(
+                    f"{scenario:12} {summary['rps']:9.1f} req/s  "
+                    f"p50 {summary['p50_ms']:7.2f} ms  p95 {summary['p95_ms']:7.2f} ms  "
+                    f"p99 {summary['p99_ms']:7.2f} ms  errors {errors}"
+                )
+
+    if args.output:
+        params = {key: value for key, value in vars(args).items() if key not in ('output', 'db')}
+        write_results(args.output, 'api', params, results)
+        print(f"wrote {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000, help="Pokemon to seed (1K to 1M)")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per scenario")
+    parser.add_argument('--warmup', type=int, default=200, help="Untimed requests per scenario")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--limit', type=int, default=20, help="Page size of the list scenarios")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--mode', choices=('database', 'snapshot'), default='database')
+    parser.add_argument('--cache', action='store_true', help="Keep the response cache enabled")
+    parser.add_argument('--db', help="SQLite file to seed and reuse (default: a temporary file)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the request mix")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    # palmon reads its configuration when first imported
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='palmon-bench-'), 'pokemon.db')
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['POKEMON_API_MODE'] = args.mode
+    if not args.cache:
+        os.environ['POKEMON_API_CACHE_SIZE'] = '0'
+    sys.exit(0 if asyncio.run(main(args)) else 1)
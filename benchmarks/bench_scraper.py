@@ -0,0 +1,167 @@
+"""
+Benchmark scrape_pokemon against a mock PokeAPI, offline.
+
+The mock (respx) answers ``/pokemon/{id}`` with synthetic payloads, which
+link stats, abilities, moves and a species like PokeAPI's, and the
+``/ability/``, ``/move/`` and ``/pokemon-species/`` resources they point
+at. Every response comes after an injected latency; a share of requests
+fails with 503 and another share is throttled with 429. It sends ETags,
+so the second scenario measures a re-run that is answered with 304s:
+
+- cold: empty database, every payload is fetched and written
+- revalidate: the same IDs again, with the validators from the cold run
+
+Reports Pokemon/s, upstream requests per resource kind, how many
+references the scheduler deduplicated, and the scraper's retry and
+failure counts, and writes them to ``--output`` for ``compare.py``.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_scraper.py --pokemon 2000 --latency 50 --error-rate 0.02 --output scraper.json
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+from common import Timer, fake_payload, fake_resource, latency_summary, write_results
+
+SCENARIOS = ('cold', 'revalidate')
+
+
+class MockPokeAPI:
+    """Request handler for respx with latency and failure injection."""
+
+    def __init__(self, latency, jitter, error_rate, throttle_rate, moves=60, seed=0):
+        self.latency = latency
+        self.moves = moves
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.requests_by_kind = {}
+        self.statuses = {}
+        self.latencies = []
+
+    async def __call__(self, request, kind, resource_id):
+        import httpx
+
+        self.requests += 1
+        self.requests_by_kind[kind] = self.requests_by_kind.get(kind, 0) + 1
+        delay = max(0.0, self.rng.gauss(self.latency, self.latency * self.jitter))
+        await asyncio.sleep(delay)
+        self.latencies.append(delay)
+
+        roll = self.rng.random()
+        etag = f'"{kind}-{resource_id}"'
+        if roll < self.error_rate:
+            response = httpx.Response(503)
+        elif roll < self.error_rate + self.throttle_rate:
+            response = httpx.Response(429, headers={'Retry-After': '0'})
+        elif request.headers.get('If-None-Match') == etag:
+            response = httpx.Response(304, headers={'ETag': etag})
+        else:
+            if kind == 'pokemon':
+                body = fake_payload(int(resource_id), self.moves)
+            else:
+                body = fake_resource(kind.removeprefix('pokemon-'), int(resource_id))
+            response = httpx.Response(200, json=body, headers={'ETag': etag})
+        self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+        return response
+
+
+async def main(args):
+    import respx
+    from palmon.database.models import AsyncSessionLocal, init_db
+    from palmon.scraper.pokemon_scraper import PokemonScraper
+    from palmon.scraper.retry import RetryPolicy
+
+    await init_db()
+    upstream = MockPokeAPI(
+        args.latency / 1000, args.jitter, args.error_rate, args.throttle_rate, args.moves, args.seed
+    )
+    results = {}
+
+    with respx.mock(assert_all_called=False) as mock:
+        mock.get(
+            url__regex=r"https://pokeapi\.co/api/v2/(?P<kind>pokemon|ability|move|pokemon-species)/(?P<resource_id>\d+)/?$"
+        ).mock(side_effect=upstream)
+        for scenario in SCENARIOS[:args.runs]:
+            upstream.reset()
+            async with AsyncSessionLocal() as session:
+                scraper = PokemonScraper(
+                    session=session,
+                    retry=RetryPolicy(max_retries=args.max_retries, base_delay=args.backoff_base)
+                )
+                with Timer() as timer:
+                    stats = await scraper.scrape_pokemon(
+                        limit=args.pokemon,
+                        concurrency=args.concurrency,
+                        max_concurrency=args.max_concurrency,
+                        batch_size=args.batch_size
+                    )
+
+            upstream_latency = latency_summary(upstream.latencies, timer.elapsed)
+            results[scenario] = summary = {
+                'elapsed_s': round(timer.elapsed, 3),
+                'pokemon_per_second': round(args.pokemon / timer.elapsed, 1),
+                'upstream_requests': upstream.requests,
+                'upstream_requests_by_kind': dict(sorted(upstream.requests_by_kind.items())),
+                'upstream_statuses': {str(status): count for status, count in sorted(upstream.statuses.items())},
+                'upstream_p50_ms': upstream_latency['p50_ms'],
+                'upstream_p99_ms': upstream_latency['p99_ms'],
+                'rows_written': stats.rows_written,
+                'batches': stats.batches,
+                'skipped': stats.skipped,
+                'resolved': stats.resolved,
+                'deduplicated': stats.deduplicated,
+                'retries': stats.retries,
+                'throttled': stats.throttled,
+                'breaker_opened': stats.breaker_opened,
+                'failures': len(stats.failures),
+                'final_concurrency': stats.final_concurrency,
+            }
+            print(
+                f"{scenario:11} {summary['pokemon_per_second']:8.1f} pokemon/s  "
+                f"{summary['elapsed_s']:7.2f}s  {upstream.requests} requests  "
+                f"{stats.resolved} resolved  {stats.deduplicated} deduplicated  "
+                f"{stats.retries} retries  {len(stats.failures)} failed  "
+                f"final concurrency {stats.final_concurrency}"
+            )
+
+    if args.output:
+        params = {key: value for key, value in vars(args).items() if key not in ('output', 'verbose')}
+        write_results(args.output, 'scraper', params, results)
+        print(f"wrote {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pokemon', type=int, default=1000, help="IDs to scrape")
+    parser.add_argument('--latency', type=float, default=50.0, help="Mean upstream latency in ms")
+    parser.add_argument('--jitter', type=float, default=0.5, help="Latency standard deviation, relative to the mean")
+    parser.add_argument('--error-rate', type=float, default=0.02, help="Share of requests failing with 503")
+    parser.add_argument('--throttle-rate', type=float, default=0.01, help="Share of requests answered with 429")
+    parser.add_argument('--moves', type=int, default=60, help="Moves per Pokemon payload")
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--max-concurrency', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--max-retries', type=int, default=3)
+    parser.add_argument('--backoff-base', type=float, default=0.05, help="Retry backoff base in seconds")
+    parser.add_argument('--runs', type=int, choices=(1, 2), default=2, help="1: cold only, 2: cold and revalidate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--verbose', action='store_true', help="Keep the scraper's and httpx's per-request logging")
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='palmon-bench-'), 'pokemon.db')}"
+    if not args.verbose:
+        for name in ('palmon', 'httpx'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+    sys.exit(0 if asyncio.run(main(args)) else 1)
@@ -0,0 +1,81 @@
+"""
+Compare the old ORM read path of the list endpoint with the Core one.
+
+Seeds an in-memory database with synthetic Pokemon and times one
+``limit=1000`` page both ways:
+
+- orm: hydrate Pokemon objects, ``to_dict()``, ``jsonable_encoder`` and
+  ``json.dumps`` (what FastAPI's JSONResponse does)
+- core: select plain rows, ``pokemon_resource`` and ``render_json``
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_serialization.py --rows 5000 --limit 1000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from palmon.database.models import Base, Pokemon, pokemon_resource
+from palmon.api.queries import select_pokemon
+from palmon.api.serializers import render_json, orjson
+from common import fake_rows
+
+
+async def orm_page(session, limit):
+    result = await session.execute(select(Pokemon).order_by(Pokemon.id).limit(limit))
+    content = {"data": [p.to_dict() for p in result.scalars().all()]}
+    session.expunge_all()
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+async def core_page(session, limit):
+    result = await session.execute(select_pokemon().order_by(Pokemon.id).limit(limit))
+    return render_json({"data": [pokemon_resource(row) for row in result.all()]})
+
+
+async def timed(fn, session, limit, repeat):
+    await fn(session, limit)  # warm up statement caches
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn(session, limit)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def main(rows, limit, repeat):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(Pokemon.__table__.insert(), fake_rows(rows))
+
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as session:
+        assert json.loads(await orm_page(session, limit)) == json.loads(await core_page(session, limit))
+        orm = await timed(orm_page, session, limit, repeat)
+        core = await timed(core_page, session, limit, repeat)
+
+    await engine.dispose()
+    print(f"encoder: {'orjson' if orjson else 'json'}, rows: {rows}, limit: {limit}")
+    print(f"orm:  {orm * 1000:8.2f} ms/page")
+    print(f"core: {core * 1000:8.2f} ms/page ({orm / core:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.limit, args.repeat))
@@ -0,0 +1,205 @@
+"""
+Helpers shared by the benchmark scripts: synthetic data, latency
+summaries and the JSON result files that ``compare.py`` diffs.
+
+Nothing here imports palmon at module level, because the scripts have to
+point ``DATABASE_URL`` at their own database before palmon creates its
+engines.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+TYPES = ('grass,poison', 'fire', 'water', 'bug', 'normal,flying', 'electric', 'psychic', 'rock,ground')
+
+
+def fake_rows(count, start=1):
+    return [
+        {
+            'id': i,
+            'name': f"pokemon-{i}",
+            'height': i % 30 / 10,
+            'weight': i % 500 / 10,
+            'types': TYPES[i % len(TYPES)],
+            'image_url': f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{i}.png",
+            'base_experience': i % 300
+        }
+        for i in range(start, start + count)
+    ]
+
+
+POKEAPI = "https://pokeapi.co/api/v2"
+STATS = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+# Sizes of PokeAPI's shared resource pools
+ABILITY_COUNT = 300
+MOVE_COUNT = 900
+SPECIES_COUNT = 1025
+
+
+def fake_payload(pokemon_id, moves=60):
+    """
+    A PokeAPI /pokemon response body for the mock upstream.
+
+    Like the real thing it links stats, two or three abilities, ``moves``
+    moves with their learn details, and a species. The IDs are spread
+    over pools the size of PokeAPI's, so most of them are shared with
+    other Pokemon.
+    """
+    row = fake_rows(1, start=pokemon_id)[0]
+    ability_ids = [(pokemon_id * 7 + offset * 31) % ABILITY_COUNT + 1 for offset in range(2 + pokemon_id % 2)]
+    move_ids = sorted({(pokemon_id * 13 + offset * 17) % MOVE_COUNT + 1 for offset in range(moves)})
+    return {
+        'id': pokemon_id,
+        'name': row['name'],
+        'height': int(row['height'] * 10),
+        'weight': int(row['weight'] * 10),
+        'types': [{'slot': slot, 'type': {'name': name}} for slot, name in enumerate(row['types'].split(','), 1)],
+        'sprites': {'front_default': row['image_url']},
+        'base_experience': row['base_experience'],
+        'stats': [
+            {'base_stat': (pokemon_id * (slot + 3)) % 150 + 5, 'effort': slot % 3, 'stat': {'name': name, 'url': f"{POKEAPI}/stat/{slot}/"}}
+            for slot, name in enumerate(STATS, 1)
+        ],
+        'abilities': [
+            {'ability': {'name': f"ability-{ability_id}", 'url': f"{POKEAPI}/ability/{ability_id}/"}, 'is_hidden': slot == 3, 'slot': slot}
+            for slot, ability_id in enumerate(ability_ids, 1)
+        ],
+        'moves': [
+            {
+                'move': {'name': f"move-{move_id}", 'url': f"{POKEAPI}/move/{move_id}/"},
+                'version_group_details': [
+                    {'level_learned_at': 0, 'move_learn_method': {'name': 'machine'}, 'version_group': {'name': 'red-blue'}},
+                    {'level_learned_at': move_id % 50, 'move_learn_method': {'name': 'level-up'}, 'version_group': {'name': 'scarlet-violet'}},
+                ]
+            }
+            for move_id in move_ids
+        ],
+        'species': {'name': f"species-{(pokemon_id - 1) % SPECIES_COUNT + 1}", 'url': f"{POKEAPI}/pokemon-species/{(pokemon_id - 1) % SPECIES_COUNT + 1}/"}
+    }
+
+
+def fake_resource(kind, resource_id):
+    """A PokeAPI /ability, /move or /pokemon-species response body."""
+    generation = {'name': f"generation-{'i' * (resource_id % 3 + 1)}"}
+    if kind == 'ability':
+        return {
+            'id': resource_id,
+            'name': f"ability-{resource_id}",
+            'generation': generation,
+            'effect_entries': [
+                {'short_effect': f"Effect of ability {resource_id}.", 'language': {'name': 'en'}},
+                {'short_effect': f"Effekt der Faehigkeit {resource_id}.", 'language': {'name': 'de'}},
+            ]
+        }
+    if kind == 'move':
+        return {
+            'id': resource_id,
+            'name': f"move-{resource_id}",
+            'type': {'name': TYPES[resource_id % len(TYPES)].split(',')[0]},
+            'damage_class': {'name': ('physical', 'special', 'status')[resource_id % 3]},
+            'power': None if resource_id % 3 == 2 else resource_id % 120 + 20,
+            'accuracy': 100 - resource_id % 30,
+            'pp': 5 * (resource_id % 8 + 1)
+        }
+    return {
+        'id': resource_id,
+        'name': f"species-{resource_id}",
+        'generation': generation,
+        'is_legendary': resource_id % 97 == 0,
+        'is_mythical': resource_id % 89 == 0,
+        'capture_rate': resource_id % 255
+    }
+
+
+async def seed_database(rows, chunk_size=10000):
+    """
+    Fill the configured database with ``rows`` synthetic Pokemon.
+
+    A database that already holds exactly that many rows is reused, so
+    repeated runs against a 1M row file skip the seeding.
+    """
+    from sqlalchemy import delete, func, select
+    from palmon.database.models import DataVersion, Pokemon, PokemonType, engine, init_db, type_rows
+
+    await init_db()
+    async with engine.begin() as conn:
+        existing = (await conn.execute(select(func.count()).select_from(Pokemon))).scalar_one()
+        if existing == rows:
+            return False
+        await conn.execute(delete(PokemonType))
+        await conn.execute(delete(Pokemon))
+        for start in range(1, rows + 1, chunk_size):
+            chunk = fake_rows(min(chunk_size, rows - start + 1), start)
+            await conn.execute(Pokemon.__table__.insert(), chunk)
+            await conn.execute(
+                PokemonType.__table__.insert(),
+                [type_row for row in chunk for type_row in type_rows(row['id'], row['types'])]
+            )
+        await conn.execute(delete(DataVersion))
+        await conn.execute(DataVersion.__table__.insert(), [{'id': 1, 'version': 1}])
+    return True
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of already sorted samples."""
+    if not samples:
+        return None
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples) + 0.5) - 1))
+    return samples[rank]
+
+
+def latency_summary(samples, elapsed, errors=0):
+    """Throughput and latency percentiles, in requests/s and milliseconds."""
+    samples = sorted(samples)
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': round(len(samples) / elapsed, 1) if elapsed > 0 else None,
+        'p50_ms': ms(percentile(samples, 50)),
+        'p95_ms': ms(percentile(samples, 95)),
+        'p99_ms': ms(percentile(samples, 99)),
+        'max_ms': ms(samples[-1] if samples else None),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmark, params, results):
+    """Write one benchmark run as JSON, with enough context to compare runs."""
+    document = {
+        'benchmark': benchmark,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return document
+
+
+class Timer:
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
@@ -0,0 +1,62 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Every metric present in both files is printed with its relative change.
+Latencies and durations must not grow, and throughputs must not shrink,
+by more than ``--threshold``; otherwise the exit status is 1, so this
+can gate a release in CI.
+
+Usage:
+    python benchmarks/compare.py baseline/api.json api.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ('p50_ms', 'p95_ms', 'p99_ms', 'elapsed_s')
+HIGHER_IS_BETTER = ('rps', 'pokemon_per_second')
+
+
+def compare(baseline, current, threshold):
+    """Yield (scenario, metric, old, new, change, regressed) for shared metrics."""
+    for scenario, old_metrics in baseline['results'].items():
+        new_metrics = current['results'].get(scenario)
+        if new_metrics is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            old, new = old_metrics.get(metric), new_metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change if metric in LOWER_IS_BETTER else -change
+            yield scenario, metric, old, new, change, worse > threshold
+
+
+def main(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline['benchmark'] != current['benchmark']:
+        sys.exit(f"Cannot compare a {baseline['benchmark']} run with a {current['benchmark']} run")
+    if baseline['params'] != current['params']:
+        print("Warning: the runs used different parameters, changes may not be meaningful")
+
+    regressions = 0
+    for scenario, metric, old, new, change, regressed in compare(baseline, current, args.threshold):
+        regressions += regressed
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{scenario:12} {metric:20} {old:10.2f} -> {new:10.2f}  {change:+7.1%}{marker}")
+
+    if regressions:
+        print(f"{regressions} metric(s) regressed by more than {args.threshold:.0%}")
+    return regressions == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('baseline', help="Result file of the reference run")
+    parser.add_argument('current', help="Result file of the run to check")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Allowed relative change (default: 0.15)")
+    args = parser.parse_args()
+    sys.exit(0 if main(args) else 1)
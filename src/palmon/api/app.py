@@ -1,31 +1,94 @@
-from fastapi import FastAPI, HTTPException, Depends
-from palmon.database.models import AsyncSessionLocal as SessionLocal, Pokemon
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from palmon.database.models import ReadSessionLocal as SessionLocal, Pokemon, pokemon_resource
 from palmon.database import get_db
+from palmon.database.engine import prewarm_pool
+from palmon.api.cache import ResponseCache, DataVersionTracker, make_etag, etag_matches
+from palmon.api.pagination import encode_cursor, decode_cursor
+from palmon.api.filters import PokemonFilters
+from palmon.api.search import NameIndex
+from palmon.api.snapshot import SnapshotStore
+from palmon.api.export import EXPORT_FORMATS, accepts_gzip, export_chunks, gzip_chunks, snapshot_chunks
+from palmon.api.queries import select_pokemon, parse_fields
+from palmon.api.includes import parse_include, pokemon_with_includes, select_pokemon_including
+from palmon.api.instrumentation import (
+    PrometheusMiddleware,
+    RequestMetricsMiddleware,
+    mark_worker_stopped,
+    metrics,
+    timed,
+    warming_up
+)
+from palmon.api.serializers import (
+    JSON,
+    RenderedJSONResponse,
+    available_media_types,
+    negotiate,
+    render
+)
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from contextlib import asynccontextmanager
+from urllib.parse import urlencode
 from fastapi.middleware.cors import CORSMiddleware
-from starlette_prometheus import metrics, PrometheusMiddleware
-from prometheus_client import Counter, Histogram
 from dotenv import load_dotenv
+import httpx
+import logging
+import os
 import time
 
-# Create custom metrics
-pokemon_requests = Counter(
-    'pokemon_requests_total',
-    'Total number of requests to Pokemon endpoints',
-    ['endpoint', 'status']
+logger = logging.getLogger(__name__)
+
+# Serialized responses, invalidated whenever the scraper bumps the data version
+response_cache = ResponseCache(
+    maxsize=int(os.getenv('POKEMON_API_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('POKEMON_API_CACHE_TTL', 300))
 )
+data_version = DataVersionTracker(
+    poll_interval=float(os.getenv('POKEMON_API_VERSION_POLL_INTERVAL', 1.0))
+)
+
+# Typeahead index over names, rebuilt when the data version changes
+name_index = NameIndex()
 
-request_duration = Histogram(
-    'pokemon_request_duration_seconds',
-    'Time spent processing Pokemon requests',
-    ['endpoint']
+# Upper bound on ?ids= so one request cannot ask for the whole table
+max_batch_ids = int(os.getenv('POKEMON_API_MAX_BATCH_IDS', 100))
+
+# Rows per chunk (and server-side cursor fetch) of /api/pokemon/export
+export_chunk_size = int(os.getenv('POKEMON_API_EXPORT_CHUNK_SIZE', 1000))
+
+# Sent with every cacheable response so clients and CDNs can reuse it
+cache_control = os.getenv('POKEMON_API_CACHE_CONTROL', 'public, max-age=60')
+
+# 'database' queries the database per request; 'snapshot' serves everything
+# from an in-memory copy of the table that is reloaded when the data changes
+api_mode = os.getenv('POKEMON_API_MODE', 'database')
+if api_mode not in ('database', 'snapshot'):
+    raise ValueError(f"Unknown POKEMON_API_MODE {api_mode!r}, expected 'database' or 'snapshot'")
+snapshot_store = SnapshotStore(
+    poll_interval=float(os.getenv('POKEMON_API_SNAPSHOT_POLL_INTERVAL', 1.0))
 )
 
+# Each worker warms up before serving: it opens its read pool and primes
+# the data version, the name index and the first pages of the listing
+warmup_enabled = os.getenv('POKEMON_API_WARMUP', 'true').lower() in ('1', 'true', 'yes')
+warmup_pages = int(os.getenv('POKEMON_API_WARMUP_PAGES', 1))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if api_mode == 'snapshot':
+        await snapshot_store.start(SessionLocal)
+    if warmup_enabled:
+        await warm_up()
+    yield
+    await snapshot_store.stop()
+    mark_worker_stopped()
+
 app = FastAPI(
     title="PalMon API",
+    lifespan=lifespan,
 )
 
 # Add Prometheus middleware
@@ -41,83 +104,510 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so that every request is timed, including errors and the
+# whole body of streaming responses
+app.add_middleware(
+    RequestMetricsMiddleware,
+    prefix="/api/pokemon",
+    aliases={"/api/pokemon/{pokemon_id}": "/api/pokemon/{id}"}
+)
+
+def response_media_type(request: Request):
+    """Negotiate the response format from the Accept header, or fail with 406 if JSON is refused."""
+    media_type = negotiate(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Supported media types: {', '.join(available_media_types())}"
+        )
+    return media_type
+
+def cacheable_response(request: Request, body, etag, media_type=JSON):
+    """Return the body with validators, or a bare 304 if the client has it."""
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return RenderedJSONResponse(content=body, headers=headers, media_type=media_type)
+
+def current_snapshot():
+    """The in-memory snapshot in snapshot mode, None when reading from the database."""
+    return snapshot_store.current if api_mode == 'snapshot' else None
+
+async def current_version(db: AsyncSession, snapshot=None):
+    if snapshot is not None:
+        return snapshot.version
+    return await data_version.current(db)
+
+def parse_ids(spec):
+    """Parse a comma-separated list of Pokemon IDs; raises ValueError if malformed."""
+    parts = [part.strip() for part in spec.split(',')]
+    if not all(part.isdigit() for part in parts):
+        raise ValueError("Invalid ids")
+    return [int(part) for part in parts]
+
+async def fetch_batch(db: AsyncSession, ids, fields=None, snapshot=None):
+    """
+    Resolve many IDs with a single ``WHERE id IN (...)`` query.
+
+    Returns one entry per requested ID, in the requested order, with None
+    where no Pokemon exists.
+    """
+    if snapshot is not None:
+        return snapshot.batch(ids)
+    result = await db.execute(select_pokemon(fields).where(Pokemon.id.in_(set(ids))))
+    found = {pokemon.id: pokemon for pokemon in result}
+    return [found.get(pokemon_id) for pokemon_id in ids]
+
+async def fetch_keyset_page(
+    db: AsyncSession,
+    limit,
+    after_id=None,
+    before_id=None,
+    filters=None,
+    fields=None,
+    snapshot=None
+):
+    """
+    Fetch one page by primary key instead of OFFSET.
+
+    Returns the page's Pokemon in ID order plus whether rows exist before
+    and after it. The side we are walking towards is detected by reading
+    one extra row; the other side with an index-only existence check.
+    """
+    filters = filters or PokemonFilters()
+    if snapshot is not None:
+        return snapshot.keyset_page(filters, limit, after_id=after_id, before_id=before_id)
+
+    if before_id is not None:
+        stmt = select_pokemon(fields).where(Pokemon.id < before_id).order_by(Pokemon.id.desc())
+    else:
+        stmt = select_pokemon(fields).order_by(Pokemon.id)
+        if after_id is not None:
+            stmt = stmt.where(Pokemon.id > after_id)
+
+    result = await db.execute(filters.apply(stmt).limit(limit + 1))
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if before_id is not None:
+        rows.reverse()
+
+    if not rows:
+        return rows, False, False
+
+    if before_id is not None:
+        other = select(Pokemon.id).where(Pokemon.id > rows[-1].id).limit(1)
+    else:
+        other = select(Pokemon.id).where(Pokemon.id < rows[0].id).limit(1)
+    has_other = (await db.execute(filters.apply(other))).first() is not None
+
+    if before_id is not None:
+        return rows, has_more, has_other
+    return rows, has_other, has_more
+
+async def fetch_page(db: AsyncSession, filters, offset, limit, fields=None, snapshot=None):
+    """One OFFSET page plus one extra row, which tells whether a next page exists."""
+    if snapshot is not None:
+        return snapshot.page(filters, offset, limit)
+    stmt = filters.apply(select_pokemon(fields))
+    stmt = stmt.order_by(*filters.order_by()).offset(offset).limit(limit + 1)
+    result = await db.execute(stmt)
+    return result.all()
+
+async def fetch_pokemon(db: AsyncSession, pokemon_id, fields=None, snapshot=None):
+    if snapshot is not None:
+        return snapshot.get(pokemon_id)
+    result = await db.execute(select_pokemon(fields).where(Pokemon.id == pokemon_id))
+    return result.one_or_none()
+
+async def fetch_pokemon_including(db: AsyncSession, pokemon_id, include):
+    """A Pokemon ORM object with the ``include`` relationships loaded eagerly."""
+    result = await db.execute(select_pokemon_including(include).where(Pokemon.id == pokemon_id))
+    return result.scalar_one_or_none()
+
 @app.get("/api/pokemon")
 async def get_pokemon_list(
-    page: int = 1,
+    request: Request,
+    page: Optional[int] = None,
     limit: int = 10,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    type: Optional[str] = None,
+    min_weight: Optional[float] = None,
+    max_weight: Optional[float] = None,
+    min_height: Optional[float] = None,
+    max_height: Optional[float] = None,
+    min_base_experience: Optional[int] = None,
+    max_base_experience: Optional[int] = None,
+    sort: Optional[str] = None,
+    ids: Optional[str] = None,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a list of Pokemon with pagination."""
-    start_time = time.time()
+    """
+    Get a list of Pokemon.
+
+    Two pagination styles are supported: ``page``/``limit`` (OFFSET based,
+    kept for compatibility) and ``after``/``before`` cursors taken from
+    the ``next``/``prev`` links, which seek by primary key and cost the
+    same on every page.
+
+    Results can be narrowed with ``type`` (comma-separated, all must
+    match) and ``min_``/``max_`` bounds on weight, height and
+    base_experience, and ordered with ``sort`` (prefix ``-`` for
+    descending). Cursors only walk the default ``sort=id`` order.
+
+    ``ids=1,4,7`` instead fetches exactly those Pokemon in one query. The
+    data keeps the requested order with ``null`` for unknown IDs, which
+    are also listed in ``meta.not_found``.
+
+    ``fields=name,types`` returns only those attributes, and clients that
+    send ``Accept: application/x-msgpack`` get MessagePack instead of JSON.
+    """
     try:
         # Validate pagination parameters
-        if page < 1:
+        if page is not None and page < 1:
             raise HTTPException(status_code=400, detail="Invalid page number")
         if limit < 1:
             raise HTTPException(status_code=400, detail="Invalid limit")
         if limit > 1000:
             raise HTTPException(status_code=400, detail="Limit cannot exceed 1000")
-            
-        offset = (page - 1) * limit
-        
-        # Use async query
-        stmt = select(Pokemon).offset(offset).limit(limit)
-        result = await db.execute(stmt)
-        pokemon_list = result.scalars().all()
-        
-        response = {
-            "data": [pokemon.to_dict() for pokemon in pokemon_list],
-            "meta": {
-                "page": page,
-                "limit": limit
-            },
-            "links": {
-                "self": f"/api/pokemon?page={page}&limit={limit}",
-                "next": f"/api/pokemon?page={page+1}&limit={limit}",
-                "prev": f"/api/pokemon?page={page-1}&limit={limit}" if page > 1 else None
-            }
-        }
-        pokemon_requests.labels(endpoint='/api/pokemon', status='200').inc()
-        request_duration.labels(endpoint='/api/pokemon').observe(time.time() - start_time)
-        return response
+
+        try:
+            filters = PokemonFilters.parse(
+                type=type,
+                sort=sort,
+                min_weight=min_weight,
+                max_weight=max_weight,
+                min_height=min_height,
+                max_height=max_height,
+                min_base_experience=min_base_experience,
+                max_base_experience=max_base_experience
+            )
+            fields = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        media_type = response_media_type(request)
+        query = filters.query_string()
+        if fields is not None:
+            query += f"fields={','.join(fields)}&"
+
+        cursor = after if after is not None else before
+        if ids is not None:
+            if page is not None or cursor is not None:
+                raise HTTPException(status_code=400, detail="Cannot combine ids with page/after/before")
+            if filters != PokemonFilters():
+                raise HTTPException(status_code=400, detail="Cannot combine ids with filters")
+            try:
+                id_list = parse_ids(ids)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid ids")
+            if len(id_list) > max_batch_ids:
+                raise HTTPException(status_code=400, detail=f"Cannot request more than {max_batch_ids} ids")
+            cache_key = ('pokemon_batch', tuple(id_list), fields, media_type)
+        elif cursor is not None:
+            if page is not None:
+                raise HTTPException(status_code=400, detail="Cannot combine page with after/before")
+            if after is not None and before is not None:
+                raise HTTPException(status_code=400, detail="Cannot combine after and before")
+            try:
+                cursor_id = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            if not filters.sorted_by_id:
+                raise HTTPException(status_code=400, detail="Cursor pagination only supports sort=id")
+            direction = 'after' if after is not None else 'before'
+            cache_key = ('pokemon_list', direction, cursor_id, limit, filters.key(), fields, media_type)
+        else:
+            page = page if page is not None else 1
+            cache_key = ('pokemon_list', 'page', page, limit, filters.key(), fields, media_type)
+
+        snapshot = current_snapshot()
+        with timed('db'):
+            version = await current_version(db, snapshot)
+        cached = response_cache.get(cache_key, version)
+
+        if cached is None:
+            if ids is not None:
+                with timed('db'):
+                    pokemon_list = await fetch_batch(db, id_list, fields, snapshot)
+                with timed('serialize'):
+                    data = [pokemon_resource(pokemon, fields) if pokemon else None for pokemon in pokemon_list]
+                content = {
+                    "data": data,
+                    "meta": {
+                        "ids": [str(pokemon_id) for pokemon_id in id_list],
+                        "not_found": [
+                            str(pokemon_id)
+                            for pokemon_id, pokemon in zip(id_list, pokemon_list)
+                            if pokemon is None
+                        ]
+                    },
+                    "links": {
+                        "self": f"/api/pokemon?{query}ids={','.join(map(str, id_list))}"
+                    }
+                }
+            elif cursor is not None:
+                with timed('db'):
+                    pokemon_list, has_prev, has_next = await fetch_keyset_page(
+                        db,
+                        limit,
+                        after_id=cursor_id if after is not None else None,
+                        before_id=cursor_id if before is not None else None,
+                        filters=filters,
+                        fields=fields,
+                        snapshot=snapshot
+                    )
+                with timed('serialize'):
+                    data = [pokemon_resource(pokemon, fields) for pokemon in pokemon_list]
+                content = {
+                    "data": data,
+                    "meta": {
+                        "limit": limit,
+                        direction: cursor
+                    },
+                    "links": {
+                        "self": f"/api/pokemon?{query}{direction}={cursor}&limit={limit}",
+                        "next": (
+                            f"/api/pokemon?{query}after={encode_cursor(pokemon_list[-1].id)}&limit={limit}"
+                            if has_next else None
+                        ),
+                        "prev": (
+                            f"/api/pokemon?{query}before={encode_cursor(pokemon_list[0].id)}&limit={limit}"
+                            if has_prev else None
+                        )
+                    }
+                }
+            else:
+                offset = (page - 1) * limit
+
+                with timed('db'):
+                    pokemon_list = await fetch_page(db, filters, offset, limit, fields, snapshot)
+                has_next = len(pokemon_list) > limit
+                pokemon_list = pokemon_list[:limit]
+
+                with timed('serialize'):
+                    data = [pokemon_resource(pokemon, fields) for pokemon in pokemon_list]
+                content = {
+                    "data": data,
+                    "meta": {
+                        "page": page,
+                        "limit": limit
+                    },
+                    "links": {
+                        "self": f"/api/pokemon?{query}page={page}&limit={limit}",
+                        "next": f"/api/pokemon?{query}page={page+1}&limit={limit}" if has_next else None,
+                        "prev": f"/api/pokemon?{query}page={page-1}&limit={limit}" if page > 1 else None
+                    }
+                }
+
+            with timed('encode'):
+                body = render(content, media_type)
+            cached = (body, make_etag(body))
+            response_cache.put(cache_key, version, cached)
+
+        return cacheable_response(request, *cached, media_type)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/pokemon/search")
+async def search_pokemon(
+    request: Request,
+    q: str,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Typeahead search on Pokemon names.
+
+    Prefix matches (on the whole name or any word of a hyphenated name)
+    come first, then fuzzy matches for typos. Served from the in-memory
+    name index, so the database is only read when the data changes.
+    """
+    try:
+        if not q.strip():
+            raise HTTPException(status_code=400, detail="Query cannot be empty")
+        if limit < 1:
+            raise HTTPException(status_code=400, detail="Invalid limit")
+        if limit > 50:
+            raise HTTPException(status_code=400, detail="Limit cannot exceed 50")
+        media_type = response_media_type(request)
+
+        snapshot = current_snapshot()
+        with timed('db'):
+            version = await current_version(db, snapshot)
+        cache_key = ('pokemon_search', q, limit, media_type)
+        cached = response_cache.get(cache_key, version)
+
+        if cached is None:
+            with timed('db'):
+                if snapshot is not None:
+                    index = snapshot.name_index
+                else:
+                    await name_index.refresh(db, version)
+                    index = name_index
+                matches = index.search(q, limit)
+            with timed('serialize'):
+                data = [dict(resource, meta={"match": kind}) for resource, kind in matches]
+            with timed('encode'):
+                body = render({
+                    "data": data,
+                    "meta": {
+                        "q": q,
+                        "limit": limit
+                    },
+                    "links": {
+                        "self": f"/api/pokemon/search?{urlencode({'q': q, 'limit': limit})}"
+                    }
+                }, media_type)
+            cached = (body, make_etag(body))
+            response_cache.put(cache_key, version, cached)
+
+        return cacheable_response(request, *cached, media_type)
     except HTTPException:
-        pokemon_requests.labels(endpoint='/api/pokemon', status='400').inc()
         raise
     except Exception as e:
-        pokemon_requests.labels(endpoint='/api/pokemon', status='500').inc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/pokemon/export")
+async def export_pokemon(
+    request: Request,
+    format: str = 'ndjson',
+    fields: Optional[str] = None
+):
+    """
+    Stream every Pokemon in one response.
+
+    ``format`` is ``ndjson`` (one JSON:API resource per line, the default)
+    or ``csv``. Rows are streamed from a server-side cursor in chunks, so
+    memory use does not grow with the table, and the body is gzipped on
+    the fly for clients that send ``Accept-Encoding: gzip``. Supports the
+    same ``fields`` sparse fieldsets as the other endpoints.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format, expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    try:
+        fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        chunks = snapshot_chunks(snapshot.records, format, fields, export_chunk_size)
+    else:
+        chunks = export_chunks(SessionLocal, format, fields, export_chunk_size)
+    headers = {"Vary": "Accept-Encoding"}
+    if format == 'csv':
+        headers["Content-Disposition"] = 'attachment; filename="pokemon.csv"'
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[format], headers=headers)
+
 @app.get("/api/pokemon/{pokemon_id}")
 async def get_pokemon_by_id(
+    request: Request,
     pokemon_id: int,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific Pokemon by ID."""
-    start_time = time.time()
+    """
+    Get a specific Pokemon by ID, optionally as a ``fields`` sparse fieldset.
+
+    ``include=stats,abilities,moves,species`` adds the Pokemon's stats and
+    links to its abilities, moves and species, with those resources in
+    ``included``. They are read from the database even in snapshot mode.
+    """
     try:
-        stmt = select(Pokemon).where(Pokemon.id == pokemon_id)
-        result = await db.execute(stmt)
-        pokemon = result.scalar_one_or_none()
-        
-        if pokemon is None:
-            pokemon_requests.labels(endpoint='/api/pokemon/{id}', status='404').inc()
-            raise HTTPException(status_code=404, detail="Pokemon not found")
-        
-        response = {
-            "data": pokemon.to_dict(),
-            "links": {
-                "self": f"/api/pokemon/{pokemon_id}"
+        try:
+            fields = parse_fields(fields)
+            include = parse_include(include)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        media_type = response_media_type(request)
+
+        snapshot = current_snapshot()
+        with timed('db'):
+            version = await current_version(db, snapshot)
+        cache_key = ('pokemon', pokemon_id, fields, include, media_type)
+        cached = response_cache.get(cache_key, version)
+
+        if cached is None:
+            with timed('db'):
+                if include is not None:
+                    pokemon = await fetch_pokemon_including(db, pokemon_id, include)
+                else:
+                    pokemon = await fetch_pokemon(db, pokemon_id, fields, snapshot)
+
+            if pokemon is None:
+                raise HTTPException(status_code=404, detail="Pokemon not found")
+
+            with timed('serialize'):
+                if include is not None:
+                    data, included = pokemon_with_includes(pokemon, include, fields)
+                else:
+                    data, included = pokemon_resource(pokemon, fields), None
+            content = {
+                "data": data,
+                "links": {
+                    "self": f"/api/pokemon/{pokemon_id}"
+                }
             }
-        }
-        pokemon_requests.labels(endpoint='/api/pokemon/{id}', status='200').inc()
-        request_duration.labels(endpoint='/api/pokemon/{id}').observe(time.time() - start_time)
-        return response
+            if included is not None:
+                content["included"] = included
+            with timed('encode'):
+                body = render(content, media_type)
+            cached = (body, make_etag(body))
+            response_cache.put(cache_key, version, cached)
+
+        return cacheable_response(request, *cached, media_type)
     except HTTPException:
         raise
     except Exception as e:
-        pokemon_requests.labels(endpoint='/api/pokemon/{id}', status='500').inc()
         raise HTTPException(status_code=500, detail=str(e))
 
+async def warm_up():
+    """
+    Pay the first requests' costs at startup.
+
+    A failure is logged and the worker starts anyway; the caches then
+    fill on demand as usual.
+    """
+    started = time.perf_counter()
+    try:
+        connections = 0
+        if api_mode == 'database':
+            connections = await prewarm_pool(SessionLocal.kw['bind'])
+        async with SessionLocal() as db:
+            snapshot = current_snapshot()
+            version = await current_version(db, snapshot)
+            if snapshot is None:
+                await name_index.refresh(db, version)
+        # Through the whole ASGI app, so dependencies and middleware run
+        # exactly as they do for a client's request, but kept out of the
+        # request and cache metrics
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+            with warming_up():
+                for page in range(1, warmup_pages + 1):
+                    response = await client.get("/api/pokemon", params={"page": page})
+                    response.raise_for_status()
+    except Exception as e:
+        logger.warning(f"Warm-up failed, starting cold: {e}")
+        return
+    logger.info(
+        f"Warmed up in {time.perf_counter() - started:.3f}s: {connections} connections, "
+        f"data version {version}, {warmup_pages} listing pages"
+    )
+
 if __name__ == "__main__":
     import uvicorn
     load_dotenv()
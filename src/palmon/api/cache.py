@@ -0,0 +1,137 @@
+import hashlib
+import time
+from collections import OrderedDict
+from prometheus_client import Counter
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from palmon.database.models import DataVersion
+from palmon.api.instrumentation import recording
+
+cache_hits = Counter(
+    'pokemon_cache_hits_total',
+    'Responses served from the in-process response cache',
+    ['cache']
+)
+
+cache_misses = Counter(
+    'pokemon_cache_misses_total',
+    'Response cache lookups that had to go to the database',
+    ['cache']
+)
+
+cache_evictions = Counter(
+    'pokemon_cache_evictions_total',
+    'Entries dropped from the response cache to stay within its size',
+    ['cache']
+)
+
+
+def make_etag(body):
+    """Strong validator for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Evaluate an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+class ResponseCache:
+    """LRU/TTL cache of fully serialized response bodies.
+
+    Keys are tuples whose first element names the cache for metrics, e.g.
+    ``('pokemon', 25)`` or ``('pokemon_list', 'page', 2, 10)``. Every entry
+    remembers the data version it was rendered from and is treated as a
+    miss once the scraper has committed a newer version. A ``maxsize`` of
+    0 disables caching.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key, version):
+        if self.maxsize <= 0:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, expires_at, value = entry
+            if entry_version == version and time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                if recording():
+                    cache_hits.labels(cache=key[0]).inc()
+                return value
+            del self._entries[key]
+
+        if recording():
+            cache_misses.labels(cache=key[0]).inc()
+        return None
+
+    def put(self, key, version, value):
+        if self.maxsize <= 0:
+            return
+
+        self._entries[key] = (version, time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            if recording():
+                cache_evictions.labels(cache=evicted[0]).inc()
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+async def read_data_version(db: AsyncSession):
+    """
+    Read the scraper's data version, 0 before its first commit.
+
+    Databases created before the ``data_version`` table existed are at
+    version 0 too, until the scraper's ``init_db`` adds the table.
+    """
+    try:
+        result = await db.execute(select(DataVersion.version).where(DataVersion.id == 1))
+    except DBAPIError:
+        # PostgreSQL aborts the transaction on any error
+        await db.rollback()
+        exists = await db.run_sync(
+            lambda session: inspect(session.connection()).has_table(DataVersion.__tablename__)
+        )
+        if exists:
+            raise
+        return 0
+    return result.scalar_one_or_none() or 0
+
+
+class DataVersionTracker:
+    """Cheap view of the scraper's data version.
+
+    The ``data_version`` row is re-read at most once per ``poll_interval``
+    seconds, so cache hits inside that window never touch the database.
+    """
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self.version = None
+        self._checked_at = float('-inf')
+
+    async def current(self, db: AsyncSession):
+        now = time.monotonic()
+        if self.version is None or now - self._checked_at >= self.poll_interval:
+            self.version = await read_data_version(db)
+            self._checked_at = now
+        return self.version
+
+    def reset(self):
+        self.version = None
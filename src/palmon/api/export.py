@@ -0,0 +1,88 @@
+import csv
+import io
+import logging
+import zlib
+from palmon.database.models import Pokemon, POKEMON_ATTRIBUTES, pokemon_resource
+from palmon.api.queries import select_pokemon
+from palmon.api.serializers import NDJSON, render_json
+from palmon.api.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'ndjson': NDJSON,
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an ``Accept-Encoding`` header allows a gzip response."""
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0')
+    return False
+
+
+def encode_ndjson(rows, fields=None):
+    return b"".join(render_json(pokemon_resource(row, fields)) + b"\n" for row in rows)
+
+
+def encode_csv(rows, fields=None, header=False):
+    """CSV lines for a chunk of rows; ``types`` is joined with commas as stored."""
+    columns = ('id',) + (fields or POKEMON_ATTRIBUTES)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if header:
+        writer.writerow(columns)
+    writer.writerows(tuple(getattr(row, column) for column in columns) for row in rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def encode_chunk(rows, format='ndjson', fields=None):
+    if format == 'csv':
+        return encode_csv(rows, fields)
+    return encode_ndjson(rows, fields)
+
+
+async def export_chunks(session_factory, format='ndjson', fields=None, chunk_size=1000):
+    """
+    Stream the Pokemon table as encoded chunks of ``chunk_size`` rows.
+
+    Rows are read through a server-side cursor in a session of its own,
+    since the request's session is closed before a streaming response
+    starts. Only one chunk is held in memory at a time.
+    """
+    async with session_factory() as session:
+        stmt = select_pokemon(fields).order_by(Pokemon.id).execution_options(yield_per=chunk_size)
+        result = await session.stream(stmt)
+
+        if format == 'csv':
+            yield encode_csv([], fields, header=True)
+        exported = 0
+        async for rows in result.partitions():
+            exported += len(rows)
+            with timed('encode'):
+                chunk = encode_chunk(rows, format, fields)
+            yield chunk
+        logger.info(f"Exported {exported} Pokemon as {format}")
+
+
+async def snapshot_chunks(records, format='ndjson', fields=None, chunk_size=1000):
+    """Like :func:`export_chunks`, but from an in-memory snapshot's records."""
+    if format == 'csv':
+        yield encode_csv([], fields, header=True)
+    for start in range(0, len(records), chunk_size):
+        with timed('encode'):
+            chunk = encode_chunk(records[start:start + chunk_size], format, fields)
+        yield chunk
+
+
+async def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip member on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,128 @@
+import operator
+from dataclasses import dataclass, fields
+from typing import Optional
+from urllib.parse import urlencode
+from sqlalchemy import select
+from palmon.database.models import Pokemon, PokemonType
+
+SORT_COLUMNS = {
+    'id': Pokemon.id,
+    'name': Pokemon.name,
+    'height': Pokemon.height,
+    'weight': Pokemon.weight,
+    'base_experience': Pokemon.base_experience,
+}
+
+# (query parameter, column, comparison) for the numeric range filters
+RANGE_FILTERS = [
+    ('min_weight', Pokemon.weight, operator.ge),
+    ('max_weight', Pokemon.weight, operator.le),
+    ('min_height', Pokemon.height, operator.ge),
+    ('max_height', Pokemon.height, operator.le),
+    ('min_base_experience', Pokemon.base_experience, operator.ge),
+    ('max_base_experience', Pokemon.base_experience, operator.le),
+]
+
+
+@dataclass(frozen=True)
+class PokemonFilters:
+    """Filter and sort options of the Pokemon list endpoint.
+
+    ``types`` holds lower-cased type names that must *all* match. Every
+    filter is answered from an index: types through ``pokemon_types``
+    (type_name, pokemon_id), ranges and sorts through the column indexes.
+    """
+    types: tuple = ()
+    min_weight: Optional[float] = None
+    max_weight: Optional[float] = None
+    min_height: Optional[float] = None
+    max_height: Optional[float] = None
+    min_base_experience: Optional[int] = None
+    max_base_experience: Optional[int] = None
+    sort: str = 'id'
+
+    @classmethod
+    def parse(cls, type=None, sort=None, **ranges):
+        """Build filters from raw query parameters; raises ValueError if invalid."""
+        types = tuple(sorted({t.strip().lower() for t in (type or '').split(',') if t.strip()}))
+        sort = sort or 'id'
+        if sort.lstrip('-') not in SORT_COLUMNS:
+            raise ValueError(f"Invalid sort, expected one of: {', '.join(SORT_COLUMNS)}")
+        return cls(types=types, sort=sort, **ranges)
+
+    @property
+    def sorted_by_id(self):
+        return self.sort == 'id'
+
+    def apply(self, stmt):
+        """Add the WHERE clauses for these filters to a select on Pokemon."""
+        for type_name in self.types:
+            stmt = stmt.where(Pokemon.id.in_(
+                select(PokemonType.pokemon_id).where(PokemonType.type_name == type_name)
+            ))
+        for name, column, op in RANGE_FILTERS:
+            value = getattr(self, name)
+            if value is not None:
+                stmt = stmt.where(op(column, value))
+        return stmt
+
+    def matches(self, pokemon):
+        """In-memory equivalent of :meth:`apply` for one record.
+
+        Like SQL comparisons, a missing (NULL) value never satisfies a range.
+        """
+        if self.types:
+            types = set(pokemon.types.split(',')) if pokemon.types else set()
+            if not types.issuperset(self.types):
+                return False
+        return self.matches_ranges(pokemon)
+
+    def matches_ranges(self, pokemon):
+        """The range part of :meth:`matches`, for callers that resolved types already."""
+        for name, column, op in RANGE_FILTERS:
+            bound = getattr(self, name)
+            if bound is not None:
+                value = getattr(pokemon, column.key)
+                if value is None or not op(value, bound):
+                    return False
+        return True
+
+    def sort_records(self, records):
+        """In-memory equivalent of :meth:`order_by`: NULLs sort before every value."""
+        name = self.sort.lstrip('-')
+        if name == 'id':
+            return sorted(records, key=lambda p: p.id, reverse=self.sort.startswith('-'))
+
+        def key(pokemon):
+            value = getattr(pokemon, name)
+            return (value is not None, value if value is not None else 0, pokemon.id)
+        return sorted(records, key=key, reverse=self.sort.startswith('-'))
+
+    def order_by(self):
+        """
+        ORDER BY clauses, with the primary key as a tiebreaker.
+
+        NULLs sort as the smallest value (first ascending, last descending),
+        spelled out because SQLite and PostgreSQL disagree on the default.
+        """
+        column = SORT_COLUMNS[self.sort.lstrip('-')]
+        if self.sort.startswith('-'):
+            return (column.desc().nulls_last(), Pokemon.id.desc())
+        return (column.asc().nulls_first(), Pokemon.id)
+
+    def key(self):
+        """Hashable representation for response cache keys."""
+        return tuple(getattr(self, f.name) for f in fields(self))
+
+    def query_string(self):
+        """The non-default filters as a query string prefix for links, e.g. ``type=fire&``."""
+        params = []
+        if self.types:
+            params.append(('type', ','.join(self.types)))
+        for name, _, _ in RANGE_FILTERS:
+            value = getattr(self, name)
+            if value is not None:
+                params.append((name, value))
+        if not self.sorted_by_id:
+            params.append(('sort', self.sort))
+        return urlencode(params, safe=',') + '&' if params else ''
@@ -0,0 +1,130 @@
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+from palmon.database.models import Pokemon, PokemonAbility, PokemonMove, pokemon_resource
+
+# Related data a client can ask for with ?include=
+INCLUDES = ('stats', 'abilities', 'moves', 'species')
+
+# Collections are loaded with one SELECT ... IN per relationship, joined to
+# the ability or move each link points at, and the species is joined to the
+# Pokemon itself. A Pokemon with every include costs four queries however
+# many moves it has.
+LOADERS = {
+    'stats': selectinload(Pokemon.stats),
+    'abilities': selectinload(Pokemon.abilities).joinedload(PokemonAbility.ability),
+    'moves': selectinload(Pokemon.moves).joinedload(PokemonMove.move),
+    'species': joinedload(Pokemon.species),
+}
+
+
+def parse_include(spec):
+    """
+    Parse an ``include=stats,abilities`` list.
+
+    Returns a tuple of names in request order, or None when nothing is
+    included. Raises ValueError on unknown names.
+    """
+    if spec is None:
+        return None
+    include = tuple(dict.fromkeys(name.strip() for name in spec.split(',') if name.strip()))
+    unknown = [name for name in include if name not in INCLUDES]
+    if not include or unknown:
+        raise ValueError(f"Invalid include, expected any of: {', '.join(INCLUDES)}")
+    return include
+
+
+def select_pokemon_including(include):
+    """ORM ``SELECT`` of Pokemon with the ``include`` relationships loaded eagerly."""
+    return select(Pokemon).options(*(LOADERS[name] for name in include))
+
+
+def ability_resource(ability):
+    return {
+        "type": "ability",
+        "id": str(ability.id),
+        "attributes": {
+            "name": ability.name,
+            "effect": ability.effect,
+            "generation": ability.generation
+        }
+    }
+
+
+def move_resource(move):
+    return {
+        "type": "move",
+        "id": str(move.id),
+        "attributes": {
+            "name": move.name,
+            "type": move.type_name,
+            "damage_class": move.damage_class,
+            "power": move.power,
+            "accuracy": move.accuracy,
+            "pp": move.pp
+        }
+    }
+
+
+def species_resource(species):
+    return {
+        "type": "species",
+        "id": str(species.id),
+        "attributes": {
+            "name": species.name,
+            "generation": species.generation,
+            "is_legendary": species.is_legendary,
+            "is_mythical": species.is_mythical,
+            "capture_rate": species.capture_rate
+        }
+    }
+
+
+def pokemon_with_includes(pokemon, include, fields=None):
+    """
+    The Pokemon resource with ``include`` added, plus the ``included`` list.
+
+    Stats become a ``stats`` attribute. Abilities, moves and species are
+    JSON:API relationships, with per-Pokemon details (slot, hidden
+    ability, how a move is learned) in the identifiers' ``meta``, and the
+    resources themselves in ``included``.
+    """
+    resource = pokemon_resource(pokemon, fields)
+    relationships = {}
+    included = []
+
+    if 'stats' in include:
+        resource["attributes"]["stats"] = [
+            {"name": stat.stat_name, "base_stat": stat.base_stat, "effort": stat.effort}
+            for stat in pokemon.stats
+        ]
+    if 'abilities' in include:
+        relationships["abilities"] = {"data": [
+            {
+                "type": "ability",
+                "id": str(link.ability_id),
+                "meta": {"slot": link.slot, "is_hidden": link.is_hidden}
+            }
+            for link in pokemon.abilities
+        ]}
+        included.extend(ability_resource(link.ability) for link in pokemon.abilities if link.ability)
+    if 'moves' in include:
+        relationships["moves"] = {"data": [
+            {
+                "type": "move",
+                "id": str(link.move_id),
+                "meta": {"learn_method": link.learn_method, "level_learned_at": link.level_learned_at}
+            }
+            for link in pokemon.moves
+        ]}
+        included.extend(move_resource(link.move) for link in pokemon.moves if link.move)
+    if 'species' in include:
+        species = pokemon.species
+        relationships["species"] = {
+            "data": {"type": "species", "id": str(species.id)} if species else None
+        }
+        if species:
+            included.append(species_resource(species))
+
+    if relationships:
+        resource["relationships"] = relationships
+    return resource, included
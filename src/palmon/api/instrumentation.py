@@ -0,0 +1,230 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+from starlette.responses import Response
+from starlette_prometheus import PrometheusMiddleware as StarlettePrometheusMiddleware
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Most requests are answered from the cache or a single indexed lookup, so
+# the buckets start well below the client defaults' 5ms.
+REQUEST_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+PHASE_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 10, 25, 50)
+
+# Set by palmon.api.server for multi-worker serving. Both spellings are
+# what prometheus_client checks when choosing how to store values.
+MULTIPROC_DIR_VARIABLES = ('PROMETHEUS_MULTIPROC_DIR', 'prometheus_multiproc_dir')
+
+pokemon_requests = Counter(
+    'pokemon_requests_total',
+    'Total number of requests to Pokemon endpoints',
+    ['endpoint', 'status']
+)
+
+request_duration = Histogram(
+    'pokemon_request_duration_seconds',
+    'Time spent processing Pokemon requests',
+    ['endpoint', 'status'],
+    buckets=REQUEST_BUCKETS
+)
+
+request_phase_duration = Histogram(
+    'pokemon_request_phase_seconds',
+    'Time spent per request in each phase: query, hydrate, serialize, encode',
+    ['endpoint', 'phase'],
+    buckets=PHASE_BUCKETS
+)
+
+request_queries = Histogram(
+    'pokemon_request_queries',
+    'Database queries executed per request',
+    ['endpoint'],
+    buckets=QUERY_COUNT_BUCKETS
+)
+
+
+class RequestTimings:
+    """Time spent in each phase of one request, and the queries it ran."""
+    __slots__ = ('phases', 'queries', 'query_time')
+
+    def __init__(self):
+        self.phases = {}
+        self.queries = 0
+        self.query_time = 0.0
+
+    def add(self, phase, elapsed):
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+
+    def breakdown(self):
+        """
+        Seconds per reported phase.
+
+        ``query`` is what the database driver spent executing statements.
+        Everything else inside a ``db`` block (building rows from the
+        result, snapshot lookups, the name index) is reported as
+        ``hydrate``.
+        """
+        phases = {
+            phase: elapsed for phase, elapsed in self.phases.items() if phase != 'db'
+        }
+        if self.queries:
+            phases['query'] = self.query_time
+        if 'db' in self.phases:
+            phases['hydrate'] = max(0.0, self.phases['db'] - self.query_time)
+        return phases
+
+
+_current_timings = ContextVar('palmon_request_timings', default=None)
+_warming_up = ContextVar('palmon_warming_up', default=False)
+
+
+def current_timings():
+    """Timings of the request being handled, or None outside a request."""
+    return _current_timings.get()
+
+
+@contextmanager
+def warming_up():
+    """Leave the requests made in the block (the startup warm-up) out of every metric."""
+    token = _warming_up.set(True)
+    try:
+        yield
+    finally:
+        _warming_up.reset(token)
+
+
+def recording():
+    """Whether the current request counts towards the metrics."""
+    return not _warming_up.get()
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to ``phase`` of the current request."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def metrics(request):
+    """
+    Prometheus exposition of the API's metrics.
+
+    When several workers share a multiprocess directory, every worker's
+    samples are read from it and aggregated, so it does not matter which
+    worker answers the scrape.
+    """
+    registry = REGISTRY
+    if any(os.getenv(name) for name in MULTIPROC_DIR_VARIABLES):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    return Response(generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def mark_worker_stopped():
+    """Drop this process's live gauges from the multiprocess directory, if any."""
+    if any(os.getenv(name) for name in MULTIPROC_DIR_VARIABLES):
+        mark_process_dead(os.getpid())
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    if _current_timings.get() is not None:
+        conn.info.setdefault('palmon_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    timings = _current_timings.get()
+    starts = conn.info.get('palmon_query_start')
+    if timings is None or not starts:
+        return
+    timings.queries += 1
+    timings.query_time += time.perf_counter() - starts.pop()
+
+
+class RequestMetricsMiddleware:
+    """
+    Record every request to the routes under ``prefix``.
+
+    Unlike recording in the handlers this also covers validation errors,
+    404s and unhandled exceptions, and for streaming responses it runs
+    until the last chunk is sent. Requests are labelled by route template,
+    with ``aliases`` renaming templates (e.g. to keep an existing label);
+    paths that match no route are not recorded, to bound the label set.
+    """
+
+    def __init__(self, app, prefix='/api/pokemon', aliases=None):
+        self.app = app
+        self.prefix = prefix
+        self.aliases = aliases or {}
+        self._labels = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith(self.prefix) or not recording():
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_timings.reset(token)
+            endpoint = self.endpoint_label(scope)
+            if endpoint is not None:
+                self.record(endpoint, str(status), elapsed, timings)
+
+    def endpoint_label(self, scope):
+        """The route template the router matched for this request, if any."""
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return None
+        if self._labels is None:
+            self._labels = {
+                route.endpoint: self.aliases.get(route.path, route.path)
+                for route in scope['app'].routes
+                if getattr(route, 'endpoint', None) is not None and route.path.startswith(self.prefix)
+            }
+        return self._labels.get(endpoint)
+
+    @staticmethod
+    def record(endpoint, status, elapsed, timings):
+        pokemon_requests.labels(endpoint=endpoint, status=status).inc()
+        request_duration.labels(endpoint=endpoint, status=status).observe(elapsed)
+        request_queries.labels(endpoint=endpoint).observe(timings.queries)
+        for phase, seconds in timings.breakdown().items():
+            request_phase_duration.labels(endpoint=endpoint, phase=phase).observe(seconds)
+
+
+class PrometheusMiddleware(StarlettePrometheusMiddleware):
+    """starlette_prometheus's per-route metrics, without the warm-up requests."""
+
+    async def dispatch(self, request, call_next):
+        if not recording():
+            return await call_next(request)
+        return await super().dispatch(request, call_next)
@@ -0,0 +1,20 @@
+import base64
+import binascii
+
+
+def encode_cursor(pokemon_id):
+    """Opaque cursor token pointing at a Pokemon ID."""
+    return base64.urlsafe_b64encode(f"id:{pokemon_id}".encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(token):
+    """Inverse of :func:`encode_cursor`; raises ValueError on a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    prefix, _, value = raw.partition(":")
+    if prefix != "id" or not value.lstrip("-").isdigit():
+        raise ValueError("Invalid cursor")
+    return int(value)
@@ -0,0 +1,41 @@
+from sqlalchemy import select
+from palmon.database.models import Pokemon, POKEMON_ATTRIBUTES
+
+# Everything pokemon_resource needs, selected as plain columns so rows come
+# back as lightweight tuples instead of hydrated, identity-mapped objects
+POKEMON_COLUMNS = (
+    Pokemon.id,
+    Pokemon.name,
+    Pokemon.height,
+    Pokemon.weight,
+    Pokemon.types,
+    Pokemon.image_url,
+    Pokemon.base_experience,
+)
+
+
+def select_pokemon(fields=None):
+    """
+    Core ``SELECT`` of the Pokemon columns; rows support attribute access.
+
+    With a sparse fieldset only the ID and the requested columns are read.
+    """
+    if fields is None:
+        return select(*POKEMON_COLUMNS)
+    return select(Pokemon.id, *(getattr(Pokemon, name) for name in fields))
+
+
+def parse_fields(spec):
+    """
+    Parse a ``fields=name,types`` sparse fieldset.
+
+    Returns a tuple of attribute names in request order, or None for all
+    attributes. Raises ValueError on unknown names.
+    """
+    if spec is None:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in spec.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in POKEMON_ATTRIBUTES]
+    if not fields or unknown:
+        raise ValueError(f"Invalid fields, expected any of: {', '.join(POKEMON_ATTRIBUTES)}")
+    return fields
@@ -0,0 +1,128 @@
+import asyncio
+import bisect
+import logging
+from collections import defaultdict
+from sqlalchemy.ext.asyncio import AsyncSession
+from palmon.database.models import pokemon_resource
+from palmon.api.queries import select_pokemon
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    """Lower-case a query or name and join words the way PokeAPI names are."""
+    return '-'.join(text.lower().replace('_', ' ').replace('-', ' ').split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """In-memory typeahead index over Pokemon names.
+
+    Prefix matches come from a sorted list of names and of the words
+    inside hyphenated names ("mime" finds "mr-mime"), searched with
+    bisect. When there are not enough of those, names sharing enough
+    trigrams with the query are added as fuzzy matches, which catches
+    typos such as "pikachoo". Lookups never touch the database; the
+    index is rebuilt whenever the data version changes.
+    """
+
+    def __init__(self, fuzzy_threshold=0.3):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.version = None
+        self._lock = asyncio.Lock()
+        self._build([])
+
+    def _build(self, pokemon):
+        self._resources = {}
+        self._ids = {}
+        self._gram_counts = {}
+        words = []
+        grams = defaultdict(set)
+        for p in pokemon:
+            self._resources[p.name] = pokemon_resource(p)
+            self._ids[p.name] = p.id
+            words.append((p.name, p.name))
+            for word in p.name.split('-')[1:]:
+                words.append((word, p.name))
+            name_grams = trigrams(p.name)
+            self._gram_counts[p.name] = len(name_grams)
+            for gram in name_grams:
+                grams[gram].add(p.name)
+        words.sort()
+        self._words = [word for word, _ in words]
+        self._names = [name for _, name in words]
+        self._grams = dict(grams)
+
+    async def refresh(self, db: AsyncSession, version):
+        """Rebuild the index from the database if ``version`` is newer."""
+        if self.version == version:
+            return
+        async with self._lock:
+            if self.version == version:
+                return
+            result = await db.execute(select_pokemon())
+            self.build(result.all(), version)
+
+    def build(self, pokemon, version):
+        """Index ``pokemon`` (rows or records with the Pokemon columns) as ``version``."""
+        self._build(pokemon)
+        self.version = version
+        logger.info(f"Built name index over {len(pokemon)} Pokemon for data version {version}")
+
+    def reset(self):
+        self.version = None
+        self._build([])
+
+    def search(self, query, limit=10):
+        """
+        Find Pokemon whose names match ``query``.
+
+        Args:
+            query: Free text typed by the user
+            limit: Maximum number of matches
+
+        Returns:
+            List of (resource dict, match kind) tuples, prefix matches first
+            (shortest name, then ID), followed by fuzzy matches by score.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        prefix = self._prefix_matches(query)
+        matches = [(name, 'prefix') for name in prefix[:limit]]
+        # Fuzzy matching on one or two letters would match almost anything
+        if len(matches) < limit and len(query) >= 3:
+            seen = set(prefix)
+            matches += [
+                (name, 'fuzzy')
+                for name in self._fuzzy_matches(query)
+                if name not in seen
+            ][:limit - len(matches)]
+
+        return [(self._resources[name], kind) for name, kind in matches]
+
+    def _prefix_matches(self, query):
+        start = bisect.bisect_left(self._words, query)
+        stop = bisect.bisect_left(self._words, query + '\uffff', lo=start)
+        names = set(self._names[start:stop])
+        return sorted(names, key=lambda name: (len(name), self._ids[name]))
+
+    def _fuzzy_matches(self, query):
+        query_grams = trigrams(query)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for name in self._grams.get(gram, ()):
+                shared[name] += 1
+
+        scored = []
+        for name, count in shared.items():
+            score = count / (len(query_grams) + self._gram_counts[name] - count)
+            if score >= self.fuzzy_threshold:
+                scored.append((-score, self._ids[name], name))
+        scored.sort()
+        return [name for _, _, name in scored]
@@ -0,0 +1,85 @@
+"""
+Production launcher for the API: uvicorn with several worker processes.
+
+Prometheus metrics live in each process's memory, so with more than one
+worker they are written to a shared multiprocess directory instead, and
+``/metrics`` aggregates every worker's samples from there.
+
+Usage:
+    python -m palmon.api.server --workers 8
+"""
+import argparse
+import logging
+import os
+import tempfile
+from pathlib import Path
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_metrics_dir(directory=None):
+    """
+    Create the multiprocess metrics directory and point workers at it.
+
+    Files left by an earlier server would be added to the new totals, so
+    they are removed. The variable must be set before the workers import
+    prometheus_client, which is why this runs before the app is imported.
+
+    Returns:
+        Path: The directory, a new temporary one if none is given.
+    """
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix='palmon-metrics-')
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob('*.db'):
+        stale.unlink()
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = str(directory)
+    return directory
+
+
+def main(argv=None):
+    import uvicorn
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Serve the PalMon API with several worker processes.")
+    parser.add_argument('--host', default=os.getenv('POKEMON_API_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('POKEMON_API_PORT', 8000)))
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('POKEMON_API_WORKERS', os.cpu_count() or 1)),
+        help="Worker processes (default: one per core)"
+    )
+    parser.add_argument(
+        '--metrics-dir',
+        default=os.getenv('PROMETHEUS_MULTIPROC_DIR'),
+        help="Directory for multiprocess metrics (default: a temporary directory)"
+    )
+    parser.add_argument('--log-level', default=os.getenv('POKEMON_API_LOG_LEVEL', 'info'))
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.workers > 1 or args.metrics_dir:
+        metrics_dir = prepare_metrics_dir(args.metrics_dir)
+        logger.info(f"Aggregating metrics of {args.workers} workers in {metrics_dir}")
+
+    # uvicorn spawns its workers, so nothing imported here is shared with
+    # them. Importing the app once anyway makes a bad configuration fail
+    # here, instead of in every worker.
+    import palmon.api.app  # noqa: F401
+
+    uvicorn.run(
+        "palmon.api.app:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
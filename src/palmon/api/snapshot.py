@@ -0,0 +1,149 @@
+import asyncio
+import bisect
+import logging
+import time
+from palmon.database.models import Pokemon
+from palmon.api.cache import read_data_version
+from palmon.api.filters import PokemonFilters
+from palmon.api.queries import select_pokemon
+from palmon.api.search import NameIndex
+
+logger = logging.getLogger(__name__)
+
+
+class PokemonRecord:
+    """Compact, read-only copy of one Pokemon row."""
+    __slots__ = ('id', 'name', 'height', 'weight', 'types', 'image_url', 'base_experience')
+
+    def __init__(self, id, name, height, weight, types, image_url, base_experience):
+        self.id = id
+        self.name = name
+        self.height = height
+        self.weight = weight
+        self.types = types
+        self.image_url = image_url
+        self.base_experience = base_experience
+
+
+class Snapshot:
+    """The whole Pokemon table at one data version, indexed by ID and name.
+
+    A snapshot is never modified after it is built; reloading builds a
+    new one and swaps it in, so a request that holds a reference always
+    sees one consistent version.
+    """
+
+    def __init__(self, records, version):
+        self.version = version
+        self.records = sorted(records, key=lambda p: p.id)
+        self.ids = [p.id for p in self.records]
+        self.by_id = {p.id: p for p in self.records}
+        by_type = {}
+        for p in self.records:
+            for type_name in (p.types.split(',') if p.types else ()):
+                by_type.setdefault(type_name, set()).add(p.id)
+        self.by_type = {name: frozenset(ids) for name, ids in by_type.items()}
+        self._orders = {'id': self.records}
+        self.name_index = NameIndex()
+        self.name_index.build(self.records, version)
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, pokemon_id):
+        return self.by_id.get(pokemon_id)
+
+    def batch(self, ids):
+        return [self.by_id.get(pokemon_id) for pokemon_id in ids]
+
+    def ordered(self, sort):
+        """All records in ``sort`` order, computed once per snapshot."""
+        records = self._orders.get(sort)
+        if records is None:
+            records = self._orders[sort] = PokemonFilters(sort=sort).sort_records(self.records)
+        return records
+
+    def select(self, filters, records=None):
+        """Records (default: all, by ID) that pass ``filters``, keeping their order."""
+        records = self.records if records is None else records
+        if filters.types:
+            ids = frozenset.intersection(*(self.by_type.get(t, frozenset()) for t in filters.types))
+            return [p for p in records if p.id in ids and filters.matches_ranges(p)]
+        return [p for p in records if filters.matches_ranges(p)]
+
+    def page(self, filters, offset, limit):
+        """``limit + 1`` records from ``offset``, like the database page query."""
+        records = self.ordered(filters.sort)
+        if filters != PokemonFilters(sort=filters.sort):
+            records = self.select(filters, records)
+        return records[offset:offset + limit + 1]
+
+    def keyset_page(self, filters, limit, after_id=None, before_id=None):
+        """Same contract as the database keyset query: (rows, has_prev, has_next)."""
+        records = self.records if filters == PokemonFilters() else self.select(filters)
+        ids = self.ids if records is self.records else [p.id for p in records]
+
+        if before_id is not None:
+            stop = bisect.bisect_left(ids, before_id)
+            rows = records[max(0, stop - limit):stop]
+            return rows, stop > limit, bool(rows) and stop < len(records)
+
+        start = 0 if after_id is None else bisect.bisect_right(ids, after_id)
+        rows = records[start:start + limit]
+        return rows, bool(rows) and start > 0, start + limit < len(records)
+
+
+class SnapshotStore:
+    """Holds the current Snapshot and hot-reloads it when the data changes.
+
+    A background task reads the data version every ``poll_interval``
+    seconds and, when the scraper has committed something new, loads the
+    table and atomically replaces ``current``. The version is read before
+    the rows, so a commit landing in between is picked up by the next
+    poll. Requests themselves never touch the database.
+    """
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self.current = None
+        self._task = None
+
+    async def load(self, session_factory):
+        """Load a fresh snapshot unless the data version is unchanged."""
+        async with session_factory() as session:
+            version = await read_data_version(session)
+            if self.current is not None and self.current.version == version:
+                return self.current
+
+            started = time.perf_counter()
+            result = await session.execute(select_pokemon().order_by(Pokemon.id))
+            records = [PokemonRecord(*row) for row in result]
+
+        self.current = Snapshot(records, version)
+        logger.info(
+            f"Loaded snapshot of {len(records)} Pokemon at data version {version} "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+        return self.current
+
+    async def start(self, session_factory):
+        await self.load(session_factory)
+        self._task = asyncio.create_task(self._poll(session_factory))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll(self, session_factory):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.load(session_factory)
+            except Exception as e:
+                # Keep serving the last good snapshot
+                logger.error(f"Error reloading snapshot: {str(e)}")
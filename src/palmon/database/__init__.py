@@ -1,9 +1,9 @@
 """Database package."""
-from palmon.database.models import AsyncSessionLocal as SessionLocal
+from palmon.database.models import ReadSessionLocal as SessionLocal
 from palmon.database.models import Base, init_db
 
 async def get_db():
-    """Dependency for getting DB sessions."""
+    """Dependency for getting read-only DB sessions for the API."""
     async with SessionLocal() as session:
         try:
             yield session
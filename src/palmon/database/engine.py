@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EngineProfile:
+    """SQLite connection settings applied to every new connection.
+
+    The defaults favour a single writer running next to many readers:
+    WAL lets readers keep going while the scraper commits, and with
+    ``synchronous=NORMAL`` a commit only has to append to the WAL. The
+    ``plain`` profile leaves SQLite's own defaults alone.
+    """
+    journal_mode: str = 'wal'
+    synchronous: str = 'normal'
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -64000  # negative values are KiB, so 64 MiB per connection
+    busy_timeout: int = 5000  # milliseconds
+    temp_store: str = 'memory'
+    read_pool_size: int = 8
+    read_max_overflow: int = 8
+    # Only used for server databases such as PostgreSQL
+    write_pool_size: int = 2
+    write_max_overflow: int = 2
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+
+    @classmethod
+    def plain(cls):
+        return cls(
+            journal_mode=None,
+            synchronous=None,
+            mmap_size=None,
+            cache_size=None,
+            busy_timeout=None,
+            temp_store=None
+        )
+
+    @classmethod
+    def from_env(cls):
+        """Build the profile named by ``DATABASE_PROFILE``, with per-setting overrides."""
+        name = os.getenv('DATABASE_PROFILE', 'tuned')
+        if name not in ('tuned', 'plain'):
+            raise ValueError(f"Unknown DATABASE_PROFILE {name!r}, expected 'tuned' or 'plain'")
+        profile = cls.plain() if name == 'plain' else cls()
+
+        for field, cast in [
+            ('journal_mode', str),
+            ('synchronous', str),
+            ('mmap_size', int),
+            ('cache_size', int),
+            ('busy_timeout', int),
+            ('temp_store', str),
+            ('read_pool_size', int),
+            ('read_max_overflow', int),
+            ('write_pool_size', int),
+            ('write_max_overflow', int),
+            ('pool_timeout', float),
+            ('pool_recycle', int),
+        ]:
+            value = os.getenv(f'DATABASE_{field.upper()}')
+            if value is not None:
+                setattr(profile, field, cast(value))
+        return profile
+
+    def pragmas(self, read_only=False, in_memory=False):
+        """PRAGMA statements to run on a new connection, in order."""
+        statements = []
+        # busy_timeout first, so that switching the journal mode waits for locks
+        if self.busy_timeout is not None:
+            statements.append(f"PRAGMA busy_timeout={int(self.busy_timeout)}")
+        if self.journal_mode and not in_memory:
+            statements.append(f"PRAGMA journal_mode={self.journal_mode}")
+        if self.synchronous:
+            statements.append(f"PRAGMA synchronous={self.synchronous}")
+        if self.mmap_size is not None:
+            statements.append(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        if self.cache_size is not None:
+            statements.append(f"PRAGMA cache_size={int(self.cache_size)}")
+        if self.temp_store:
+            statements.append(f"PRAGMA temp_store={self.temp_store}")
+        if read_only:
+            statements.append("PRAGMA query_only=ON")
+        return statements
+
+
+def create_sqlite_engine(path, profile=None, read_only=False, **kwargs):
+    """
+    Create an aiosqlite engine that applies ``profile`` on connect.
+
+    Args:
+        path: Database file, or ``:memory:``
+        profile: EngineProfile to apply, defaults to the tuned profile
+        read_only: Pool for readers (``query_only``, ``read_pool_size``
+            connections) instead of a single writer connection
+
+    Returns:
+        AsyncEngine
+    """
+    profile = profile or EngineProfile()
+    in_memory = path == ':memory:'
+    if not in_memory:
+        # aiosqlite defaults to NullPool, which opens a connection (and its
+        # thread) per checkout and re-runs the pragmas every time. Keep a
+        # pool instead; for writers a single connection serializes all
+        # writes in this process rather than fighting over SQLite's lock.
+        kwargs.setdefault('poolclass', AsyncAdaptedQueuePool)
+        kwargs.setdefault('pool_size', profile.read_pool_size if read_only else 1)
+        kwargs.setdefault('max_overflow', profile.read_max_overflow if read_only else 0)
+
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}', echo=False, **kwargs)
+    statements = profile.pragmas(read_only=read_only, in_memory=in_memory)
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    logger.debug(f"Created {'read' if read_only else 'write'} engine for {path}: {statements}")
+    return engine
+
+
+def create_postgres_engine(url, profile=None, read_only=False, **kwargs):
+    """
+    Create an asyncpg engine with a pool sized by ``profile``.
+
+    Connections are pinged on checkout and recycled periodically so that
+    replicas survive database restarts and idle-connection reaping. Read
+    engines open read-only transactions, so they can also point at a
+    streaming replica.
+    """
+    profile = profile or EngineProfile()
+    if read_only:
+        server_settings = kwargs.setdefault('connect_args', {}).setdefault('server_settings', {})
+        server_settings.setdefault('default_transaction_read_only', 'on')
+
+    kwargs.setdefault('pool_size', profile.read_pool_size if read_only else profile.write_pool_size)
+    kwargs.setdefault('max_overflow', profile.read_max_overflow if read_only else profile.write_max_overflow)
+    kwargs.setdefault('pool_timeout', profile.pool_timeout)
+    kwargs.setdefault('pool_recycle', profile.pool_recycle)
+    kwargs.setdefault('pool_pre_ping', True)
+    return create_async_engine(url, echo=False, **kwargs)
+
+
+def create_database_engine(url, profile=None, read_only=False, **kwargs):
+    """
+    Create the engine for a ``DATABASE_URL``.
+
+    ``sqlite:///path`` and ``postgresql://`` URLs get the async driver
+    (aiosqlite, asyncpg) filled in when none is given.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        return create_sqlite_engine(url.database or ':memory:', profile, read_only, **kwargs)
+    if url.get_backend_name() == 'postgresql':
+        if url.get_driver_name() != 'asyncpg':
+            url = url.set(drivername='postgresql+asyncpg')
+        return create_postgres_engine(url, profile, read_only, **kwargs)
+    raise ValueError(f"Unsupported database backend {url.get_backend_name()!r}")
+
+
+
+async def prewarm_pool(engine, connections=None):
+    """
+    Open pooled connections ahead of the first requests.
+
+    All ``connections`` (default: the pool size) are held open at the same
+    time, so each one really is a new connection, and then returned to
+    the pool. Connecting and, on SQLite, applying the pragmas then happens
+    at startup instead of in request latency.
+
+    Returns:
+        int: The number of connections opened.
+    """
+    if connections is None:
+        connections = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    barrier = asyncio.Barrier(connections)
+
+    async def hold():
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text('SELECT 1'))
+                await barrier.wait()
+        except Exception:
+            await barrier.abort()
+            raise
+
+    await asyncio.gather(*(hold() for _ in range(connections)))
+    return connections
@@ -1,8 +1,11 @@
 import os
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy import delete, event, inspect, insert, select, text
+from sqlalchemy.schema import CreateColumn
+from palmon.database.engine import EngineProfile, create_database_engine
 
 # Configure SQLAlchemy logging
 logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
@@ -14,44 +17,261 @@ class Pokemon(Base):
     
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
-    height = Column(Float)
-    weight = Column(Float)
-    types = Column(String)  # Stored as comma-separated values
+    height = Column(Float, index=True)
+    weight = Column(Float, index=True)
+    types = Column(String)  # Stored as comma-separated values, normalized in pokemon_types
     image_url = Column(String)
-    base_experience = Column(Integer)
-    
+    base_experience = Column(Integer, index=True)
+    species_id = Column(Integer, ForeignKey('species.id'), index=True)
+
+    # Linked rows are written in bulk by the scraper, so these are read-only,
+    # and never lazy loaded: queries that need them must load them eagerly.
+    stats = relationship('PokemonStat', viewonly=True, lazy='raise', order_by='PokemonStat.slot')
+    abilities = relationship('PokemonAbility', viewonly=True, lazy='raise', order_by='PokemonAbility.slot')
+    moves = relationship('PokemonMove', viewonly=True, lazy='raise', order_by='PokemonMove.move_id')
+    species = relationship('Species', viewonly=True, lazy='raise')
+
     def to_dict(self):
-        return {
-            "type": "pokemon",
-            "id": str(self.id),
-            "attributes": {
-                "name": self.name,
-                "height": self.height,
-                "weight": self.weight,
-                "types": self.types.split(',') if self.types else [],
-                "image_url": self.image_url,
-                "base_experience": self.base_experience
-            }
+        return pokemon_resource(self)
+
+# Attribute names of the Pokemon resource, in their serialized order
+POKEMON_ATTRIBUTES = ('name', 'height', 'weight', 'types', 'image_url', 'base_experience')
+
+def pokemon_resource(pokemon, fields=None):
+    """
+    JSON:API resource object for a Pokemon.
+
+    Accepts anything with the Pokemon column attributes, so ORM objects and
+    plain Core result rows serialize identically. ``fields`` restricts the
+    attributes to a sparse fieldset; only those columns are read.
+    """
+    if fields is not None:
+        attributes = {name: getattr(pokemon, name) for name in fields}
+        if 'types' in attributes:
+            attributes['types'] = attributes['types'].split(',') if attributes['types'] else []
+        return {"type": "pokemon", "id": str(pokemon.id), "attributes": attributes}
+
+    return {
+        "type": "pokemon",
+        "id": str(pokemon.id),
+        "attributes": {
+            "name": pokemon.name,
+            "height": pokemon.height,
+            "weight": pokemon.weight,
+            "types": pokemon.types.split(',') if pokemon.types else [],
+            "image_url": pokemon.image_url,
+            "base_experience": pokemon.base_experience
         }
+    }
+
+class PokemonType(Base):
+    """One row per (Pokemon, type), so type filters can use an index."""
+    __tablename__ = 'pokemon_types'
+    __table_args__ = (
+        Index('ix_pokemon_types_type_name', 'type_name', 'pokemon_id'),
+    )
+
+    pokemon_id = Column(Integer, ForeignKey('pokemon.id', ondelete='CASCADE'), primary_key=True)
+    type_name = Column(String, primary_key=True)
+    slot = Column(Integer)
+
+def type_rows(pokemon_id, types):
+    """Expand a comma-separated types string into pokemon_types rows."""
+    if not types:
+        return []
+    return [
+        {'pokemon_id': pokemon_id, 'type_name': name, 'slot': slot}
+        for slot, name in enumerate(types.split(','), start=1)
+        if name
+    ]
+
+# Keep pokemon_types in step with Pokemon.types for ORM writes. The
+# scraper's bulk upserts bypass these hooks and sync the table themselves.
+@event.listens_for(Pokemon, 'after_insert')
+@event.listens_for(Pokemon, 'after_update')
+def _sync_pokemon_types(mapper, connection, target):
+    if not inspect(target).attrs.types.history.has_changes():
+        return
+    _delete_pokemon_types(mapper, connection, target)
+    rows = type_rows(target.id, target.types)
+    if rows:
+        connection.execute(insert(PokemonType), rows)
+
+@event.listens_for(Pokemon, 'after_delete')
+def _delete_pokemon_types(mapper, connection, target):
+    # SQLite only honours ON DELETE CASCADE with foreign_keys enabled
+    connection.execute(delete(PokemonType).where(PokemonType.pokemon_id == target.id))
+
+class PokemonStat(Base):
+    """Base stat and effort yield of a Pokemon, one row per stat."""
+    __tablename__ = 'pokemon_stats'
+
+    pokemon_id = Column(Integer, ForeignKey('pokemon.id', ondelete='CASCADE'), primary_key=True)
+    stat_name = Column(String, primary_key=True)
+    slot = Column(Integer)
+    base_stat = Column(Integer)
+    effort = Column(Integer)
+
+class Ability(Base):
+    """An ability, shared by every Pokemon that can have it."""
+    __tablename__ = 'abilities'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    effect = Column(String)
+    generation = Column(String)
+
+class PokemonAbility(Base):
+    __tablename__ = 'pokemon_abilities'
+    __table_args__ = (
+        Index('ix_pokemon_abilities_ability_id', 'ability_id', 'pokemon_id'),
+    )
+
+    pokemon_id = Column(Integer, ForeignKey('pokemon.id', ondelete='CASCADE'), primary_key=True)
+    ability_id = Column(Integer, ForeignKey('abilities.id'), primary_key=True)
+    slot = Column(Integer)
+    is_hidden = Column(Boolean, nullable=False, default=False)
+
+    ability = relationship('Ability', viewonly=True, lazy='raise')
+
+class Move(Base):
+    """A move, shared by every Pokemon that can learn it."""
+    __tablename__ = 'moves'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    type_name = Column(String)
+    damage_class = Column(String)
+    power = Column(Integer)
+    accuracy = Column(Integer)
+    pp = Column(Integer)
 
-# Use aiosqlite for async SQLite support
+class PokemonMove(Base):
+    __tablename__ = 'pokemon_moves'
+    __table_args__ = (
+        Index('ix_pokemon_moves_move_id', 'move_id', 'pokemon_id'),
+    )
+
+    pokemon_id = Column(Integer, ForeignKey('pokemon.id', ondelete='CASCADE'), primary_key=True)
+    move_id = Column(Integer, ForeignKey('moves.id'), primary_key=True)
+    learn_method = Column(String)
+    level_learned_at = Column(Integer)
+
+    move = relationship('Move', viewonly=True, lazy='raise')
+
+class Species(Base):
+    """A species, shared by its default Pokemon and all of its forms."""
+    __tablename__ = 'species'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    generation = Column(String)
+    is_legendary = Column(Boolean)
+    is_mythical = Column(Boolean)
+    capture_rate = Column(Integer)
+
+# Per-Pokemon rows of the linked tables, replaced as a whole on every write
+POKEMON_LINKS = {
+    'stats': PokemonStat,
+    'abilities': PokemonAbility,
+    'moves': PokemonMove,
+}
+
+# Entities that many Pokemon link to, fetched from PokeAPI once each
+SHARED_RESOURCES = {
+    'abilities': Ability,
+    'moves': Move,
+    'species': Species,
+}
+
+@event.listens_for(Pokemon, 'after_delete')
+def _delete_pokemon_links(mapper, connection, target):
+    for model in POKEMON_LINKS.values():
+        connection.execute(delete(model).where(model.pokemon_id == target.id))
+
+class FetchState(Base):
+    """Upstream validators and payload hash of the last scraped response per URL."""
+    __tablename__ = 'fetch_state'
+
+    url = Column(String, primary_key=True)
+    etag = Column(String)
+    last_modified = Column(String)
+    content_hash = Column(String)
+    fetched_at = Column(DateTime)
+
+class ScrapeCheckpoint(Base):
+    """Per-ID progress of the current scrape run, used to resume after a crash."""
+    __tablename__ = 'scrape_checkpoint'
+
+    pokemon_id = Column(Integer, primary_key=True)
+    status = Column(String, nullable=False)  # 'done' or 'failed'
+    error = Column(String)
+    updated_at = Column(DateTime)
+
+class DataVersion(Base):
+    """Single-row counter bumped by the scraper whenever it commits new data."""
+    __tablename__ = 'data_version'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# DATABASE_URL picks the backend: SQLite through aiosqlite (the default,
+# at DATABASE_PATH) or PostgreSQL through asyncpg. Writes (the scraper,
+# init_db) and API reads use separate engines, so on SQLite a running scrape
+# never blocks the API and on PostgreSQL reads can go to a replica.
 database_path = os.getenv('DATABASE_PATH', 'pokemon.db')
-engine = create_async_engine(
-    f'sqlite+aiosqlite:///{database_path}', 
-    echo=False  # Disable SQL echoing
-)
+database_url = os.getenv('DATABASE_URL') or f'sqlite+aiosqlite:///{database_path}'
+read_database_url = os.getenv('DATABASE_READ_URL') or database_url
+engine_profile = EngineProfile.from_env()
+engine = create_database_engine(database_url, engine_profile)
+read_engine = create_database_engine(read_database_url, engine_profile, read_only=True)
 
-# Create async session factory
+# Create async session factories
 AsyncSessionLocal = sessionmaker(
     engine, 
     class_=AsyncSession, 
     expire_on_commit=False
 )
+ReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+def _create_schema(conn):
+    Base.metadata.create_all(conn)
+
+    # create_all skips tables that already exist, so add columns introduced
+    # after a database was first created, such as pokemon.species_id. They
+    # are all nullable, so a plain ADD COLUMN works on every backend.
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+    # Same for their indexes
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+    # Backfill the normalized types of databases scraped before they existed
+    has_types = conn.execute(select(PokemonType.pokemon_id).limit(1)).first()
+    if has_types is None:
+        rows = [
+            row
+            for pokemon_id, types in conn.execute(select(Pokemon.id, Pokemon.types))
+            for row in type_rows(pokemon_id, types)
+        ]
+        if rows:
+            conn.execute(insert(PokemonType), rows)
 
 async def init_db():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_schema)
 
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with ReadSessionLocal() as session:
         yield session 
\ No newline at end of file
@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: bytes
+    etag: str = None
+    last_modified: str = None
+    stored_at: float = 0.0
+
+
+class ResponseCache:
+    """On-disk cache of raw upstream responses.
+
+    Entries are content-addressed by the SHA-256 of their URL and stored
+    gzip-compressed as ``<directory>/<key[:2]>/<key>.gz``: one JSON header
+    line (URL, validators, store time) followed by the raw response body.
+    Reads bump the file's mtime, and once the cache grows past
+    ``max_bytes`` the least recently used files are evicted.
+
+    All methods block on disk I/O; call them through ``asyncio.to_thread``
+    from async code.
+    """
+
+    def __init__(self, directory, ttl=86400.0, max_bytes=512 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.gz"
+
+    def get(self, url, allow_stale=False):
+        """Return the cached response for ``url``, or None if missing or expired."""
+        path = self._path(self.key(url))
+        try:
+            entry = self._read(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {path}: {str(e)}")
+            self._remove(path)
+            return None
+
+        if not allow_stale and not self.is_fresh(entry):
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def is_fresh(self, entry):
+        """Whether ``entry`` is still within the TTL."""
+        return not self.ttl or time.time() - entry.stored_at <= self.ttl
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store a response body, evicting old entries if over the size budget."""
+        path = self._path(self.key(url))
+        header = json.dumps({
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time()
+        }).encode()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, 'wb', compresslevel=6) as f:
+            f.write(header + b'\n' + body)
+
+        with self._lock:
+            size = self._total_size()
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._size = size - previous + path.stat().st_size
+            if self.max_bytes and self._size > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url, etag=None, last_modified=None):
+        """
+        Restart the TTL of ``url`` after upstream confirmed it unchanged (304).
+
+        The body is kept; the validators are replaced by the ones given,
+        falling back to the stored ones. Returns False if nothing is cached.
+        """
+        path = self._path(self.key(url))
+        try:
+            entry = self._read(path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {path}: {str(e)}")
+            self._remove(path)
+            return False
+        self.put(url, entry.body, etag or entry.etag, last_modified or entry.last_modified)
+        return True
+
+    def urls(self):
+        """Yield the URL of every cached response, ignoring TTL."""
+        for path in self.directory.glob('*/*.gz'):
+            try:
+                with gzip.open(path, 'rb') as f:
+                    yield json.loads(f.readline())['url']
+            except (OSError, ValueError, KeyError):
+                continue
+
+    def _read(self, path):
+        with gzip.open(path, 'rb') as f:
+            header, _, body = f.read().partition(b'\n')
+        meta = json.loads(header)
+        return CachedResponse(
+            url=meta['url'],
+            body=body,
+            etag=meta.get('etag'),
+            last_modified=meta.get('last_modified'),
+            stored_at=meta.get('stored_at', 0.0)
+        )
+
+    def _total_size(self):
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.directory.glob('*/*.gz'))
+        return self._size
+
+    def _evict(self):
+        files = sorted(
+            (p.stat().st_mtime, p.stat().st_size, p)
+            for p in self.directory.glob('*/*.gz')
+        )
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in files:
+            if self._size <= target:
+                break
+            self._remove(path)
+            self._size -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} cached responses, cache is now {self._size} bytes")
+
+    def _remove(self, path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -1,21 +1,136 @@
+import argparse
 import asyncio
+import hashlib
+import importlib.util
+import json
 import httpx
 import logging
 import traceback
 import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from dotenv import load_dotenv
-from sqlalchemy import select
+from prometheus_client import Counter, start_http_server
+from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from palmon.database.models import Pokemon, AsyncSessionLocal, init_db
+from palmon.database.models import (
+    Pokemon,
+    Ability,
+    Move,
+    Species,
+    FetchState,
+    ScrapeCheckpoint,
+    AsyncSessionLocal,
+    SHARED_RESOURCES,
+    init_db
+)
+from palmon.scraper.sources import CachedPokemon, PokemonListing, id_from_url, parse_id_spec
+from palmon.scraper.cache import ResponseCache
+from palmon.scraper.retry import RetryPolicy, CircuitBreaker
+from palmon.scraper.scheduler import FetchScheduler, PRIORITY_POKEMON, PRIORITY_RESOURCE
+from palmon.scraper.shards import ShardPool, deal_ids
+from palmon.scraper.stats import ScrapeStats
+from palmon.scraper.throttle import AdaptiveLimiter, THROTTLE_STATUS_CODES, parse_retry_after
+from palmon.scraper.writer import BatchWriter, WriteItem
 
         # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying: throttling and transient upstream errors.
+RETRY_STATUS_CODES = THROTTLE_STATUS_CODES
+
+scraper_retries = Counter(
+    'pokemon_scraper_retries_total',
+    'Requests retried by the scraper after a transient failure'
+)
+
+scraper_throttled = Counter(
+    'pokemon_scraper_throttled_total',
+    'Responses with status 429 received by the scraper'
+)
+
+scraper_breaker_opened = Counter(
+    'pokemon_scraper_breaker_open_total',
+    'Times the scraper circuit breaker opened'
+)
+
+# PokeAPI path of each shared resource, and a column that only a fetched
+# resource fills in: rows where it is NULL are stubs still to be resolved
+RESOURCE_PATHS = {
+    'abilities': 'ability',
+    'moves': 'move',
+    'species': 'pokemon-species',
+}
+RESOLVED_COLUMNS = {
+    'abilities': Ability.generation,
+    'moves': Move.type_name,
+    'species': Species.generation,
+}
+
+
+def utcnow():
+    """The current UTC time, naive to match the timezone-less DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    data: dict = None
+    etag: str = None
+    last_modified: str = None
+    content_hash: str = None
+
 class PokemonScraper:
-    def __init__(self, session: AsyncSession = None):
+    def __init__(
+        self,
+        session: AsyncSession = None,
+        http2=False,
+        retry: RetryPolicy = None,
+        breaker: CircuitBreaker = None,
+        cache: ResponseCache = None,
+        offline=False
+    ):
         self.base_url = "https://pokeapi.co/api/v2"
         self._db = session
+        self.http2 = http2
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.limiter = AdaptiveLimiter()
+        # Limiters of hosts other than PokeAPI's, which uses self.limiter
+        self.limiters = {}
+        self.stats = ScrapeStats()
+        # Raw response cache; with offline=True it is the only source of data
+        self.cache = cache
+        self.offline = offline
+
+    def options(self):
+        """Picklable constructor options, to build the same scraper in another process."""
+        return {
+            'http2': self.http2,
+            'retry': self.retry,
+            'breaker': {
+                'failure_threshold': self.breaker.failure_threshold,
+                'reset_timeout': self.breaker.reset_timeout
+            },
+            'cache': {
+                'directory': str(self.cache.directory),
+                'ttl': self.cache.ttl,
+                'max_bytes': self.cache.max_bytes
+            } if self.cache is not None else None,
+            'offline': self.offline
+        }
+
+    @classmethod
+    def from_options(cls, options):
+        """Build a scraper, without a database session, from ``options()``."""
+        options = dict(options)
+        options['breaker'] = CircuitBreaker(**options['breaker'])
+        if options['cache'] is not None:
+            options['cache'] = ResponseCache(**options['cache'])
+        return cls(**options)
 
     @property
     async def session(self) -> AsyncSession:
@@ -23,115 +138,858 @@ class PokemonScraper:
             self._db = AsyncSessionLocal()
         return self._db
 
-    async def fetch_pokemon(self, client, pokemon_id):
+    def limiter_for(self, url):
+        """The concurrency limiter shared by every request to ``url``'s host."""
+        host = httpx.URL(url).host
+        if host == httpx.URL(self.base_url).host:
+            return self.limiter
+        limiter = self.limiters.get(host)
+        if limiter is None:
+            limiter = self.limiters[host] = AdaptiveLimiter(
+                initial=self.limiter.limit, maximum=self.limiter.maximum
+            )
+        return limiter
+
+    def create_client(self, max_connections=50):
+        """Create the single pooled HTTP client shared by every fetch."""
+        http2 = self.http2
+        if http2 and importlib.util.find_spec('h2') is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(10.0, connect=5.0)
+        )
+
+    async def fetch_resource(self, client, url, state=None):
+        """
+        Fetch a PokeAPI resource, conditionally when validators are known.
+
+        Transport errors, 429 and 5xx responses are retried with jittered
+        exponential backoff (honouring Retry-After) and count towards the
+        circuit breaker. With a response cache configured, fresh cached
+        bodies are served without touching the network, validators are
+        only sent for URLs the cache holds a body for, and in offline mode
+        the cache is the only source.
+
+        Args:
+            client (httpx.AsyncClient): Client to send the request with
+            url (str): Resource URL
+            state (dict): Previous ``fetch_state`` row for the URL, if any
+
+        Returns:
+            FetchResult: The response, or None if the request failed.
+        """
         try:
-            response = await client.get(f"{self.base_url}/pokemon/{pokemon_id}")
+            cached = None
+            if self.cache is not None:
+                cached = await asyncio.to_thread(self.cache.get, url, True)
+                if cached is not None and (self.offline or self.cache.is_fresh(cached)):
+                    self.stats.cache_hits += 1
+                    return FetchResult(
+                        url,
+                        200,
+                        data=json.loads(cached.body),
+                        etag=cached.etag,
+                        last_modified=cached.last_modified,
+                        content_hash=hashlib.sha256(cached.body).hexdigest()
+                    )
+
+            if self.offline:
+                logger.warning(f"No cached response for {url} in offline mode")
+                return None
+
+            # A 304 is only useful if the cache holds the body it confirms;
+            # otherwise ask for the body so the cache gets filled.
+            headers = {}
+            if state and (self.cache is None or cached is not None):
+                if state.get('etag'):
+                    headers['If-None-Match'] = state['etag']
+                if state.get('last_modified'):
+                    headers['If-Modified-Since'] = state['last_modified']
+
+            response = await self._send_with_retries(client, url, headers)
+            if response is None:
+                return None
             logger.debug(f"Response status: {response.status_code}")
-            
+
+            if response.status_code == 304:
+                if self.cache is not None:
+                    await asyncio.to_thread(
+                        self.cache.refresh,
+                        url,
+                        response.headers.get('ETag'),
+                        response.headers.get('Last-Modified')
+                    )
+                return FetchResult(url, 304, etag=state.get('etag'), last_modified=state.get('last_modified'))
+
             if response.status_code != 200:
-                logger.warning(f"Error: Got status code {response.status_code} for Pokémon ID {pokemon_id}")
+                logger.warning(f"Error: Got status code {response.status_code} for {url}")
                 return None
-            
-            return response.json()
+
+            result = FetchResult(
+                url,
+                200,
+                data=response.json(),
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+                content_hash=hashlib.sha256(response.content).hexdigest()
+            )
+            if self.cache is not None:
+                await asyncio.to_thread(
+                    self.cache.put, url, response.content, result.etag, result.last_modified
+                )
+            return result
         except Exception as e:
             logger.error(
-                f"Error fetching Pokémon ID {pokemon_id}: {str(e)}\n{traceback.format_exc()}"
+                f"Error fetching {url}: {str(e)}\n{traceback.format_exc()}"
             )
             return None
 
-    async def scrape_pokemon(self, limit=151, concurrency=10):
+    async def _send_with_retries(self, client, url, headers):
+        """Send a GET, retrying retryable failures; None once retries run out."""
+        for attempt in range(self.retry.max_retries + 1):
+            opened = self.breaker.opened_count
+            probe = await self.breaker.wait()
+
+            response = None
+            retry_after = None
+            limiter = self.limiter_for(url)
+            try:
+                async with limiter.slot() as slot:
+                    try:
+                        response = await client.get(url, headers=headers)
+                    except httpx.HTTPError as e:
+                        limiter.record(slot)
+                        error = str(e) or type(e).__name__
+                    except Exception:
+                        limiter.record(slot)
+                        self.breaker.record_failure()
+                        raise
+                    else:
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        limiter.record(slot, response.status_code, retry_after)
+            except BaseException:
+                # Cancelled mid-request: the probe has no outcome to record
+                if probe:
+                    self.breaker.release_probe()
+                raise
+
+            if response is not None and response.status_code not in RETRY_STATUS_CODES:
+                self.breaker.record_success()
+                return response
+
+            if response is not None and response.status_code == 429:
+                # Throttled, but upstream is alive: not a breaker failure.
+                self.stats.throttled += 1
+                scraper_throttled.inc()
+                self.breaker.record_success()
+                error = "429 Too Many Requests"
+            else:
+                self.breaker.record_failure()
+                if response is not None:
+                    error = f"status code {response.status_code}"
+
+            if self.breaker.opened_count > opened:
+                self.stats.breaker_opened += 1
+                scraper_breaker_opened.inc()
+
+            if attempt == self.retry.max_retries:
+                logger.warning(f"Giving up on {url} after {attempt + 1} attempts: {error}")
+                return response
+
+            delay = self.retry.delay(attempt, retry_after)
+            self.stats.retries += 1
+            scraper_retries.inc()
+            logger.info(f"Retrying {url} in {delay:.2f}s after {error}")
+            await asyncio.sleep(delay)
+
+    async def fetch_pokemon(self, client, pokemon_id):
+        result = await self.fetch_resource(client, self.pokemon_url(pokemon_id))
+        return result.data if result is not None else None
+
+    def pokemon_url(self, pokemon_id):
+        return f"{self.base_url}/pokemon/{pokemon_id}"
+
+    async def load_fetch_state(self, session):
+        """Load known validators keyed by URL, plus the IDs already stored."""
+        result = await session.execute(
+            select(
+                FetchState.url,
+                FetchState.etag,
+                FetchState.last_modified,
+                FetchState.content_hash
+            )
+        )
+        states = {row.url: row._asdict() for row in result}
+        result = await session.execute(select(Pokemon.id))
+        return states, set(result.scalars())
+
+    async def load_unresolved(self, session, resolve):
+        """
+        Find the shared resources in ``resolve`` that are still stubs.
+
+        Returns ``{name: {url: stub}}`` like ``parse_links``. These are
+        resolved again whatever the validators of the Pokemon linking to
+        them say, since an unchanged Pokemon does not queue its refs.
+        """
+        unresolved = {}
+        for name in resolve:
+            model = SHARED_RESOURCES[name]
+            result = await session.execute(
+                select(model.id, model.name).where(RESOLVED_COLUMNS[name].is_(None))
+            )
+            unresolved[name] = {
+                f"{self.base_url}/{RESOURCE_PATHS[name]}/{row.id}/": {'id': row.id, 'name': row.name}
+                for row in result
+            }
+        return unresolved
+
+    def parse_pokemon(self, data):
+        """Turn a PokeAPI /pokemon payload into a row for the pokemon table."""
+        species = data.get('species')
+        return {
+            'id': data['id'],
+            'name': data['name'],
+            'height': data['height'] / 10,
+            'weight': data['weight'] / 10,
+            'types': ','.join(t['type']['name'] for t in data['types']),
+            'image_url': data['sprites']['front_default'],
+            'base_experience': data['base_experience'],
+            'species_id': id_from_url(species['url']) if species else None
+        }
+
+    def parse_links(self, data):
+        """
+        Split the nested lists of a /pokemon payload into linked rows.
+
+        Returns ``(links, refs)``: the pokemon_stats, pokemon_abilities and
+        pokemon_moves rows, and per shared resource a ``{url: stub}`` dict
+        of the abilities, moves and species they refer to.
+        """
+        pokemon_id = data['id']
+        refs = {name: {} for name in SHARED_RESOURCES}
+
+        def ref(name, resource):
+            resource_id = id_from_url(resource['url'])
+            refs[name][resource['url']] = {'id': resource_id, 'name': resource['name']}
+            return resource_id
+
+        stats = [
+            {
+                'pokemon_id': pokemon_id,
+                'stat_name': entry['stat']['name'],
+                'slot': slot,
+                'base_stat': entry['base_stat'],
+                'effort': entry['effort']
+            }
+            for slot, entry in enumerate(data.get('stats', ()), start=1)
+        ]
+        abilities = [
+            {
+                'pokemon_id': pokemon_id,
+                'ability_id': ref('abilities', entry['ability']),
+                'slot': entry['slot'],
+                'is_hidden': entry['is_hidden']
+            }
+            for entry in data.get('abilities', ())
+        ]
+        moves = {}
+        for entry in data.get('moves', ()):
+            move_id = ref('moves', entry['move'])
+            # The most recent version group is listed last
+            details = entry['version_group_details'][-1] if entry.get('version_group_details') else {}
+            moves[move_id] = {
+                'pokemon_id': pokemon_id,
+                'move_id': move_id,
+                'learn_method': details.get('move_learn_method', {}).get('name'),
+                'level_learned_at': details.get('level_learned_at')
+            }
+        if data.get('species'):
+            ref('species', data['species'])
+
+        links = {'stats': stats, 'abilities': abilities, 'moves': list(moves.values())}
+        return links, refs
+
+    def parse_resource(self, name, data):
+        """Turn an /ability, /move or /pokemon-species payload into its row."""
+        if name == 'abilities':
+            effects = [e for e in data.get('effect_entries', ()) if e['language']['name'] == 'en']
+            return {
+                'id': data['id'],
+                'name': data['name'],
+                'effect': effects[0]['short_effect'] if effects else None,
+                'generation': data['generation']['name']
+            }
+        if name == 'moves':
+            return {
+                'id': data['id'],
+                'name': data['name'],
+                'type_name': data['type']['name'],
+                'damage_class': data['damage_class']['name'] if data.get('damage_class') else None,
+                'power': data['power'],
+                'accuracy': data['accuracy'],
+                'pp': data['pp']
+            }
+        return {
+            'id': data['id'],
+            'name': data['name'],
+            'generation': data['generation']['name'],
+            'is_legendary': data['is_legendary'],
+            'is_mythical': data['is_mythical'],
+            'capture_rate': data['capture_rate']
+        }
+
+    async def scrape_pokemon(
+        self,
+        limit=151,
+        concurrency=10,
+        batch_size=100,
+        flush_interval=1.0,
+        max_concurrency=None,
+        ids=None,
+        resume=False,
+        force=False,
+        resolve=tuple(SHARED_RESOURCES),
+        processes=1
+    ):
         """
         Scrape Pokemon data from the API.
+
+        IDs flow through bounded queues: a producer feeds the ID source to
+        a pool of fetch workers, a transform stage turns payloads into
+        rows, and a single writer upserts them in batches. Memory stays
+        flat regardless of how many IDs the source yields, and a failing
+        ID is recorded in the returned stats instead of aborting the run.
+
+        Abilities, moves and species are shared by many Pokemon. The
+        transform stage hands each one it has not seen before to a pool
+        of resolve workers, so every shared resource is fetched at most
+        once per run, and not at all if a previous run already stored it.
+
+        With ``processes`` above 1, fetching and parsing Pokemon moves to
+        that many worker processes, each scraping a shard of the IDs with
+        an equal share of the concurrency budget. This process still
+        resolves shared resources and is the only writer.
         
         Args:
-            limit (int): Number of Pokemon to scrape (default: 151)
-            concurrency (int): Number of concurrent requests (default: 10)
+            limit (int): Number of Pokemon to scrape when no ``ids`` are
+                given (default: 151)
+            concurrency (int): Initial number of concurrent requests (default: 10)
+            batch_size (int): Rows per upsert batch (default: 100)
+            flush_interval (float): Max seconds a partial batch waits before
+                being written (default: 1.0)
+            max_concurrency (int): Ceiling for the adaptive concurrency
+                controller, and the number of fetch workers
+                (default: max(concurrency, 50))
+            ids: Where to take IDs from instead of ``range(1, limit + 1)``:
+                any iterable or async iterable of ints, or a source with an
+                ``iter_ids(scraper, client)`` method such as PokemonListing.
+            resume (bool): Continue the previous run, skipping IDs that the
+                checkpoint journal already marks as done. Without it the
+                journal is reset and every ID is scraped (default: False)
+            force (bool): Ignore stored validators and payload hashes and
+                rewrite every row, e.g. when rebuilding from the response
+                cache after a schema change (default: False)
+            resolve: Shared resources to fetch the details of, any of
+                ``abilities``, ``moves`` and ``species``. Unresolved ones
+                are still linked, by ID and name (default: all)
+            processes (int): Worker processes to fetch and parse Pokemon
+                in. The ID source is read up front to shard it (default: 1)
+
+        Returns:
+            ScrapeStats: Row counts, failures and timings for the run.
         """
         # Ensure we have valid values for limit and concurrency
         limit = limit if limit is not None else 151
         concurrency = concurrency if concurrency is not None else 10
+        batch_size = batch_size if batch_size is not None else 100
+        flush_interval = flush_interval if flush_interval is not None else 1.0
+        max_concurrency = max_concurrency if max_concurrency is not None else max(concurrency, 50)
+        ids = ids if ids is not None else range(1, limit + 1)
 
-        sem = asyncio.Semaphore(concurrency)
-        client_pool = []
+        self.limiter = AdaptiveLimiter(initial=concurrency, maximum=max_concurrency)
+        stats = self.stats = ScrapeStats()
+        session = await self.session
+        states, existing_ids = await self.load_fetch_state(session)
+        if force:
+            states = {}
+        done_ids = await self.load_checkpoint(session, resume)
+        writer = BatchWriter(session, stats, batch_size, flush_interval)
 
-        logger.info(f"Starting Pokemon scraper with limit={limit}, concurrency={concurrency}")
+        id_queue = asyncio.Queue(maxsize=max_concurrency)
+        result_queue = asyncio.Queue(maxsize=max_concurrency)
+        resource_queue = asyncio.Queue(maxsize=max_concurrency)
+        write_queue = asyncio.Queue(maxsize=batch_size * 2)
+        resolve = [name for name in SHARED_RESOURCES if name in (resolve or ())]
+        processes = max(1, processes)
+        unresolved = await self.load_unresolved(session, resolve)
 
-        # Create a pool of clients
-        for _ in range(concurrency):
-            client = httpx.AsyncClient(
-                limits=httpx.Limits(max_keepalive_connections=1),
-                timeout=httpx.Timeout(10.0, connect=5.0)
-            )
-            client_pool.append(client)
+        logger.info(
+            f"Starting Pokemon scraper with concurrency={concurrency}, "
+            f"max_concurrency={max_concurrency}, batch_size={batch_size}, "
+            f"flush_interval={flush_interval}, processes={processes}"
+        )
 
-        try:
-            async def process_pokemon(pokemon_id):
-                # Use provided session if available, otherwise create new one
-                if self._db is not None:
-                    db = self._db
+        async with (
+            self.create_client(max_connections=max_concurrency) as client,
+            FetchScheduler(
+                lambda url, state: self.fetch_resource(client, url, state),
+                workers=max_concurrency
+            ) as scheduler
+        ):
+            async def emit(item, refs):
+                await write_queue.put(item)
+                if refs:
+                    await self._queue_resources(refs, resolve, states, scheduler, resource_queue, stats)
+
+            async def transform_stage():
+                # Stubs left by earlier runs; their stored validators are
+                # ignored so a failed resolve is retried
+                await self._queue_resources(unresolved, resolve, {}, scheduler, resource_queue, stats)
+                if processes > 1:
+                    await self._scrape_shards(
+                        client, ids, processes, done_ids, states, existing_ids,
+                        concurrency, max_concurrency, batch_size * 2, emit, stats
+                    )
                 else:
-                    db = AsyncSessionLocal()
+                    await self._transform(result_queue, emit, existing_ids, stats)
+                for _ in range(max_concurrency):
+                    await resource_queue.put(None)
 
-                async with sem:
-                    # Get a client from the pool
-                    client = client_pool[pokemon_id % concurrency]
-                    try:
-                        data = await self.fetch_pokemon(client, pokemon_id)
-                        if data is None:
-                            return
-
-                        pokemon = Pokemon(
-                            id=data['id'],
-                            name=data['name'],
-                            height=data['height'] / 10,
-                            weight=data['weight'] / 10,
-                            types=','.join(t['type']['name'] for t in data['types']),
-                            image_url=data['sprites']['front_default'],
-                            base_experience=data['base_experience']
+            async def resolve_stage():
+                await asyncio.gather(*(
+                    self._resolve_worker(resource_queue, write_queue, stats)
+                    for _ in range(max_concurrency)
+                ))
+                await write_queue.put(None)
+
+            try:
+                async with asyncio.TaskGroup() as group:
+                    if processes == 1:
+                        group.create_task(
+                            self._produce(client, ids, id_queue, max_concurrency, done_ids, stats)
                         )
+                        group.create_task(self._fetch_stage(
+                            scheduler, id_queue, result_queue, states, stats, max_concurrency
+                        ))
+                    group.create_task(transform_stage())
+                    group.create_task(resolve_stage())
+                    group.create_task(writer.run(write_queue))
+            except* Exception as errors:
+                # Only infrastructure failures (the ID source or the
+                # database) end up here; per-ID errors are in stats.failures.
+                raise errors.exceptions[0]
+
+            stats.requests += scheduler.requests
+            stats.deduplicated += scheduler.deduplicated
+
+        stats.finish()
+        stats.final_concurrency = self.limiter.limit
+        logger.info(f"Scrape finished: {stats.summary()}")
+        if stats.failures:
+            logger.warning(f"Failed Pokemon IDs and resources: {sorted(stats.failures, key=str)}")
+        return stats
+
+    async def scrape_shard(self, ids, states, existing_ids, concurrency, max_concurrency, emit):
+        """
+        Fetch and parse a shard of IDs, without touching the database.
 
-                        stmt = select(Pokemon).where(Pokemon.id == pokemon.id)
-                        result = await db.execute(stmt)
-                        existing = result.scalar_one_or_none()
+        This is what a worker process of a multi-process scrape runs.
+        ``emit(item, refs)`` receives what the transform stage produces;
+        the parent resolves shared resources and writes.
 
-                        if existing:
-                            await db.delete(existing)
+        Returns:
+            ScrapeStats: The shard's fetch and parse counters.
+        """
+        self.limiter = AdaptiveLimiter(initial=concurrency, maximum=max_concurrency)
+        stats = self.stats = ScrapeStats()
+        id_queue = asyncio.Queue(maxsize=max_concurrency)
+        result_queue = asyncio.Queue(maxsize=max_concurrency)
 
-                        db.add(pokemon)
-                        await db.commit()
-                        logger.info(f"Scraped Pokémon: {pokemon.name}")
+        async with (
+            self.create_client(max_connections=max_concurrency) as client,
+            FetchScheduler(
+                lambda url, state: self.fetch_resource(client, url, state),
+                workers=max_concurrency
+            ) as scheduler
+        ):
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._produce(client, ids, id_queue, max_concurrency, set(), stats))
+                group.create_task(self._fetch_stage(
+                    scheduler, id_queue, result_queue, states, stats, max_concurrency
+                ))
+                group.create_task(self._transform(result_queue, emit, existing_ids, stats))
+            stats.requests += scheduler.requests
+            stats.deduplicated += scheduler.deduplicated
 
-                    except Exception as e:
-                        await db.rollback()  # Rollback on error
-                        logger.error(f"Error processing Pokemon {pokemon_id}: {str(e)}")
-                        raise  # Re-raise the exception for the test to catch
+        stats.finish()
+        stats.final_concurrency = self.limiter.limit
+        return stats
 
-            # Create and run tasks
-            tasks = (
-                process_pokemon(pokemon_id)
-                for pokemon_id in range(1, limit + 1)
+    async def load_checkpoint(self, session, resume):
+        """Return the IDs already done when resuming; otherwise reset the journal."""
+        if resume:
+            result = await session.execute(
+                select(ScrapeCheckpoint.pokemon_id).where(ScrapeCheckpoint.status == 'done')
             )
-            await asyncio.gather(*tasks)
+            done_ids = set(result.scalars())
+            logger.info(f"Resuming scrape, {len(done_ids)} Pokemon already done")
+            return done_ids
+
+        await session.execute(delete(ScrapeCheckpoint))
+        await session.commit()
+        return set()
+
+    def checkpoint(self, pokemon_id, error=None):
+        return {
+            'pokemon_id': pokemon_id,
+            'status': 'failed' if error else 'done',
+            'error': error,
+            'updated_at': utcnow()
+        }
+
+    async def iter_ids(self, client, ids):
+        """Iterate an ID source: an iterable, an async iterable or a source with ``iter_ids``."""
+        if hasattr(ids, 'iter_ids'):
+            ids = ids.iter_ids(self, client)
+
+        if hasattr(ids, '__aiter__'):
+            async for pokemon_id in ids:
+                yield pokemon_id
+        else:
+            for pokemon_id in ids:
+                yield pokemon_id
+
+    async def _produce(self, client, ids, id_queue, workers, done_ids, stats):
+        """Feed IDs from the source into the bounded ID queue."""
+        async for pokemon_id in self.iter_ids(client, ids):
+            if pokemon_id in done_ids:
+                stats.resumed += 1
+            else:
+                await id_queue.put(pokemon_id)
+
+        for _ in range(workers):
+            await id_queue.put(None)
+
+    async def _fetch_stage(self, scheduler, id_queue, result_queue, states, stats, workers):
+        """Run the fetch workers, then mark the end of the results."""
+        await asyncio.gather(*(
+            self._fetch_worker(scheduler, id_queue, result_queue, states, stats)
+            for _ in range(workers)
+        ))
+        await result_queue.put(None)
+
+    async def _fetch_worker(self, scheduler, id_queue, result_queue, states, stats):
+        """Fetch IDs until the producer signals the end of the source."""
+        while True:
+            pokemon_id = await id_queue.get()
+            if pokemon_id is None:
+                return
+
+            url = self.pokemon_url(pokemon_id)
+            if scheduler.seen(url):
+                # The same ID twice in the source: the first one writes it
+                stats.deduplicated += 1
+                continue
+            state = states.get(url)
+            result = await scheduler.fetch(url, PRIORITY_POKEMON, state)
+            await result_queue.put((pokemon_id, state, result))
+
+    async def _scrape_shards(
+        self,
+        client,
+        ids,
+        processes,
+        done_ids,
+        states,
+        existing_ids,
+        concurrency,
+        max_concurrency,
+        queue_size,
+        emit,
+        stats
+    ):
+        """
+        Fetch and parse the IDs in worker processes, emitting their items.
+
+        The ID source is read up front and dealt out to ``processes``
+        shards, each with its stored validators and an equal share of the
+        concurrency budget. The shards' counters are added to ``stats``.
+        """
+        unique_ids = {}
+        async for pokemon_id in self.iter_ids(client, ids):
+            if pokemon_id in done_ids:
+                stats.resumed += 1
+            elif pokemon_id in unique_ids:
+                stats.deduplicated += 1
+            else:
+                unique_ids[pokemon_id] = None
 
+        shards = []
+        for shard_ids in deal_ids(list(unique_ids), processes):
+            urls = (self.pokemon_url(pokemon_id) for pokemon_id in shard_ids)
+            shards.append((
+                shard_ids,
+                {url: states[url] for url in urls if url in states},
+                existing_ids.intersection(shard_ids)
+            ))
+
+        pool = ShardPool(queue_size=queue_size)
+        try:
+            pool.start(
+                type(self),
+                self.options(),
+                shards,
+                max(1, concurrency // processes),
+                max(1, max_concurrency // processes)
+            )
+            async for item, refs in pool.items():
+                await emit(item, refs)
         finally:
-            # Clean up clients
-            for client in client_pool:
-                await client.aclose()
+            await asyncio.to_thread(pool.stop)
+
+        for shard_stats in pool.stats:
+            stats.merge(shard_stats)
+            # The shards' own metrics die with their processes
+            scraper_retries.inc(shard_stats.retries)
+            scraper_throttled.inc(shard_stats.throttled)
+            scraper_breaker_opened.inc(shard_stats.breaker_opened)
+
+    def prepare(self, pokemon_id, state, result, existing_ids, stats):
+        """
+        Turn a fetch result into the write item for the batch writer.
+
+        This is the CPU-bound part of a scrape. Returns ``(item, refs)``,
+        where ``refs`` maps SHARED_RESOURCES names to the ``{url: stub}``
+        the Pokemon refers to, or is None if no payload was parsed.
+        """
+        if result is None:
+            stats.failures[pokemon_id] = "fetch failed"
+            return WriteItem(checkpoint=self.checkpoint(pokemon_id, "fetch failed")), None
+
+        if result.status_code == 304:
+            stats.skipped += 1
+            logger.debug(f"Pokemon {pokemon_id} not modified upstream")
+            return WriteItem(checkpoint=self.checkpoint(pokemon_id)), None
+
+        new_state = {
+            'url': result.url,
+            'etag': result.etag,
+            'last_modified': result.last_modified,
+            'content_hash': result.content_hash,
+            'fetched_at': utcnow()
+        }
+
+        if state and state['content_hash'] == result.content_hash:
+            stats.skipped += 1
+            # Same payload under new validators: refresh them so the
+            # next run can be answered with a 304 again.
+            if (state['etag'], state['last_modified']) == (result.etag, result.last_modified):
+                new_state = None
+            return WriteItem(state=new_state, checkpoint=self.checkpoint(pokemon_id)), None
+
+        try:
+            row = self.parse_pokemon(result.data)
+            links, refs = self.parse_links(result.data)
+        except Exception as e:
+            logger.error(f"Error processing Pokemon {pokemon_id}: {str(e)}")
+            error = f"invalid payload: {str(e)}"
+            stats.failures[pokemon_id] = error
+            return WriteItem(checkpoint=self.checkpoint(pokemon_id, error)), None
 
-        return True
+        if row['id'] in existing_ids:
+            stats.updated += 1
+        else:
+            stats.new += 1
+
+        logger.info(f"Scraped Pokémon: {row['name']}")
+        item = WriteItem(
+            row=row,
+            state=new_state,
+            checkpoint=self.checkpoint(pokemon_id),
+            links=links,
+            refs={name: list(stubs.values()) for name, stubs in refs.items()}
+        )
+        return item, refs
+
+    async def _transform(self, result_queue, emit, existing_ids, stats):
+        """Prepare fetched payloads and ``emit(item, refs)`` them, in fetch order."""
+        while True:
+            item = await result_queue.get()
+            if item is None:
+                return
+
+            pokemon_id, state, result = item
+            await emit(*self.prepare(pokemon_id, state, result, existing_ids, stats))
+
+    async def _queue_resources(self, refs, resolve, known_urls, scheduler, resource_queue, stats):
+        """
+        Submit the shared resources in ``resolve`` that ``refs`` point at.
+
+        Each URL is submitted to the scheduler the first time it is
+        referenced, unless it is in ``known_urls``, and handed to the
+        resolve workers. Every further reference only counts as
+        deduplicated.
+        """
+        for name in resolve:
+            for url in refs[name]:
+                if url in known_urls or scheduler.seen(url):
+                    stats.deduplicated += 1
+                    continue
+                future = scheduler.submit(url, PRIORITY_RESOURCE)
+                await resource_queue.put((name, url, future))
+
+    async def _resolve_worker(self, resource_queue, write_queue, stats):
+        """Write shared resources as their fetches complete, until the transform stage is done."""
+        while True:
+            item = await resource_queue.get()
+            if item is None:
+                return
+
+            name, url, future = item
+            result = await future
+            if result is None:
+                # The stub written with the Pokemon stays in place and is
+                # queued again by the next run
+                logger.warning(f"Could not resolve {url}")
+                stats.failures[url] = "resolve failed"
+                continue
+            try:
+                row = self.parse_resource(name, result.data)
+            except Exception as e:
+                logger.error(f"Error processing {url}: {str(e)}")
+                stats.failures[url] = f"invalid payload: {str(e)}"
+                continue
+
+            stats.resolved += 1
+            await write_queue.put(WriteItem(
+                state={
+                    'url': result.url,
+                    'etag': result.etag,
+                    'last_modified': result.last_modified,
+                    'content_hash': result.content_hash,
+                    'fetched_at': utcnow()
+                },
+                resources={name: [row]}
+            ))
 
 if __name__ == "__main__":
     async def main():
         # Load environment variables
         load_dotenv()
 
+        parser = argparse.ArgumentParser(description="Scrape Pokemon data from PokeAPI.")
+        parser.add_argument(
+            '--ids',
+            default=os.getenv('POKEMON_SCRAPER_IDS'),
+            help="IDs to scrape, e.g. '1-151,10001-10010' (default: 1..POKEMON_SCRAPER_LIMIT)"
+        )
+        parser.add_argument(
+            '--listing',
+            action='store_true',
+            default=os.getenv('POKEMON_SCRAPER_SOURCE', 'range') == 'listing',
+            help="Walk the upstream /pokemon listing instead of a fixed ID range"
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help="Continue an interrupted run, only fetching IDs that are missing or failed"
+        )
+        parser.add_argument(
+            '--replay',
+            action='store_true',
+            help="Rebuild the database from the response cache without touching the network"
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Rewrite every row even if its payload is unchanged"
+        )
+        parser.add_argument(
+            '--resolve',
+            default=os.getenv('POKEMON_SCRAPER_RESOLVE', ','.join(SHARED_RESOURCES)),
+            help="Shared resources to fetch details of: any of abilities,moves,species, or none (default: all)"
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=int(os.getenv('POKEMON_SCRAPER_PROCESSES', 1)),
+            help="Worker processes to fetch and parse Pokemon in, e.g. one per core (default: 1)"
+        )
+        args = parser.parse_args()
+        if args.processes < 1:
+            parser.error("--processes must be at least 1")
+        scrapping_resolve = [name.strip() for name in args.resolve.split(',') if name.strip() not in ('', 'none')]
+        unknown = set(scrapping_resolve) - set(SHARED_RESOURCES)
+        if unknown:
+            parser.error(f"Unknown --resolve {', '.join(sorted(unknown))}, expected any of {', '.join(SHARED_RESOURCES)}")
+
         # Get configuration from environment variables
         scrapping_limit = int(os.getenv('POKEMON_SCRAPER_LIMIT', 151))
         scrapping_concurrency = int(os.getenv('POKEMON_SCRAPER_CONCURRENCY', 10))
+        scrapping_max_concurrency = int(os.getenv('POKEMON_SCRAPER_MAX_CONCURRENCY', 50))
+        scrapping_http2 = os.getenv('POKEMON_SCRAPER_HTTP2', 'false').lower() in ('1', 'true', 'yes')
+        scrapping_batch_size = int(os.getenv('POKEMON_SCRAPER_BATCH_SIZE', 100))
+        scrapping_flush_interval = float(os.getenv('POKEMON_SCRAPER_FLUSH_INTERVAL', 1.0))
+        scrapping_retry = RetryPolicy(
+            max_retries=int(os.getenv('POKEMON_SCRAPER_MAX_RETRIES', 3)),
+            base_delay=float(os.getenv('POKEMON_SCRAPER_BACKOFF_BASE', 0.25)),
+            max_delay=float(os.getenv('POKEMON_SCRAPER_BACKOFF_MAX', 10.0))
+        )
+        scrapping_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('POKEMON_SCRAPER_BREAKER_THRESHOLD', 10)),
+            reset_timeout=float(os.getenv('POKEMON_SCRAPER_BREAKER_RESET', 30.0))
+        )
+        scrapping_metrics_port = os.getenv('POKEMON_SCRAPER_METRICS_PORT')
+        scrapping_cache_dir = os.getenv('POKEMON_SCRAPER_CACHE_DIR')
+        scrapping_cache = None
+        if scrapping_cache_dir:
+            scrapping_cache = ResponseCache(
+                scrapping_cache_dir,
+                ttl=float(os.getenv('POKEMON_SCRAPER_CACHE_TTL', 86400)),
+                max_bytes=int(os.getenv('POKEMON_SCRAPER_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+            )
+        if args.replay and scrapping_cache is None:
+            parser.error("--replay needs POKEMON_SCRAPER_CACHE_DIR to be set")
+
+        if args.replay and not (args.listing or args.ids):
+            scrapping_ids = CachedPokemon(scrapping_cache)
+        elif args.listing:
+            scrapping_ids = PokemonListing()
+        elif args.ids:
+            scrapping_ids = parse_id_spec(args.ids)
+        else:
+            scrapping_ids = None
+
 
+        if scrapping_metrics_port:
+            start_http_server(int(scrapping_metrics_port))
 
         await init_db()
-        scraper = PokemonScraper()
-        await scraper.scrape_pokemon(scrapping_limit, scrapping_concurrency)
+        scraper = PokemonScraper(
+            http2=scrapping_http2,
+            retry=scrapping_retry,
+            breaker=scrapping_breaker,
+            cache=scrapping_cache,
+            offline=args.replay
+        )
+        await scraper.scrape_pokemon(
+            scrapping_limit,
+            scrapping_concurrency,
+            scrapping_batch_size,
+            scrapping_flush_interval,
+            scrapping_max_concurrency,
+            ids=scrapping_ids,
+            resume=args.resume,
+            force=args.force,
+            resolve=scrapping_resolve,
+            processes=args.processes
+        )
 
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    The n-th retry waits a random time in ``[0, min(max_delay, base_delay * 2**n)]``,
+    or at least as long as upstream asked for in Retry-After.
+    """
+
+    def __init__(self, max_retries=3, base_delay=0.25, max_delay=10.0):
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """Pause every fetch while upstream is clearly down.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    :meth:`wait` blocks all callers for ``reset_timeout`` seconds. Then a
+    single probe request is let through (half-open): success closes the
+    breaker and releases everyone, failure opens it again. A probe that
+    ends without either (cancelled mid-request) must call
+    :meth:`release_probe` so another caller can probe.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=10, reset_timeout=30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.opened_count = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._changed = asyncio.Event()
+
+    async def wait(self):
+        """
+        Return once a request may be sent.
+
+        Returns:
+            bool: True if the caller's request is the half-open probe.
+        """
+        while True:
+            if self.state == self.CLOSED:
+                return False
+
+            if self.state == self.OPEN:
+                delay = self._opened_at + self.reset_timeout - time.monotonic()
+                if delay > 0:
+                    await self._wait_for_change(delay)
+                    continue
+                self.state = self.HALF_OPEN
+                logger.info("Circuit breaker half-open, sending a probe request")
+
+            if not self._probing:
+                self._probing = True
+                return True
+
+            await self._wait_for_change()
+
+    def release_probe(self):
+        """Let the next waiter probe after a probe that never finished."""
+        if self.state == self.HALF_OPEN and self._probing:
+            self._probing = False
+            self._set_state(self.HALF_OPEN)
+
+    def record_success(self):
+        self._failures = 0
+        self._probing = False
+        if self.state != self.CLOSED:
+            logger.info("Circuit breaker closed, upstream is back")
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+            self._open()
+        elif self.state == self.CLOSED and self._failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self.opened_count += 1
+        logger.warning(
+            f"Circuit breaker open after {self._failures} consecutive failures, "
+            f"pausing requests for {self.reset_timeout}s"
+        )
+        self._set_state(self.OPEN)
+
+    def _set_state(self, state):
+        self.state = state
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _wait_for_change(self, timeout=None):
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
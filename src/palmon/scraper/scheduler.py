@@ -0,0 +1,111 @@
+import asyncio
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lower values are fetched first. A Pokemon payload becomes a row as soon
+# as it arrives; shared resources only fill in details of stubs that are
+# already written, so they wait whenever both are queued.
+PRIORITY_POKEMON = 0
+PRIORITY_RESOURCE = 1
+
+
+class FetchScheduler:
+    """URL-level fetch queue shared by every resource kind.
+
+    Each URL is requested at most once per run: callers asking for a URL
+    that is already in flight wait for the same request (single-flight),
+    and a URL that has completed is not fetched again. Queued URLs are
+    sent in priority order by ``workers`` tasks, whose requests still go
+    through the scraper's per-host concurrency limiters.
+
+    Results are not kept after delivery, so memory grows with the number
+    of distinct URLs, not with the size of their payloads.
+    """
+
+    def __init__(self, fetch, workers=10):
+        """
+        Args:
+            fetch: Coroutine function ``fetch(url, state)`` returning a
+                FetchResult or None
+            workers: Number of dispatch tasks
+        """
+        self._fetch = fetch
+        self.workers = max(1, workers)
+        self._queue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._in_flight = {}
+        self._done = set()
+        self._tasks = []
+        self.requests = 0
+        self.deduplicated = 0
+
+    def seen(self, url):
+        """Whether ``url`` is queued, in flight or already fetched."""
+        return url in self._in_flight or url in self._done
+
+    def submit(self, url, priority=PRIORITY_RESOURCE, state=None):
+        """
+        Queue ``url`` unless it is already known.
+
+        Returns a future for the FetchResult, shared by every caller while
+        the request is pending, or None if the URL was fetched before.
+        """
+        future = self._in_flight.get(url)
+        if future is not None:
+            self.deduplicated += 1
+            return future
+        if url in self._done:
+            self.deduplicated += 1
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        # The counter keeps equal priorities first-in, first-out
+        self._queue.put_nowait((priority, next(self._order), url, state))
+        return future
+
+    async def fetch(self, url, priority=PRIORITY_RESOURCE, state=None):
+        """Submit ``url`` and wait for it; None if it failed or was fetched before."""
+        future = self.submit(url, priority, state)
+        if future is None:
+            return None
+        return await asyncio.shield(future)
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for future in self._in_flight.values():
+            future.cancel()
+        self._in_flight.clear()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _dispatch(self):
+        while True:
+            priority, _, url, state = await self._queue.get()
+            future = self._in_flight[url]
+            self.requests += 1
+            try:
+                result = await self._fetch(url, state)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                del self._in_flight[url]
+                self._done.add(url)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# Messages on the result queue: (kind, shard, payload)
+ITEM = 'item'
+DONE = 'done'
+ERROR = 'error'
+
+
+def deal_ids(ids, processes):
+    """
+    Deal ``ids`` round-robin into ``processes`` shards.
+
+    Neighbouring IDs have similar payload sizes, so dealing them out
+    instead of cutting the list into ranges keeps the shards equally busy.
+    """
+    shards = [[] for _ in range(processes)]
+    for index, pokemon_id in enumerate(ids):
+        shards[index % processes].append(pokemon_id)
+    return shards
+
+
+def run_shard(scraper_class, options, shard, ids, states, existing_ids, concurrency, max_concurrency, results):
+    """
+    Entry point of a shard process.
+
+    Fetches and parses ``ids`` on a fresh event loop and puts every
+    ``(WriteItem, refs)`` pair on ``results``, followed by the shard's
+    ScrapeStats, or by the traceback if the shard failed.
+    """
+    async def emit(item, refs):
+        message = (ITEM, shard, (item, refs))
+        try:
+            results.put_nowait(message)
+        except queue.Full:
+            # The writer is behind; wait in a thread so fetches keep going
+            await asyncio.to_thread(results.put, message)
+
+    try:
+        scraper = scraper_class.from_options(options)
+        stats = asyncio.run(
+            scraper.scrape_shard(ids, states, existing_ids, concurrency, max_concurrency, emit)
+        )
+    except Exception:
+        results.put((ERROR, shard, traceback.format_exc()))
+    else:
+        results.put((DONE, shard, stats))
+
+
+class ShardPool:
+    """Scrape shard processes reporting to the parent over one result queue.
+
+    Processes are spawned rather than forked, so they start without the
+    parent's event loop, HTTP connections or database engine.
+    """
+
+    def __init__(self, queue_size=200, poll_interval=1.0):
+        self._context = multiprocessing.get_context('spawn')
+        self.results = self._context.Queue(maxsize=queue_size)
+        self.poll_interval = poll_interval
+        self.processes = []
+        self.stats = []
+
+    def start(self, scraper_class, options, shards, concurrency, max_concurrency):
+        """
+        Start a process per non-empty shard.
+
+        Args:
+            scraper_class: PokemonScraper (sub)class, rebuilt in each
+                process with ``from_options(options)``. It is pickled by
+                reference, so a scraper run as ``__main__`` is not
+                imported a second time under its package name.
+            options (dict): Picklable constructor options
+            shards: ``(ids, states, existing_ids)`` per shard
+            concurrency (int): Initial concurrency of each process
+            max_concurrency (int): Concurrency ceiling of each process
+        """
+        for shard, (ids, states, existing_ids) in enumerate(shards):
+            if not ids:
+                continue
+            process = self._context.Process(
+                target=run_shard,
+                args=(
+                    scraper_class, options, shard, ids, states, existing_ids,
+                    concurrency, max_concurrency, self.results
+                ),
+                name=f"palmon-shard-{shard}",
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"Started {len(self.processes)} scrape shard processes")
+
+    async def items(self):
+        """
+        Yield ``(WriteItem, refs)`` pairs until every shard is done.
+
+        The shards' ScrapeStats are collected in ``self.stats``. Raises
+        RuntimeError if a shard fails or its process dies.
+        """
+        running = len(self.processes)
+        while running:
+            try:
+                kind, shard, payload = self.results.get_nowait()
+            except queue.Empty:
+                kind, shard, payload = await asyncio.to_thread(self._get)
+            if kind == ITEM:
+                yield payload
+            elif kind == DONE:
+                self.stats.append(payload)
+                running -= 1
+            else:
+                raise RuntimeError(f"Scrape shard {shard} failed:\n{payload}")
+
+    def _get(self):
+        while True:
+            try:
+                return self.results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                for process in self.processes:
+                    if process.exitcode not in (None, 0):
+                        raise RuntimeError(
+                            f"Scrape shard process {process.name} exited with code {process.exitcode}"
+                        ) from None
+
+    def stop(self):
+        """Wait for finished shards and terminate the rest."""
+        finished = len(self.stats) == len(self.processes)
+        for process in self.processes:
+            if not finished and process.is_alive():
+                process.terminate()
+            process.join()
+        self.results.close()
+        self.results.join_thread()
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def parse_id_spec(spec):
+    """
+    Expand an ID spec such as ``"1-151,10001-10010,25"`` lazily.
+
+    Ranges are inclusive on both ends.
+    """
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, stop = part.split('-', 1)
+            yield from range(int(start), int(stop) + 1)
+        else:
+            yield int(part)
+
+
+def id_from_url(url):
+    """Extract the trailing numeric ID from a PokeAPI resource URL."""
+    return int(url.rstrip('/').rsplit('/', 1)[-1])
+
+
+class PokemonListing:
+    """ID source that walks the paginated ``/pokemon?offset=`` listing.
+
+    Unlike a fixed range this picks up everything upstream knows about,
+    including form variants numbered from 10001.
+    """
+
+    def __init__(self, resource='pokemon', page_size=200):
+        self.resource = resource
+        self.page_size = page_size
+
+    async def iter_ids(self, scraper, client):
+        url = f"{scraper.base_url}/{self.resource}?offset=0&limit={self.page_size}"
+        while url:
+            result = await scraper.fetch_resource(client, url)
+            if result is None:
+                raise RuntimeError(f"Could not fetch listing page {url}")
+
+            for entry in result.data['results']:
+                yield id_from_url(entry['url'])
+
+            url = result.data.get('next')
+            logger.debug(f"Next listing page: {url}")
+
+
+class CachedPokemon:
+    """ID source for replays: every Pokemon payload held in a ResponseCache."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    async def iter_ids(self, scraper, client):
+        prefix = f"{scraper.base_url}/pokemon/"
+
+        def collect():
+            return sorted(
+                id_from_url(url)
+                for url in self.cache.urls()
+                if url.startswith(prefix) and url[len(prefix):].rstrip('/').isdigit()
+            )
+
+        for pokemon_id in await asyncio.to_thread(collect):
+            yield pokemon_id
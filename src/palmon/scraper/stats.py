@@ -0,0 +1,74 @@
+import time
+from dataclasses import dataclass, field
+
+# Counters added up when merging the stats of scrape shards
+COUNTERS = (
+    'rows_written', 'batches', 'new', 'updated', 'skipped', 'resumed', 'retries',
+    'throttled', 'breaker_opened', 'cache_hits', 'resolved', 'requests', 'deduplicated'
+)
+
+
+@dataclass
+class ScrapeStats:
+    """Counters collected while a scrape is running."""
+
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float = None
+    rows_written: int = 0
+    batches: int = 0
+    new: int = 0
+    updated: int = 0
+    skipped: int = 0
+    resumed: int = 0
+    retries: int = 0
+    throttled: int = 0
+    breaker_opened: int = 0
+    cache_hits: int = 0
+    resolved: int = 0
+    requests: int = 0
+    deduplicated: int = 0
+    failures: dict = field(default_factory=dict)
+    final_concurrency: int = None
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    def merge(self, other):
+        """Add the counters and failures of ``other``, e.g. a shard's stats."""
+        for name in COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.failures.update(other.failures)
+
+    @property
+    def elapsed(self):
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        summary = (
+            f"{self.new} new, {self.updated} updated, {self.skipped} skipped, "
+            f"{len(self.failures)} failed; "
+            f"{self.rows_written} rows in {self.batches} batches, "
+            f"{self.elapsed:.2f}s ({self.rows_per_second:.1f} rows/sec)"
+        )
+        if self.retries or self.throttled or self.breaker_opened:
+            summary += (
+                f", {self.retries} retries, {self.throttled} throttled, "
+                f"breaker opened {self.breaker_opened}x"
+            )
+        if self.resolved:
+            summary += f", {self.resolved} abilities, moves and species resolved"
+        if self.requests:
+            summary += f", {self.requests} unique URLs fetched, {self.deduplicated} repeated references skipped"
+        if self.cache_hits:
+            summary += f", {self.cache_hits} served from the response cache"
+        if self.resumed:
+            summary += f", {self.resumed} already done before resuming"
+        if self.final_concurrency is not None:
+            summary += f", final concurrency {self.final_concurrency}"
+        return summary
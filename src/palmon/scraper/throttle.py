@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean upstream wants us to slow down.
+THROTTLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header into seconds, or None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class _Slot:
+    __slots__ = ('started_at',)
+
+    def __init__(self, started_at):
+        self.started_at = started_at
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter for outgoing requests.
+
+    The limit grows by one after a full window of healthy responses (one
+    success per slot, each under ``latency_target`` seconds) and is cut by
+    ``backoff`` on a throttling status, a transport error or a Retry-After
+    header. Only requests started after the last cut can trigger another
+    one, so a burst of failures from the same window backs off once.
+    """
+
+    def __init__(self, initial=10, minimum=1, maximum=50, latency_target=1.0, backoff=0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._successes = 0
+        self._last_decrease = float('-inf')
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one request slot for the duration of the block."""
+        async with self._cond:
+            while self.in_flight >= self.limit:
+                await self._cond.wait()
+            self.in_flight += 1
+
+        try:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield _Slot(time.monotonic())
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def record(self, slot, status_code=None, retry_after=None):
+        """Feed the outcome of a request back into the controller.
+
+        ``status_code`` is None when the request failed before a response
+        arrived.
+        """
+        now = time.monotonic()
+        throttled = (
+            status_code is None
+            or status_code in THROTTLE_STATUS_CODES
+            or retry_after is not None
+        )
+
+        if retry_after is not None:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+        if throttled:
+            self._successes = 0
+            if slot.started_at >= self._last_decrease:
+                self._last_decrease = now
+                self._set_limit(max(self.minimum, int(self.limit * self.backoff)))
+            return
+
+        if now - slot.started_at <= self.latency_target:
+            self._successes += 1
+            if self._successes >= self.limit:
+                self._successes = 0
+                self._set_limit(min(self.maximum, self.limit + 1))
+
+    def _set_limit(self, limit):
+        if limit != self.limit:
+            logger.debug(f"Adjusting scraper concurrency from {self.limit} to {limit}")
+            self.limit = limit
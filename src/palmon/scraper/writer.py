@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import sqlite3
+from dataclasses import dataclass
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from palmon.database.models import (
+    Pokemon,
+    PokemonType,
+    FetchState,
+    ScrapeCheckpoint,
+    DataVersion,
+    POKEMON_LINKS,
+    SHARED_RESOURCES,
+    type_rows
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Both dialects spell upserts as INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+# Bind parameters one statement may carry: SQLite's default
+# SQLITE_MAX_VARIABLE_NUMBER (999 before 3.32) and PostgreSQL's 32767
+MAX_BIND_PARAMS = {
+    'sqlite': 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999,
+    'postgresql': 32767,
+}
+
+
+def chunked(items, width=1, dialect='sqlite'):
+    """Split ``items``, each bound as ``width`` parameters, into lists that fit one statement."""
+    size = max(1, MAX_BIND_PARAMS.get(dialect, 999) // max(1, width))
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def dialect_insert(dialect):
+    try:
+        return UPSERT_INSERTS[dialect]
+    except KeyError:
+        raise ValueError(f"Upserts are not supported on {dialect}") from None
+
+
+def upsert_statement(model, rows, key='id', dialect='sqlite'):
+    """
+    Build a single INSERT ... ON CONFLICT(key) DO UPDATE for a batch of rows.
+
+    Every value is a bind parameter, so ``rows`` must fit the dialect's
+    limit; use ``upsert_statements`` for batches of any size.
+    """
+    stmt = dialect_insert(dialect)(model).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={
+            column: stmt.excluded[column]
+            for column in rows[0]
+            if column != key
+        }
+    )
+
+
+def upsert_statements(model, rows, key='id', dialect='sqlite'):
+    """Yield upserts of ``rows``, in as few statements as the bind parameter limit allows."""
+    for chunk in chunked(rows, len(rows[0]), dialect):
+        yield upsert_statement(model, chunk, key, dialect)
+
+
+def insert_missing_statement(model, dialect='sqlite'):
+    """INSERT ... ON CONFLICT DO NOTHING, to be executed with a list of rows."""
+    return dialect_insert(dialect)(model).on_conflict_do_nothing()
+
+
+def bump_data_version_statement(dialect='sqlite'):
+    """Increment the data version read by API caches, creating it if needed."""
+    stmt = dialect_insert(dialect)(DataVersion).values(id=1, version=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[DataVersion.id],
+        set_={'version': DataVersion.version + 1}
+    )
+
+
+@dataclass
+class WriteItem:
+    """Everything the writer persists for one scraped resource.
+
+    ``row`` is None when the payload is unchanged (or could not be
+    fetched) and only the validators in ``state`` or the ``checkpoint``
+    entry need writing.
+
+    ``links`` maps POKEMON_LINKS names to the complete set of linked rows
+    of ``row`` and ``refs`` maps SHARED_RESOURCES names to ``{id, name}``
+    stubs of the entities they point at; stubs never overwrite stored
+    rows. ``resources`` holds fully fetched shared entities to upsert.
+    """
+    row: dict = None
+    state: dict = None
+    checkpoint: dict = None
+    links: dict = None
+    refs: dict = None
+    resources: dict = None
+
+
+class BatchWriter:
+    """Drain scraped items from a queue and upsert them in batches.
+
+    A batch is flushed when it reaches ``batch_size`` items or when
+    ``flush_interval`` seconds have passed since its first item arrived,
+    whichever comes first. A ``None`` item on the queue stops the writer
+    after flushing what is left.
+    """
+
+    def __init__(self, session: AsyncSession, stats, batch_size=100, flush_interval=1.0):
+        self.session = session
+        self.stats = stats
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+    async def run(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None if not batch else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self.flush(batch)
+                batch = []
+                continue
+
+            if item is None:
+                break
+
+            if not batch:
+                deadline = loop.time() + self.flush_interval
+            batch.append(item)
+
+            if len(batch) >= self.batch_size:
+                await self.flush(batch)
+                batch = []
+
+        await self.flush(batch)
+
+    async def flush(self, items):
+        if not items:
+            return
+
+        # Last write wins when the same key shows up twice in one batch;
+        # an upsert cannot touch the same row twice in a single statement.
+        rows = list({item.row['id']: item.row for item in items if item.row}.values())
+        states = list({item.state['url']: item.state for item in items if item.state}.values())
+        checkpoints = list({
+            item.checkpoint['pokemon_id']: item.checkpoint for item in items if item.checkpoint
+        }.values())
+        linked = {item.row['id']: item.links for item in items if item.row and item.links is not None}
+        refs = self.merge(item.refs for item in items)
+        resources = self.merge(item.resources for item in items)
+
+        dialect = self.session.get_bind().dialect.name
+        try:
+            # Shared entities first, so the foreign keys of Pokemon and their
+            # links always point at an existing row
+            for name, stubs in refs.items():
+                await self.session.execute(insert_missing_statement(SHARED_RESOURCES[name], dialect), stubs)
+            for name, resource_rows in resources.items():
+                for stmt in upsert_statements(SHARED_RESOURCES[name], resource_rows, dialect=dialect):
+                    await self.session.execute(stmt)
+            if rows:
+                for stmt in upsert_statements(Pokemon, rows, dialect=dialect):
+                    await self.session.execute(stmt)
+                await self.sync_types(rows, dialect)
+            if linked:
+                await self.sync_links(linked, dialect)
+            if rows or resources:
+                await self.session.execute(bump_data_version_statement(dialect))
+            if states:
+                for stmt in upsert_statements(FetchState, states, key='url', dialect=dialect):
+                    await self.session.execute(stmt)
+            if checkpoints:
+                for stmt in upsert_statements(ScrapeCheckpoint, checkpoints, key='pokemon_id', dialect=dialect):
+                    await self.session.execute(stmt)
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error writing batch of {len(items)} Pokemon: {str(e)}")
+            raise
+
+        # The upserts bypass the unit of work, so drop any stale objects
+        # the session may still be holding for these IDs.
+        self.session.expire_all()
+
+        self.stats.rows_written += len(rows)
+        self.stats.batches += 1
+        logger.info(f"Wrote batch of {len(rows)} Pokemon")
+
+    @staticmethod
+    def merge(groups):
+        """Combine per-item ``{name: rows}`` dicts, one row per ID and name."""
+        merged = {}
+        for group in groups:
+            for name, rows in (group or {}).items():
+                merged.setdefault(name, {}).update((row['id'], row) for row in rows)
+        return {name: list(rows.values()) for name, rows in merged.items() if rows}
+
+    async def sync_types(self, rows, dialect='sqlite'):
+        """Replace the normalized pokemon_types rows for a batch of Pokemon."""
+        for ids in chunked([row['id'] for row in rows], dialect=dialect):
+            await self.session.execute(delete(PokemonType).where(PokemonType.pokemon_id.in_(ids)))
+        types = [t for row in rows for t in type_rows(row['id'], row['types'])]
+        if types:
+            await self.session.execute(insert(PokemonType), types)
+
+    async def sync_links(self, linked, dialect='sqlite'):
+        """
+        Replace the stats, abilities and moves of a batch of Pokemon.
+
+        One DELETE and one executemany INSERT per table for the whole
+        batch, however many moves each Pokemon has.
+        """
+        for name, model in POKEMON_LINKS.items():
+            for ids in chunked(list(linked), dialect=dialect):
+                await self.session.execute(delete(model).where(model.pokemon_id.in_(ids)))
+            rows = [row for links in linked.values() for row in links.get(name, ())]
+            if rows:
+                await self.session.execute(insert(model), rows)
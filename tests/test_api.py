@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from palmon.api.app import app
+from palmon.api.app import app, response_cache, data_version, name_index
 from palmon.database.models import AsyncSessionLocal, Pokemon, Base
 from palmon.database import get_db
 from sqlalchemy import select, delete
@@ -18,6 +18,20 @@ async def override_dependency(db_session):
     yield
     app.dependency_overrides = {}
 
+@pytest.fixture(autouse=True)
+def disable_response_cache(monkeypatch):
+    """Serve every request from the database unless a test opts into caching."""
+    monkeypatch.setattr(response_cache, "maxsize", 0)
+    response_cache.clear()
+    data_version.reset()
+    name_index.reset()
+
+@pytest.fixture
+def enable_response_cache(monkeypatch):
+    """Turn the response cache on and re-read the data version every request."""
+    monkeypatch.setattr(response_cache, "maxsize", 16)
+    monkeypatch.setattr(data_version, "poll_interval", 0)
+
 @pytest.fixture
 async def clean_db(db_session):
     """Clean the database before and after each test."""
@@ -336,3 +350,705 @@ async def test_error_handling_chain(clean_db):
     
     assert 'pokemon_requests_total{endpoint="/api/pokemon",status="500"}' in metrics_content
     assert 'pokemon_requests_total{endpoint="/api/pokemon/{id}",status="500"}' in metrics_content
+
+@pytest.mark.asyncio
+async def test_response_cache_skips_database(sample_pokemon, db_session, enable_response_cache):
+    """Test that repeat lookups are answered from the response cache."""
+    first = client.get("/api/pokemon/1")
+    assert first.status_code == 200
+
+    # Only the data version is read once the body is cached
+    statements = []
+    original_execute = db_session.execute
+
+    async def tracking_execute(stmt, *args, **kwargs):
+        statements.append(str(stmt))
+        return await original_execute(stmt, *args, **kwargs)
+
+    with pytest.MonkeyPatch().context() as m:
+        m.setattr(db_session, "execute", tracking_execute)
+        second = client.get("/api/pokemon/1")
+
+    assert second.content == first.content
+    assert len(statements) == 1
+    assert "data_version" in statements[0]
+
+    metrics = client.get("/metrics").text
+    assert 'pokemon_cache_hits_total{cache="pokemon"}' in metrics
+    assert 'pokemon_cache_misses_total{cache="pokemon"}' in metrics
+
+@pytest.mark.asyncio
+async def test_response_cache_invalidated_by_data_version(sample_pokemon, db_session, enable_response_cache):
+    """Test that bumping the data version invalidates cached responses."""
+    from palmon.scraper.writer import bump_data_version_statement
+
+    assert client.get("/api/pokemon?page=1&limit=10").json()["data"][0]["attributes"]["name"] == "bulbasaur"
+
+    sample_pokemon.name = "renamed"
+    await db_session.commit()
+    # Not bumped yet: the cached page is still served
+    assert client.get("/api/pokemon?page=1&limit=10").json()["data"][0]["attributes"]["name"] == "bulbasaur"
+
+    await db_session.execute(bump_data_version_statement())
+    await db_session.commit()
+    assert client.get("/api/pokemon?page=1&limit=10").json()["data"][0]["attributes"]["name"] == "renamed"
+
+@pytest.mark.asyncio
+async def test_data_version_without_table(tmp_path):
+    """Test that a database from before the data_version table is at version 0."""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from palmon.api.cache import DataVersionTracker
+    from palmon.database.engine import create_sqlite_engine
+
+    engine = create_sqlite_engine(str(tmp_path / "baseline.db"))
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Pokemon.__table__.create)
+        async with AsyncSession(engine) as session:
+            assert await DataVersionTracker().current(session) == 0
+            assert (await session.execute(select(Pokemon))).all() == []
+    finally:
+        await engine.dispose()
+
+def test_response_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    from palmon.api.cache import ResponseCache
+
+    cache = ResponseCache(maxsize=2)
+    cache.put(("pokemon", 1), 0, b"1")
+    cache.put(("pokemon", 2), 0, b"2")
+    assert cache.get(("pokemon", 1), 0) == b"1"
+    cache.put(("pokemon", 3), 0, b"3")
+
+    assert cache.get(("pokemon", 2), 0) is None
+    assert cache.get(("pokemon", 1), 0) == b"1"
+    assert cache.get(("pokemon", 1), 1) is None
+
+@pytest.mark.asyncio
+async def test_get_pokemon_by_id_conditional(sample_pokemon):
+    """Test ETag validation and Cache-Control on a single Pokemon."""
+    response = client.get("/api/pokemon/1")
+    etag = response.headers["ETag"]
+    assert etag.startswith('"')
+    assert "max-age" in response.headers["Cache-Control"]
+
+    response = client.get("/api/pokemon/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    response = client.get("/api/pokemon/1", headers={"If-None-Match": '"stale", W/' + etag})
+    assert response.status_code == 304
+
+    response = client.get("/api/pokemon/1", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert 'pokemon_requests_total{endpoint="/api/pokemon/{id}",status="304"}' in client.get("/metrics").text
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_etag_changes_with_data(sample_pokemon, db_session):
+    """Test that a list page's ETag changes when its content changes."""
+    first = client.get("/api/pokemon?page=1&limit=10")
+    again = client.get("/api/pokemon?page=1&limit=10")
+    assert first.headers["ETag"] == again.headers["ETag"]
+
+    sample_pokemon.base_experience = 65
+    await db_session.commit()
+
+    response = client.get(
+        "/api/pokemon?page=1&limit=10",
+        headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
+
+@pytest.fixture
+async def five_pokemon(clean_db):
+    """Create five Pokemon with IDs 1-5."""
+    for pokemon_id in range(1, 6):
+        clean_db.add(Pokemon(
+            id=pokemon_id,
+            name=f"pokemon-{pokemon_id}",
+            height=1.0,
+            weight=1.0,
+            types="normal",
+            image_url="test.png",
+            base_experience=100
+        ))
+    await clean_db.commit()
+    return clean_db
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_cursor_walk(five_pokemon):
+    """Test walking the dataset forwards and backwards with cursors."""
+    response = client.get("/api/pokemon?limit=2&after=" + "aWQ6MA")  # after id 0
+    data = response.json()
+    assert [p["id"] for p in data["data"]] == ["1", "2"]
+    assert data["links"]["prev"] is None
+
+    seen = [p["id"] for p in data["data"]]
+    while data["links"]["next"]:
+        data = client.get(data["links"]["next"]).json()
+        seen += [p["id"] for p in data["data"]]
+    assert seen == ["1", "2", "3", "4", "5"]
+    assert [p["id"] for p in data["data"]] == ["5"]
+
+    data = client.get(data["links"]["prev"]).json()
+    assert [p["id"] for p in data["data"]] == ["3", "4"]
+    assert data["links"]["prev"] is not None
+    assert data["links"]["next"] is not None
+
+    data = client.get(client.get(data["links"]["prev"]).json()["links"]["self"]).json()
+    assert [p["id"] for p in data["data"]] == ["1", "2"]
+    assert data["links"]["prev"] is None
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_last_page_has_no_next(five_pokemon):
+    """Test that page mode stops emitting next links after the last row."""
+    data = client.get("/api/pokemon?page=3&limit=2").json()
+    assert [p["id"] for p in data["data"]] == ["5"]
+    assert data["links"]["next"] is None
+
+    data = client.get("/api/pokemon?page=1&limit=5").json()
+    assert data["links"]["next"] is None
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_invalid_cursor(db_session):
+    """Test validation of cursor parameters."""
+    response = client.get("/api/pokemon?after=not-a-cursor")
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
+
+    response = client.get("/api/pokemon?page=2&after=aWQ6MA")
+    assert response.status_code == 400
+
+    response = client.get("/api/pokemon?after=aWQ6MA&before=aWQ6MA")
+    assert response.status_code == 400
+
+@pytest.fixture
+async def typed_pokemon(clean_db):
+    """Create Pokemon with a mix of types and attributes."""
+    for pokemon_id, name, types, weight, height, base_experience in [
+        (1, "bulbasaur", "grass,poison", 6.9, 0.7, 64),
+        (4, "charmander", "fire", 8.5, 0.6, 62),
+        (6, "charizard", "fire,flying", 90.5, 1.7, 267),
+        (38, "ninetales", "fire", 19.9, 1.1, 177),
+        (43, "oddish", "grass,poison", 5.4, 0.5, 64),
+    ]:
+        clean_db.add(Pokemon(
+            id=pokemon_id,
+            name=name,
+            height=height,
+            weight=weight,
+            types=types,
+            image_url="test.png",
+            base_experience=base_experience
+        ))
+    await clean_db.commit()
+    return clean_db
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_filter_by_type(typed_pokemon):
+    """Test filtering by one or several types."""
+    data = client.get("/api/pokemon?type=fire").json()
+    assert [p["id"] for p in data["data"]] == ["4", "6", "38"]
+
+    data = client.get("/api/pokemon?type=fire,flying").json()
+    assert [p["id"] for p in data["data"]] == ["6"]
+
+    data = client.get("/api/pokemon?type=Poison&limit=1").json()
+    assert [p["id"] for p in data["data"]] == ["1"]
+    assert data["links"]["next"] == "/api/pokemon?type=poison&page=2&limit=1"
+
+    data = client.get(data["links"]["next"]).json()
+    assert [p["id"] for p in data["data"]] == ["43"]
+    assert data["links"]["next"] is None
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_filter_ranges_and_sort(typed_pokemon):
+    """Test attribute ranges combined with a sort order."""
+    data = client.get("/api/pokemon?min_weight=6&max_weight=20&sort=-weight").json()
+    assert [p["attributes"]["name"] for p in data["data"]] == ["ninetales", "charmander", "bulbasaur"]
+
+    data = client.get("/api/pokemon?type=fire&min_base_experience=100&sort=name").json()
+    assert [p["attributes"]["name"] for p in data["data"]] == ["charizard", "ninetales"]
+
+    data = client.get("/api/pokemon?max_height=0.6&sort=height").json()
+    assert [p["attributes"]["name"] for p in data["data"]] == ["oddish", "charmander"]
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_filter_with_cursor(typed_pokemon):
+    """Test that cursor links keep the filters."""
+    data = client.get("/api/pokemon?type=fire&limit=2&after=aWQ6MA").json()
+    assert [p["id"] for p in data["data"]] == ["4", "6"]
+    assert data["links"]["next"].startswith("/api/pokemon?type=fire&after=")
+
+    data = client.get(data["links"]["next"]).json()
+    assert [p["id"] for p in data["data"]] == ["38"]
+    assert data["links"]["next"] is None
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_invalid_sort(db_session):
+    """Test validation of the sort parameter."""
+    response = client.get("/api/pokemon?sort=color")
+    assert response.status_code == 400
+    assert "Invalid sort" in response.json()["detail"]
+
+    response = client.get("/api/pokemon?sort=-weight&after=aWQ6MA")
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_search_pokemon_prefix(typed_pokemon):
+    """Test typeahead prefix matches, shortest names first."""
+    data = client.get("/api/pokemon/search?q=char").json()
+    assert [p["attributes"]["name"] for p in data["data"]] == ["charizard", "charmander"]
+    assert all(p["meta"]["match"] == "prefix" for p in data["data"])
+
+    data = client.get("/api/pokemon/search?q=ODD").json()
+    assert [p["id"] for p in data["data"]] == ["43"]
+
+@pytest.mark.asyncio
+async def test_search_pokemon_fuzzy(typed_pokemon):
+    """Test that misspelled queries still find the Pokemon."""
+    data = client.get("/api/pokemon/search?q=charmandr").json()
+    assert data["data"][0]["attributes"]["name"] == "charmander"
+    assert data["data"][0]["meta"]["match"] == "fuzzy"
+
+    data = client.get("/api/pokemon/search?q=zzzz").json()
+    assert data["data"] == []
+
+@pytest.mark.asyncio
+async def test_search_pokemon_hyphenated_names(clean_db):
+    """Test that any word of a hyphenated name is searchable."""
+    clean_db.add(Pokemon(id=122, name="mr-mime", types="psychic,fairy"))
+    await clean_db.commit()
+
+    for q in ["mr", "mime", "mr mime"]:
+        data = client.get(f"/api/pokemon/search?q={q}").json()
+        assert [p["id"] for p in data["data"]] == ["122"]
+
+@pytest.mark.asyncio
+async def test_search_pokemon_validation(db_session):
+    """Test validation of search parameters."""
+    assert client.get("/api/pokemon/search").status_code == 422
+    assert client.get("/api/pokemon/search?q=%20").status_code == 400
+    assert client.get("/api/pokemon/search?q=a&limit=0").status_code == 400
+    assert client.get("/api/pokemon/search?q=a&limit=51").status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_by_ids(typed_pokemon):
+    """Test batch lookup keeps the requested order and marks missing IDs."""
+    data = client.get("/api/pokemon?ids=38,1,999,4,1").json()
+    assert [p and p["id"] for p in data["data"]] == ["38", "1", None, "4", "1"]
+    assert data["meta"]["not_found"] == ["999"]
+    assert data["links"]["self"] == "/api/pokemon?ids=38,1,999,4,1"
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_by_ids_validation(db_session, monkeypatch):
+    """Test validation of the ids parameter."""
+    assert client.get("/api/pokemon?ids=1,abc").status_code == 400
+    assert client.get("/api/pokemon?ids=").status_code == 400
+    assert client.get("/api/pokemon?ids=1&page=2").status_code == 400
+    assert client.get("/api/pokemon?ids=1&type=fire").status_code == 400
+
+    monkeypatch.setattr("palmon.api.app.max_batch_ids", 3)
+    response = client.get("/api/pokemon?ids=1,2,3,4")
+    assert response.status_code == 400
+    assert "more than 3" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_get_pokemon_list_without_orjson(sample_pokemon, monkeypatch):
+    """Test that the standard library fallback renders the same document."""
+    expected = client.get("/api/pokemon?page=1&limit=10").json()
+
+    monkeypatch.setattr("palmon.api.serializers.orjson", None)
+    response = client.get("/api/pokemon?page=1&limit=10")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == expected
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets(typed_pokemon):
+    """Test that fields= trims the attributes and is kept in links."""
+    data = client.get("/api/pokemon?fields=types,name&limit=2").json()
+    assert data["data"][0] == {
+        "type": "pokemon",
+        "id": "1",
+        "attributes": {"types": ["grass", "poison"], "name": "bulbasaur"}
+    }
+    assert data["links"]["next"] == "/api/pokemon?fields=types,name&page=2&limit=2"
+
+    data = client.get("/api/pokemon/4?fields=weight").json()
+    assert data["data"]["attributes"] == {"weight": 8.5}
+
+    response = client.get("/api/pokemon?fields=name,colour")
+    assert response.status_code == 400
+    assert "Invalid fields" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_msgpack_content_negotiation(typed_pokemon):
+    """Test that MessagePack is served to clients that ask for it."""
+    msgpack = pytest.importorskip("msgpack")
+
+    json_response = client.get("/api/pokemon/6")
+    response = client.get("/api/pokemon/6", headers={"Accept": "application/x-msgpack"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-msgpack"
+    assert response.headers["vary"] == "Accept"
+    assert response.headers["etag"] != json_response.headers["etag"]
+    assert msgpack.unpackb(response.content) == json_response.json()
+
+    response = client.get("/api/pokemon?type=fire", headers={"Accept": "application/msgpack"})
+    assert [p["id"] for p in msgpack.unpackb(response.content)["data"]] == ["4", "6", "38"]
+
+    response = client.get("/api/pokemon/6", headers={"Accept": "application/json;q=0, text/html"})
+    assert response.status_code == 406
+
+@pytest.mark.asyncio
+async def test_browser_accept_header_gets_json(typed_pokemon):
+    """Test that a browser's Accept header falls back to JSON instead of 406."""
+    accept = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8"
+    response = client.get("/api/pokemon/6", headers={"Accept": accept})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["data"]["attributes"]["name"] == "charizard"
+
+    response = client.get("/api/pokemon/6", headers={"Accept": "text/html"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+
+def test_negotiate_media_type():
+    """Test Accept header parsing."""
+    pytest.importorskip("msgpack")
+    from palmon.api.serializers import negotiate
+
+    assert negotiate(None) == "application/json"
+    assert negotiate("*/*") == "application/json"
+    assert negotiate("application/x-msgpack;q=0.9, application/json;q=0.5") == "application/x-msgpack"
+    assert negotiate("application/json;q=0, */*") == "application/x-msgpack"
+    assert negotiate("image/png") == "application/json"
+    assert negotiate("text/html, */*;q=0") is None
+    assert negotiate("application/json;q=0") is None
+    assert negotiate("image/png, application/*;q=0") is None
+
+@pytest.fixture
+def export_sessions(engine, monkeypatch):
+    """Point the export stream's own sessions at the test database."""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+
+    monkeypatch.setattr(
+        "palmon.api.app.SessionLocal",
+        sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    monkeypatch.setattr("palmon.api.app.export_chunk_size", 2)
+
+@pytest.mark.asyncio
+async def test_export_ndjson(typed_pokemon, export_sessions):
+    """Test the newline-delimited JSON dump."""
+    import json
+
+    response = client.get("/api/pokemon/export?fields=name")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == ["1", "4", "6", "38", "43"]
+    assert lines[0]["attributes"] == {"name": "bulbasaur"}
+
+@pytest.mark.asyncio
+async def test_export_csv_gzip(typed_pokemon, export_sessions):
+    """Test the CSV dump, compressed on the fly."""
+    import csv
+    import gzip
+
+    response = client.get(
+        "/api/pokemon/export?format=csv&fields=name,types",
+        headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.reader(response.text.splitlines()))
+    assert rows[0] == ["id", "name", "types"]
+    assert rows[1] == ["1", "bulbasaur", "grass,poison"]
+    assert len(rows) == 6
+
+    response = client.get(
+        "/api/pokemon/export?format=csv",
+        headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.text.startswith("id,name,height,weight,types,image_url,base_experience\n")
+
+@pytest.mark.asyncio
+async def test_export_invalid_format(db_session):
+    """Test validation of the export format."""
+    response = client.get("/api/pokemon/export?format=xml")
+    assert response.status_code == 400
+
+@pytest.fixture
+def snapshot_mode(engine, monkeypatch):
+    """Serve from the in-memory snapshot; returns a coroutine function that (re)loads it."""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from palmon.api.app import snapshot_store
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(snapshot_store, "current", None)
+
+    async def load():
+        monkeypatch.setattr("palmon.api.app.api_mode", "snapshot")
+        return await snapshot_store.load(session_factory)
+    return load
+
+@pytest.mark.asyncio
+async def test_snapshot_mode_matches_database(typed_pokemon, snapshot_mode, export_sessions):
+    """Test that every endpoint answers the same from the snapshot as from the database."""
+    urls = [
+        "/api/pokemon?page=1&limit=2",
+        "/api/pokemon?page=3&limit=2",
+        "/api/pokemon?type=fire&sort=-weight",
+        "/api/pokemon?type=grass,poison&fields=name",
+        "/api/pokemon?min_base_experience=64&max_height=1.1&sort=name",
+        "/api/pokemon?sort=-base_experience&limit=3&page=2",
+        "/api/pokemon?after=aWQ6NA&limit=2",
+        "/api/pokemon?before=aWQ6Mzg&limit=1",
+        "/api/pokemon?type=fire&after=aWQ6MQ&limit=1",
+        "/api/pokemon?type=fire&before=aWQ6Ng&limit=5",
+        "/api/pokemon?min_weight=8&after=aWQ6MQ&limit=2",
+        "/api/pokemon?max_weight=10&before=aWQ6NDM&limit=1",
+        "/api/pokemon?ids=6,999,1",
+        "/api/pokemon/search?q=char",
+        "/api/pokemon/search?q=ninetails",
+        "/api/pokemon/43?fields=types",
+        "/api/pokemon/999",
+        "/api/pokemon/export?format=csv",
+    ]
+    expected = [(client.get(url).status_code, client.get(url).content) for url in urls]
+
+    await snapshot_mode()
+    assert [(client.get(url).status_code, client.get(url).content) for url in urls] == expected
+
+@pytest.mark.asyncio
+async def test_snapshot_mode_skips_database(typed_pokemon, snapshot_mode, monkeypatch):
+    """Test that snapshot mode serves requests without querying the database."""
+    await snapshot_mode()
+
+    async def mock_execute(*args, **kwargs):
+        raise Exception("Database error")
+
+    with monkeypatch.context() as m:
+        m.setattr(typed_pokemon, "execute", mock_execute)
+        assert client.get("/api/pokemon?type=fire").status_code == 200
+        assert client.get("/api/pokemon/6").json()["data"]["attributes"]["name"] == "charizard"
+
+@pytest.mark.asyncio
+async def test_snapshot_reloads_on_data_version(typed_pokemon, snapshot_mode):
+    """Test that the snapshot is only rebuilt once the data version changes."""
+    from palmon.scraper.writer import bump_data_version_statement
+
+    first = await snapshot_mode()
+    typed_pokemon.add(Pokemon(id=25, name="pikachu", types="electric"))
+    await typed_pokemon.commit()
+    assert await snapshot_mode() is first
+    assert client.get("/api/pokemon/25").status_code == 404
+
+    await typed_pokemon.execute(bump_data_version_statement())
+    await typed_pokemon.commit()
+    second = await snapshot_mode()
+    assert second is not first and second.version == 1
+    assert client.get("/api/pokemon/25").json()["data"]["attributes"]["name"] == "pikachu"
+
+@pytest.mark.asyncio
+async def test_snapshot_mode_lifespan(typed_pokemon, export_sessions, monkeypatch):
+    """Test that snapshot mode loads at startup and stops its poller on shutdown."""
+    from palmon.api.app import snapshot_store
+
+    monkeypatch.setattr("palmon.api.app.api_mode", "snapshot")
+    monkeypatch.setattr(snapshot_store, "current", None)
+    with TestClient(app) as lifespan_client:
+        assert len(snapshot_store.current) == 5
+        assert snapshot_store._task is not None
+        assert lifespan_client.get("/api/pokemon/38").status_code == 200
+    assert snapshot_store._task is None
+
+def sample_value(name, **labels):
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+@pytest.mark.asyncio
+async def test_request_metrics_cover_errors(typed_pokemon):
+    """Test that validation errors and 404s are timed like successful requests."""
+    before_422 = sample_value(
+        'pokemon_request_duration_seconds_count', endpoint='/api/pokemon/{id}', status='422'
+    )
+    before_404 = sample_value(
+        'pokemon_request_duration_seconds_count', endpoint='/api/pokemon/{id}', status='404'
+    )
+
+    assert client.get("/api/pokemon/not-a-number").status_code == 422
+    assert client.get("/api/pokemon/999").status_code == 404
+    assert client.get("/api/unknown").status_code == 404
+
+    assert sample_value(
+        'pokemon_request_duration_seconds_count', endpoint='/api/pokemon/{id}', status='422'
+    ) == before_422 + 1
+    assert sample_value(
+        'pokemon_request_duration_seconds_count', endpoint='/api/pokemon/{id}', status='404'
+    ) == before_404 + 1
+    assert sample_value('pokemon_requests_total', endpoint='/api/pokemon/{id}', status='422') >= 1
+
+@pytest.mark.asyncio
+async def test_request_metrics_phases_and_queries(typed_pokemon, export_sessions):
+    """Test the per-phase breakdown and the per-request query count."""
+    def phase_count(endpoint, phase):
+        return sample_value('pokemon_request_phase_seconds_count', endpoint=endpoint, phase=phase)
+
+    phases = ('query', 'hydrate', 'serialize', 'encode')
+    before = {phase: phase_count('/api/pokemon', phase) for phase in phases}
+    queries_before = sample_value('pokemon_request_queries_sum', endpoint='/api/pokemon')
+
+    assert client.get("/api/pokemon?after=aWQ6MQ&limit=2").status_code == 200
+
+    for phase in phases:
+        assert phase_count('/api/pokemon', phase) == before[phase] + 1
+    # Data version, the page and the existence check on the other side
+    assert sample_value('pokemon_request_queries_sum', endpoint='/api/pokemon') == queries_before + 3
+
+    export_before = sample_value('pokemon_request_queries_count', endpoint='/api/pokemon/export')
+    assert client.get("/api/pokemon/export").status_code == 200
+    assert sample_value('pokemon_request_queries_count', endpoint='/api/pokemon/export') == export_before + 1
+    assert phase_count('/api/pokemon/export', 'encode') > 0
+
+@pytest.fixture
+async def linked_pokemon(clean_db):
+    """Bulbasaur with stats, two abilities, many moves and its species."""
+    from palmon.database.models import (
+        Ability, Move, PokemonAbility, PokemonMove, PokemonStat, Species
+    )
+
+    clean_db.add_all([
+        Species(id=1, name="bulbasaur", generation="generation-i", is_legendary=False,
+                is_mythical=False, capture_rate=45),
+        Ability(id=65, name="overgrow", effect="Powers up Grass moves in a pinch.", generation="generation-iii"),
+        Ability(id=34, name="chlorophyll", effect="Doubles Speed in sunshine.", generation="generation-iii"),
+        *(Move(id=move_id, name=f"move-{move_id}", type_name="grass", power=40, accuracy=100, pp=25)
+          for move_id in range(1, 21)),
+    ])
+    await clean_db.flush()
+    clean_db.add(Pokemon(id=1, name="bulbasaur", height=0.7, weight=6.9, types="grass,poison",
+                         image_url="test.png", base_experience=64, species_id=1))
+    await clean_db.flush()
+    clean_db.add_all([
+        PokemonStat(pokemon_id=1, stat_name="hp", slot=1, base_stat=45, effort=0),
+        PokemonStat(pokemon_id=1, stat_name="attack", slot=2, base_stat=49, effort=0),
+        PokemonAbility(pokemon_id=1, ability_id=65, slot=1, is_hidden=False),
+        PokemonAbility(pokemon_id=1, ability_id=34, slot=3, is_hidden=True),
+        *(PokemonMove(pokemon_id=1, move_id=move_id, learn_method="level-up", level_learned_at=move_id)
+          for move_id in range(1, 21)),
+    ])
+    await clean_db.commit()
+    clean_db.expunge_all()
+    return clean_db
+
+@pytest.mark.asyncio
+async def test_get_pokemon_include(linked_pokemon):
+    """Test ?include= with eager loading, in a fixed number of queries."""
+    queries_before = sample_value('pokemon_request_queries_sum', endpoint='/api/pokemon/{id}')
+    response = client.get("/api/pokemon/1?include=stats,abilities,moves,species")
+    assert response.status_code == 200
+    # Data version, the Pokemon with its species, then stats, abilities and moves
+    assert sample_value('pokemon_request_queries_sum', endpoint='/api/pokemon/{id}') == queries_before + 5
+
+    body = response.json()
+    data = body["data"]
+    assert data["attributes"]["stats"] == [
+        {"name": "hp", "base_stat": 45, "effort": 0},
+        {"name": "attack", "base_stat": 49, "effort": 0},
+    ]
+    assert data["relationships"]["abilities"]["data"] == [
+        {"type": "ability", "id": "65", "meta": {"slot": 1, "is_hidden": False}},
+        {"type": "ability", "id": "34", "meta": {"slot": 3, "is_hidden": True}},
+    ]
+    assert len(data["relationships"]["moves"]["data"]) == 20
+    assert data["relationships"]["species"]["data"] == {"type": "species", "id": "1"}
+
+    included = {(r["type"], r["id"]): r["attributes"] for r in body["included"]}
+    assert included[("ability", "34")]["name"] == "chlorophyll"
+    assert included[("move", "20")]["power"] == 40
+    assert included[("species", "1")]["capture_rate"] == 45
+    assert len(included) == 23
+
+    data = client.get("/api/pokemon/1?include=stats&fields=name").json()["data"]
+    assert data["attributes"] == {"name": "bulbasaur", "stats": data["attributes"]["stats"]}
+    assert "relationships" not in data
+
+    assert "included" not in client.get("/api/pokemon/1").json()
+
+@pytest.mark.asyncio
+async def test_get_pokemon_include_validation(db_session):
+    """Test that unknown includes are rejected."""
+    response = client.get("/api/pokemon/1?include=evolutions")
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid include")
+
+@pytest.mark.asyncio
+async def test_lifespan_warm_up(typed_pokemon, export_sessions, enable_response_cache):
+    """Test that startup builds the name index and caches the first listing page."""
+    with TestClient(app) as lifespan_client:
+        assert name_index.version == data_version.version
+        assert len(response_cache) == 1
+        assert lifespan_client.get("/api/pokemon").json()["meta"]["page"] == 1
+        assert len(response_cache) == 1
+
+@pytest.mark.asyncio
+async def test_lifespan_warm_up_through_app(
+    typed_pokemon, db_session, export_sessions, enable_response_cache, monkeypatch
+):
+    """Test that warm-up requests go through the app's dependencies, but not into the metrics."""
+    from prometheus_client import REGISTRY
+
+    monkeypatch.setattr("palmon.api.app.warmup_pages", 2)
+    opened = []
+
+    async def counting_db():
+        opened.append(db_session)
+        yield db_session
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, counting_db)
+    samples = [
+        ("pokemon_requests_total", {"endpoint": "/api/pokemon", "status": "200"}),
+        ("pokemon_request_duration_seconds_count", {"endpoint": "/api/pokemon", "status": "200"}),
+        ("pokemon_cache_misses_total", {"cache": "pokemon_list"}),
+        ("starlette_requests_total", {"method": "GET", "path_template": "/api/pokemon"}),
+    ]
+    before = [REGISTRY.get_sample_value(name, labels) or 0 for name, labels in samples]
+
+    with TestClient(app):
+        assert len(opened) == 2
+        assert len(response_cache) == 2
+        assert [REGISTRY.get_sample_value(name, labels) or 0 for name, labels in samples] == before
+
+def test_metrics_aggregate_worker_processes(tmp_path, monkeypatch):
+    """Test that /metrics adds up the samples of every worker in multiprocess mode."""
+    import os
+    import subprocess
+    import sys
+    from palmon.api.server import prepare_metrics_dir
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", "")
+    (tmp_path / "counter_1.db").write_bytes(b"left by an earlier server")
+    prepare_metrics_dir(tmp_path)
+    assert not (tmp_path / "counter_1.db").exists()
+
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", "from prometheus_client import Counter; Counter('palmon_worker', 'Test').inc()"],
+            env=os.environ,
+            check=True
+        )
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "palmon_worker_total 2.0" in response.text
+
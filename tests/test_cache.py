@@ -0,0 +1,61 @@
+import os
+import time
+from palmon.scraper.cache import ResponseCache
+
+def test_response_cache_roundtrip(tmp_path):
+    """Test storing and reading back a compressed response."""
+    cache = ResponseCache(tmp_path)
+    url = "https://pokeapi.co/api/v2/pokemon/1"
+
+    assert cache.get(url) is None
+    cache.put(url, b'{"id": 1}', etag='"abc"')
+
+    entry = cache.get(url)
+    assert entry.body == b'{"id": 1}'
+    assert entry.etag == '"abc"'
+    assert list(cache.urls()) == [url]
+
+def test_response_cache_ttl(tmp_path):
+    """Test that expired entries are only served when stale reads are allowed."""
+    cache = ResponseCache(tmp_path, ttl=0.01)
+    url = "https://pokeapi.co/api/v2/pokemon/1"
+    cache.put(url, b'{}')
+    time.sleep(0.05)
+
+    assert cache.get(url) is None
+    assert cache.get(url, allow_stale=True) is not None
+
+def test_response_cache_refresh(tmp_path):
+    """Test that refreshing an expired entry restarts its TTL and keeps the body."""
+    cache = ResponseCache(tmp_path, ttl=0.05)
+    url = "https://pokeapi.co/api/v2/pokemon/1"
+    assert cache.refresh(url) is False
+
+    cache.put(url, b'{"id": 1}', etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    time.sleep(0.1)
+    assert cache.get(url) is None
+
+    assert cache.refresh(url, etag='"v2"') is True
+    entry = cache.get(url)
+    assert entry.body == b'{"id": 1}'
+    assert entry.etag == '"v2"'
+    assert entry.last_modified == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    """Test size-bounded LRU eviction."""
+    body = os.urandom(2000)  # incompressible, so file size ~ body size
+    cache = ResponseCache(tmp_path, max_bytes=5000)
+    urls = [f"https://pokeapi.co/api/v2/pokemon/{i}" for i in range(3)]
+
+    cache.put(urls[0], body)
+    cache.put(urls[1], body)
+    # Touch the first entry so the second one is the least recently used
+    past = time.time() - 60
+    os.utime(cache._path(cache.key(urls[1])), (past, past))
+    cache.get(urls[0])
+
+    cache.put(urls[2], body)
+
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[0]) is not None
+    assert cache.get(urls[2]) is not None
@@ -7,4 +7,85 @@ async def test_get_db():
     async for db in get_db():
         assert db is not None
         await db.close()
-        break  # We only need to test one iteration 
\ No newline at end of file
+        break  # We only need to test one iteration 
+async def pragma(conn, name):
+    from sqlalchemy.sql import text
+    return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+@pytest.mark.asyncio
+async def test_engine_profile_pragmas(tmp_path):
+    """Test that the tuned profile is applied to writer and reader connections."""
+    from palmon.database.engine import create_sqlite_engine
+
+    path = tmp_path / "tuned.db"
+    writer = create_sqlite_engine(str(path))
+    reader = create_sqlite_engine(str(path), read_only=True)
+    try:
+        async with writer.connect() as conn:
+            assert await pragma(conn, "journal_mode") == "wal"
+            assert await pragma(conn, "synchronous") == 1  # NORMAL
+            assert await pragma(conn, "busy_timeout") == 5000
+            assert await pragma(conn, "cache_size") == -64000
+            assert await pragma(conn, "query_only") == 0
+
+        async with reader.connect() as conn:
+            assert await pragma(conn, "query_only") == 1
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+@pytest.mark.asyncio
+async def test_prewarm_pool(tmp_path):
+    """Test that the whole read pool is connected ahead of use."""
+    from palmon.database.engine import EngineProfile, create_sqlite_engine, prewarm_pool
+
+    reader = create_sqlite_engine(str(tmp_path / "warm.db"), EngineProfile(read_pool_size=3), read_only=True)
+    try:
+        assert await prewarm_pool(reader) == 3
+        assert reader.pool.checkedin() == 3
+    finally:
+        await reader.dispose()
+
+@pytest.mark.asyncio
+async def test_readers_not_blocked_by_writer(tmp_path):
+    """Test that API readers keep working while a write transaction is open."""
+    from sqlalchemy import select, insert
+    from sqlalchemy.exc import OperationalError
+    from palmon.database.engine import create_sqlite_engine
+    from palmon.database.models import Base, Pokemon
+
+    path = tmp_path / "split.db"
+    writer = create_sqlite_engine(str(path))
+    reader = create_sqlite_engine(str(path), read_only=True)
+    try:
+        async with writer.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Pokemon).values(id=1, name="bulbasaur"))
+
+        async with writer.begin() as conn:
+            await conn.execute(insert(Pokemon).values(id=4, name="charmander"))
+
+            # The uncommitted row is invisible, but the read does not wait
+            async with reader.connect() as read_conn:
+                result = await read_conn.execute(select(Pokemon.name))
+                assert result.scalars().all() == ["bulbasaur"]
+
+        async with reader.connect() as read_conn:
+            with pytest.raises(OperationalError):
+                await read_conn.execute(insert(Pokemon).values(id=7, name="squirtle"))
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+def test_engine_profile_from_env(monkeypatch):
+    """Test selecting and overriding the engine profile through the environment."""
+    from palmon.database.engine import EngineProfile
+
+    monkeypatch.setenv("DATABASE_PROFILE", "plain")
+    monkeypatch.setenv("DATABASE_BUSY_TIMEOUT", "250")
+    profile = EngineProfile.from_env()
+    assert profile.pragmas() == ["PRAGMA busy_timeout=250"]
+
+    monkeypatch.setenv("DATABASE_PROFILE", "fast")
+    with pytest.raises(ValueError):
+        EngineProfile.from_env()
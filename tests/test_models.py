@@ -1,5 +1,5 @@
 import pytest
-from palmon.database.models import Pokemon
+from palmon.database.models import Pokemon, PokemonType, pokemon_resource
 from sqlalchemy import select
 from sqlalchemy.sql import text
 
@@ -94,33 +94,146 @@ async def test_pokemon_model_relationships(db_session):
     assert result.first() is None
 
 @pytest.mark.asyncio
-async def test_init_db():
+async def test_init_db(tmp_path, monkeypatch):
     """Test database initialization."""
-    from palmon.database.models import init_db, engine, Base
-    
-    # Drop all tables first
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-    
-    # Test initialization
-    await init_db()
-    
-    # Verify tables were created
-    async with engine.begin() as conn:
-        result = await conn.run_sync(lambda sync_conn: 
-            sync_conn.execute(text("SELECT name FROM sqlite_master WHERE type='table'"))
-        )
-        tables = [row[0] for row in result]
-        assert "pokemon" in tables
+    from palmon.database.engine import create_sqlite_engine
+    from palmon.database.models import init_db
+
+    engine = create_sqlite_engine(str(tmp_path / "init.db"))
+    monkeypatch.setattr("palmon.database.models.engine", engine)
+    try:
+        # Test initialization
+        await init_db()
+
+        # Verify tables were created
+        async with engine.begin() as conn:
+            result = await conn.run_sync(lambda sync_conn:
+                sync_conn.execute(text("SELECT name FROM sqlite_master WHERE type='table'"))
+            )
+            tables = [row[0] for row in result]
+            assert "pokemon" in tables
+    finally:
+        await engine.dispose()
 
 @pytest.mark.asyncio
-async def test_get_db():
+async def test_get_db(tmp_path, monkeypatch):
     """Test database session factory."""
-    from palmon.database.models import get_db
-    
-    async for session in get_db():
-        assert session is not None
-        # Test session can execute queries
-        result = await session.execute(select(Pokemon))
-        assert result is not None
-        break 
\ No newline at end of file
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from palmon.database.engine import create_sqlite_engine
+    from palmon.database.models import get_db, init_db
+
+    engine = create_sqlite_engine(str(tmp_path / "get_db.db"))
+    monkeypatch.setattr("palmon.database.models.engine", engine)
+    monkeypatch.setattr(
+        "palmon.database.models.ReadSessionLocal",
+        sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    try:
+        await init_db()
+        async for session in get_db():
+            assert session is not None
+            # Test session can execute queries
+            result = await session.execute(select(Pokemon))
+            assert result is not None
+            break
+    finally:
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_pokemon_types_follow_model_writes(db_session):
+    """Test that pokemon_types mirrors Pokemon.types on insert, update and delete."""
+    async def types_of(pokemon_id):
+        result = await db_session.execute(
+            select(PokemonType.type_name)
+            .where(PokemonType.pokemon_id == pokemon_id)
+            .order_by(PokemonType.slot)
+        )
+        return result.scalars().all()
+
+    pokemon = Pokemon(id=6, name="charizard", types="fire,flying")
+    db_session.add(pokemon)
+    await db_session.commit()
+    assert await types_of(6) == ["fire", "flying"]
+
+    pokemon.types = "fire,dragon"
+    await db_session.commit()
+    assert await types_of(6) == ["fire", "dragon"]
+
+    await db_session.delete(pokemon)
+    await db_session.commit()
+    assert await types_of(6) == []
+
+@pytest.mark.asyncio
+async def test_init_db_backfills_pokemon_types(tmp_path, monkeypatch):
+    """Test that init_db fills pokemon_types for rows written before it existed."""
+    from palmon.database.engine import create_sqlite_engine
+    from palmon.database.models import init_db, Base
+
+    engine = create_sqlite_engine(str(tmp_path / "backfill.db"))
+    monkeypatch.setattr("palmon.database.models.engine", engine)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(Pokemon.__table__.insert().values(id=4, name="charmander", types="fire"))
+
+        await init_db()
+
+        async with engine.connect() as conn:
+            result = await conn.execute(select(PokemonType.pokemon_id, PokemonType.type_name))
+            assert result.all() == [(4, "fire")]
+    finally:
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_pokemon_resource_from_core_row(db_session, sample_pokemon):
+    """Test that Core rows serialize exactly like ORM objects."""
+    from palmon.api.queries import select_pokemon
+
+    result = await db_session.execute(select_pokemon().where(Pokemon.id == 1))
+    assert pokemon_resource(result.one()) == sample_pokemon.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_deleting_pokemon_removes_links(db_session):
+    """Test that stats, ability and move links go with their Pokemon."""
+    from palmon.database.models import Ability, PokemonAbility, PokemonStat
+
+    db_session.add(Ability(id=65, name="overgrow"))
+    pokemon = Pokemon(id=3000, name="test_links", types="grass")
+    db_session.add(pokemon)
+    await db_session.flush()
+    db_session.add_all([
+        PokemonStat(pokemon_id=3000, stat_name="hp", slot=1, base_stat=45, effort=0),
+        PokemonAbility(pokemon_id=3000, ability_id=65, slot=1, is_hidden=False),
+    ])
+    await db_session.commit()
+
+    await db_session.delete(pokemon)
+    await db_session.commit()
+
+    assert (await db_session.execute(select(PokemonStat))).first() is None
+    assert (await db_session.execute(select(PokemonAbility))).first() is None
+    # Shared entities stay for the other Pokemon that link to them
+    assert (await db_session.execute(select(Ability.name))).scalar_one() == "overgrow"
+
+@pytest.mark.asyncio
+async def test_create_schema_adds_new_columns():
+    """Test that tables created before a column existed get it on startup."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from palmon.database.models import _create_schema
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE pokemon (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, height FLOAT, "
+            "weight FLOAT, types VARCHAR, image_url VARCHAR, base_experience INTEGER)"
+        ))
+        await conn.execute(text("INSERT INTO pokemon (id, name, types) VALUES (1, 'bulbasaur', 'grass')"))
+        await conn.run_sync(_create_schema)
+
+        result = await conn.execute(select(Pokemon.id, Pokemon.species_id))
+        assert result.all() == [(1, None)]
+        result = await conn.execute(text("SELECT name FROM sqlite_master WHERE name = 'ix_pokemon_species_id'"))
+        assert result.scalar_one() == "ix_pokemon_species_id"
+    await engine.dispose()
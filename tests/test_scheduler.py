@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from palmon.scraper.scheduler import FetchScheduler, PRIORITY_POKEMON, PRIORITY_RESOURCE
+
+@pytest.mark.asyncio
+async def test_scheduler_single_flight():
+    """Test that concurrent requests for one URL share a single fetch, and fetched URLs are not sent again."""
+    calls = []
+    release = asyncio.Event()
+
+    async def fetch(url, state):
+        calls.append(url)
+        await release.wait()
+        return f"body of {url}"
+
+    async with FetchScheduler(fetch, workers=4) as scheduler:
+        waiters = [asyncio.create_task(scheduler.fetch("/ability/65/")) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert scheduler.seen("/ability/65/")
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert results == ["body of /ability/65/"] * 3
+        assert await scheduler.fetch("/ability/65/") is None
+
+    assert calls == ["/ability/65/"]
+    assert scheduler.requests == 1
+    assert scheduler.deduplicated == 3
+
+@pytest.mark.asyncio
+async def test_scheduler_fetches_by_priority():
+    """Test that queued Pokemon are sent before shared resources submitted earlier."""
+    order = []
+
+    async def fetch(url, state):
+        order.append((url, state))
+
+    scheduler = FetchScheduler(fetch, workers=1)
+    futures = [
+        scheduler.submit("/move/14/", PRIORITY_RESOURCE),
+        scheduler.submit("/move/15/", PRIORITY_RESOURCE),
+        scheduler.submit("/pokemon/1", PRIORITY_POKEMON, {"etag": '"1"'}),
+    ]
+    async with scheduler:
+        await asyncio.gather(*futures)
+
+    assert order == [("/pokemon/1", {"etag": '"1"'}), ("/move/14/", None), ("/move/15/", None)]
+
+@pytest.mark.asyncio
+async def test_scheduler_propagates_errors():
+    """Test that a failing fetch reaches every waiter and marks the URL as done."""
+    async def fetch(url, state):
+        raise RuntimeError("database is locked")
+
+    async with FetchScheduler(fetch) as scheduler:
+        first = scheduler.submit("/pokemon/1")
+        second = scheduler.submit("/pokemon/1")
+        assert first is second
+        with pytest.raises(RuntimeError):
+            await first
+
+    assert scheduler.seen("/pokemon/1")
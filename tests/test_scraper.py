@@ -3,7 +3,7 @@ from palmon.scraper.pokemon_scraper import PokemonScraper
 from palmon.database.models import Pokemon, init_db, AsyncSessionLocal
 import httpx
 import respx
-from sqlalchemy import select
+from sqlalchemy import select, delete
 
 @pytest.fixture
 async def test_db():
@@ -133,13 +133,595 @@ async def test_scrape_pokemon_update_existing(mock_response, db_session):
     assert pokemon.name == "bulbasaur"
     assert pokemon.types == "grass,poison"
 
+    # The normalized type rows follow the upsert
+    from palmon.database.models import PokemonType
+    result = await db_session.execute(
+        select(PokemonType.type_name).where(PokemonType.pokemon_id == 1).order_by(PokemonType.slot)
+    )
+    assert result.scalars().all() == ["grass", "poison"]
+
 @pytest.mark.asyncio
-async def test_scraper_session_creation():
+async def test_scraper_session_creation(tmp_path, monkeypatch):
     """Test scraper session creation when no session is provided."""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from palmon.database.engine import create_sqlite_engine
+
+    engine = create_sqlite_engine(str(tmp_path / "scraper.db"))
+    monkeypatch.setattr("palmon.database.models.engine", engine)
+    monkeypatch.setattr(
+        "palmon.scraper.pokemon_scraper.AsyncSessionLocal",
+        sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    try:
+        await init_db()
+        scraper = PokemonScraper()
+        session = await scraper.session
+        assert session is not None
+
+        # Test session can execute queries
+        result = await session.execute(select(Pokemon))
+        assert result is not None
+        await session.close()
+    finally:
+        await engine.dispose()
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_batches_rows(mock_response, db_session):
+    """Test that scraped rows are upserted in batches."""
+    for pokemon_id in range(1, 6):
+        payload = dict(mock_response, id=pokemon_id, name=f"pokemon-{pokemon_id}")
+        respx.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}").mock(
+            return_value=httpx.Response(200, json=payload)
+        )
+
+    scraper = PokemonScraper(session=db_session)
+    stats = await scraper.scrape_pokemon(limit=5, concurrency=2, batch_size=2)
+
+    assert stats.rows_written == 5
+    assert stats.batches == 3
+    assert stats.rows_per_second > 0
+
+    result = await db_session.execute(select(Pokemon).order_by(Pokemon.id))
+    assert [p.name for p in result.scalars()] == [f"pokemon-{i}" for i in range(1, 6)]
+
+    # Every committed batch bumps the data version the API caches key on
+    from palmon.database.models import DataVersion
+    result = await db_session.execute(select(DataVersion.version))
+    assert result.scalar_one() == 3
+
+@pytest.mark.asyncio
+async def test_batch_writer_flushes_on_interval(db_session):
+    """Test that a partial batch is written once the flush interval passes."""
+    import asyncio
+    from palmon.scraper.stats import ScrapeStats
+    from palmon.scraper.writer import BatchWriter, WriteItem
+
+    stats = ScrapeStats()
+    writer = BatchWriter(db_session, stats, batch_size=100, flush_interval=0.05)
+    queue = asyncio.Queue()
+    task = asyncio.create_task(writer.run(queue))
+
+    await queue.put(WriteItem(row={
+        "id": 25, "name": "pikachu", "height": 0.4, "weight": 6.0,
+        "types": "electric", "image_url": None, "base_experience": 112
+    }))
+    await asyncio.sleep(0.2)
+    assert stats.batches == 1
+
+    await queue.put(None)
+    await task
+    assert stats.rows_written == 1
+
+@pytest.mark.asyncio
+async def test_batch_writer_splits_large_batches(db_session):
+    """Test that a batch with more values than SQLite binds per statement is still written."""
+    from sqlalchemy import func
+    from palmon.database.models import PokemonType
+    from palmon.scraper.stats import ScrapeStats
+    from palmon.scraper.writer import BatchWriter, WriteItem, upsert_statements
+
+    rows = [
+        {
+            "id": pokemon_id, "name": f"pokemon-{pokemon_id}", "height": 0.4, "weight": 6.0,
+            "types": "electric,steel", "image_url": None, "base_experience": 112
+        }
+        for pokemon_id in range(1, 5001)
+    ]
+    # 35000 bind parameters, above SQLITE_MAX_VARIABLE_NUMBER
+    assert len(list(upsert_statements(Pokemon, rows))) > 1
+
+    stats = ScrapeStats()
+    await BatchWriter(db_session, stats, batch_size=len(rows)).flush([WriteItem(row=row) for row in rows])
+
+    assert stats.rows_written == 5000
+    assert (await db_session.execute(select(func.count()).select_from(Pokemon))).scalar_one() == 5000
+    assert (await db_session.execute(select(func.count()).select_from(PokemonType))).scalar_one() == 10000
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_fetch_pokemon_throttled_backs_off(mock_response):
+    """Test that a 429 with Retry-After lowers the concurrency limit."""
+    from palmon.scraper.retry import RetryPolicy
+
+    scraper = PokemonScraper(retry=RetryPolicy(max_retries=0))
+    scraper.limiter.limit = 10
+
+    respx.get("https://pokeapi.co/api/v2/pokemon/1").mock(
+        return_value=httpx.Response(429, headers={"Retry-After": "0"})
+    )
+
+    async with scraper.create_client() as client:
+        data = await scraper.fetch_pokemon(client, 1)
+
+    assert data is None
+    assert scraper.limiter.limit == 5
+
+def test_limiter_shared_per_host():
+    """Test that every resource kind on a host shares one limiter."""
     scraper = PokemonScraper()
-    session = await scraper.session
-    assert session is not None
-    
-    # Test session can execute queries
-    result = await session.execute(select(Pokemon))
-    assert result is not None
\ No newline at end of file
+
+    assert scraper.limiter_for("https://pokeapi.co/api/v2/pokemon/1") is scraper.limiter
+    assert scraper.limiter_for("https://pokeapi.co/api/v2/move/15/") is scraper.limiter
+    sprites = scraper.limiter_for("https://raw.githubusercontent.com/PokeAPI/sprites/1.png")
+    assert sprites is not scraper.limiter
+    assert scraper.limiter_for("https://raw.githubusercontent.com/PokeAPI/sprites/2.png") is sprites
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_conditional_rescrape(mock_response, db_session):
+    """Test that unchanged Pokemon are skipped on the next run."""
+    url = "https://pokeapi.co/api/v2/pokemon/1"
+    route = respx.get(url).mock(
+        return_value=httpx.Response(200, json=mock_response, headers={"ETag": '"v1"'})
+    )
+
+    scraper = PokemonScraper(session=db_session)
+    stats = await scraper.scrape_pokemon(limit=1)
+    assert (stats.new, stats.updated, stats.skipped) == (1, 0, 0)
+
+    # Second run sends the stored validator and gets a 304 back
+    route.mock(return_value=httpx.Response(304))
+    stats = await scraper.scrape_pokemon(limit=1)
+    assert route.calls.last.request.headers["If-None-Match"] == '"v1"'
+    assert (stats.new, stats.updated, stats.skipped) == (0, 0, 1)
+    assert stats.rows_written == 0
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_skips_unchanged_payload(mock_response, db_session):
+    """Test that a 200 with an identical payload does not rewrite the row."""
+    respx.get("https://pokeapi.co/api/v2/pokemon/1").mock(
+        return_value=httpx.Response(200, json=mock_response)
+    )
+
+    scraper = PokemonScraper(session=db_session)
+    await scraper.scrape_pokemon(limit=1)
+    stats = await scraper.scrape_pokemon(limit=1)
+    assert stats.skipped == 1
+    assert stats.rows_written == 0
+
+    respx.get("https://pokeapi.co/api/v2/pokemon/1").mock(
+        return_value=httpx.Response(200, json=dict(mock_response, base_experience=65))
+    )
+    stats = await scraper.scrape_pokemon(limit=1)
+    assert stats.updated == 1
+    assert stats.rows_written == 1
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_collects_failures(mock_response, db_session):
+    """Test that a failing ID is recorded without aborting the run."""
+    respx.get("https://pokeapi.co/api/v2/pokemon/1").mock(
+        return_value=httpx.Response(200, json=mock_response)
+    )
+    respx.get("https://pokeapi.co/api/v2/pokemon/2").mock(
+        return_value=httpx.Response(404)
+    )
+    respx.get("https://pokeapi.co/api/v2/pokemon/3").mock(
+        return_value=httpx.Response(200, json={"id": 3})
+    )
+
+    scraper = PokemonScraper(session=db_session)
+    stats = await scraper.scrape_pokemon(ids=[1, 2, 3])
+
+    assert stats.new == 1
+    assert set(stats.failures) == {2, 3}
+
+    result = await db_session.execute(select(Pokemon))
+    assert [p.name for p in result.scalars()] == ["bulbasaur"]
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_from_listing(mock_response, db_session):
+    """Test walking the paginated listing, including form variants."""
+    from palmon.scraper.sources import PokemonListing
+
+    base = "https://pokeapi.co/api/v2"
+    respx.get(f"{base}/pokemon", params={"offset": "0"}).mock(
+        return_value=httpx.Response(200, json={
+            "results": [{"url": f"{base}/pokemon/1/"}],
+            "next": f"{base}/pokemon?offset=1&limit=1"
+        })
+    )
+    respx.get(f"{base}/pokemon", params={"offset": "1"}).mock(
+        return_value=httpx.Response(200, json={
+            "results": [{"url": f"{base}/pokemon/10001/"}],
+            "next": None
+        })
+    )
+    for pokemon_id in (1, 10001):
+        respx.get(f"{base}/pokemon/{pokemon_id}").mock(
+            return_value=httpx.Response(
+                200, json=dict(mock_response, id=pokemon_id, name=f"form-{pokemon_id}")
+            )
+        )
+
+    scraper = PokemonScraper(session=db_session)
+    stats = await scraper.scrape_pokemon(ids=PokemonListing(page_size=1))
+
+    assert stats.new == 2
+    result = await db_session.execute(select(Pokemon.id).order_by(Pokemon.id))
+    assert list(result.scalars()) == [1, 10001]
+
+def test_parse_id_spec():
+    """Test expanding ID specs with ranges and single IDs."""
+    from palmon.scraper.sources import parse_id_spec
+
+    assert list(parse_id_spec("1-3, 7,10001-10002")) == [1, 2, 3, 7, 10001, 10002]
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_resume(mock_response, db_session):
+    """Test that a resumed run only fetches IDs that are missing or failed."""
+    from palmon.database.models import ScrapeCheckpoint
+
+    for pokemon_id in (1, 3):
+        respx.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}").mock(
+            return_value=httpx.Response(
+                200, json=dict(mock_response, id=pokemon_id, name=f"pokemon-{pokemon_id}")
+            )
+        )
+    route = respx.get("https://pokeapi.co/api/v2/pokemon/2").mock(
+        return_value=httpx.Response(404)
+    )
+
+    scraper = PokemonScraper(session=db_session)
+    stats = await scraper.scrape_pokemon(limit=3)
+    assert set(stats.failures) == {2}
+
+    result = await db_session.execute(
+        select(ScrapeCheckpoint.pokemon_id, ScrapeCheckpoint.status).order_by(ScrapeCheckpoint.pokemon_id)
+    )
+    assert result.all() == [(1, "done"), (2, "failed"), (3, "done")]
+
+    route.mock(return_value=httpx.Response(
+        200, json=dict(mock_response, id=2, name="pokemon-2")
+    ))
+    stats = await scraper.scrape_pokemon(limit=3, resume=True)
+
+    assert stats.resumed == 2
+    assert stats.new == 1
+    assert not stats.failures
+    assert respx.calls.call_count == 4
+
+    # A fresh run resets the journal and scrapes everything again
+    stats = await scraper.scrape_pokemon(limit=3)
+    assert stats.resumed == 0
+    assert stats.skipped == 3
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_fetch_pokemon_retries_transient_errors(mock_response):
+    """Test that 5xx responses and Retry-After are retried until success."""
+    from palmon.scraper.retry import RetryPolicy
+
+    scraper = PokemonScraper(retry=RetryPolicy(max_retries=3, base_delay=0.01))
+
+    respx.get("https://pokeapi.co/api/v2/pokemon/1").mock(side_effect=[
+        httpx.Response(503),
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json=mock_response)
+    ])
+
+    async with scraper.create_client() as client:
+        data = await scraper.fetch_pokemon(client, 1)
+
+    assert data["name"] == "bulbasaur"
+    assert scraper.stats.retries == 2
+    assert scraper.stats.throttled == 1
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_circuit_breaker_pauses_fetches():
+    """Test that the breaker opens on repeated failures and blocks requests."""
+    import asyncio
+    from palmon.scraper.retry import RetryPolicy, CircuitBreaker
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    scraper = PokemonScraper(retry=RetryPolicy(max_retries=1, base_delay=0), breaker=breaker)
+
+    route = respx.get("https://pokeapi.co/api/v2/pokemon/1").mock(
+        side_effect=httpx.ConnectError("Connection refused")
+    )
+
+    async with scraper.create_client() as client:
+        assert await scraper.fetch_pokemon(client, 1) is None
+        assert breaker.state == CircuitBreaker.OPEN
+        assert scraper.stats.breaker_opened == 1
+
+        # While open, nothing reaches upstream
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scraper.fetch_pokemon(client, 1), 0.1)
+    assert route.call_count == 2
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_half_open_probe():
+    """Test that a successful probe closes the breaker."""
+    from palmon.scraper.retry import CircuitBreaker
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    await breaker.wait()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_circuit_breaker_cancelled_probe():
+    """Test that a probe cancelled mid-request lets the next request probe."""
+    import asyncio
+    from palmon.scraper.retry import CircuitBreaker
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    scraper = PokemonScraper(breaker=breaker)
+    breaker.record_failure()
+
+    started = asyncio.Event()
+
+    async def hang(request):
+        started.set()
+        await asyncio.sleep(60)
+
+    respx.get("https://pokeapi.co/api/v2/pokemon/1").mock(side_effect=hang)
+    respx.get("https://pokeapi.co/api/v2/pokemon/2").mock(
+        return_value=httpx.Response(200, json={"id": 2})
+    )
+
+    async with scraper.create_client() as client:
+        probe = asyncio.create_task(scraper.fetch_pokemon(client, 1))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        await asyncio.wait_for(scraper.fetch_pokemon(client, 2), 1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_replay_from_cache(mock_response, db_session, tmp_path):
+    """Test that cached responses can rebuild the database offline."""
+    from palmon.scraper.cache import ResponseCache
+    from palmon.scraper.sources import CachedPokemon
+
+    cache = ResponseCache(tmp_path)
+    route = respx.get("https://pokeapi.co/api/v2/pokemon/1").mock(
+        return_value=httpx.Response(200, json=mock_response)
+    )
+
+    await PokemonScraper(session=db_session, cache=cache).scrape_pokemon(limit=1)
+    assert route.call_count == 1
+
+    await db_session.execute(delete(Pokemon))
+    await db_session.commit()
+
+    scraper = PokemonScraper(session=db_session, cache=cache, offline=True)
+    stats = await scraper.scrape_pokemon(ids=CachedPokemon(cache), force=True)
+
+    assert route.call_count == 1
+    assert stats.cache_hits == 1
+    assert stats.new == 1
+    result = await db_session.execute(select(Pokemon))
+    assert result.scalar_one().name == "bulbasaur"
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_revalidation_refreshes_cache(mock_response, db_session, tmp_path):
+    """Test that a 304 for an expired cache entry makes it fresh again."""
+    import asyncio
+    from palmon.scraper.cache import ResponseCache
+
+    url = "https://pokeapi.co/api/v2/pokemon/1"
+    cache = ResponseCache(tmp_path, ttl=0.2)
+    route = respx.get(url).mock(
+        return_value=httpx.Response(200, json=mock_response, headers={"ETag": '"v1"'})
+    )
+    scraper = PokemonScraper(session=db_session, cache=cache)
+    await scraper.scrape_pokemon(limit=1)
+
+    await asyncio.sleep(0.3)
+    assert cache.get(url) is None
+    route.mock(return_value=httpx.Response(304, headers={"ETag": '"v2"'}))
+    await scraper.scrape_pokemon(limit=1)
+    assert route.call_count == 2
+    assert cache.get(url).etag == '"v2"'
+
+    # Fresh again, so the next run is served from the cache
+    stats = await scraper.scrape_pokemon(limit=1)
+    assert route.call_count == 2
+    assert stats.cache_hits == 1
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_fills_empty_cache(mock_response, db_session, tmp_path):
+    """Test that a cache added to an existing database is filled instead of revalidated."""
+    from palmon.scraper.cache import ResponseCache
+    from palmon.scraper.sources import CachedPokemon
+
+    def upstream(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=mock_response, headers={"ETag": '"v1"'})
+
+    url = "https://pokeapi.co/api/v2/pokemon/1"
+    route = respx.get(url).mock(side_effect=upstream)
+    await PokemonScraper(session=db_session).scrape_pokemon(limit=1)
+
+    # fetch_state holds validators, but the new cache has no body for them
+    cache = ResponseCache(tmp_path)
+    stats = await PokemonScraper(session=db_session, cache=cache).scrape_pokemon(limit=1)
+    assert "If-None-Match" not in route.calls.last.request.headers
+    assert stats.skipped == 1
+    assert cache.get(url) is not None
+
+    scraper = PokemonScraper(session=db_session, cache=cache, offline=True)
+    stats = await scraper.scrape_pokemon(ids=CachedPokemon(cache), force=True)
+    assert stats.cache_hits == 1
+    assert not stats.failures
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_in_processes(mock_response, db_session, tmp_path):
+    """Test that shard processes fetch and parse while this process writes every row."""
+    from palmon.scraper.cache import ResponseCache
+
+    cache = ResponseCache(tmp_path)
+    for pokemon_id in (1, 2, 3):
+        respx.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}").mock(
+            return_value=httpx.Response(200, json=dict(mock_response, id=pokemon_id, name=f"pokemon-{pokemon_id}"))
+        )
+    await PokemonScraper(session=db_session, cache=cache).scrape_pokemon(limit=3, resolve=())
+    await db_session.execute(delete(Pokemon))
+    await db_session.commit()
+
+    # respx does not reach other processes, so they replay the cache
+    scraper = PokemonScraper(session=db_session, cache=cache, offline=True)
+    stats = await scraper.scrape_pokemon(ids=[1, 2, 3, 2], force=True, resolve=(), processes=2)
+
+    assert stats.new == 3
+    assert stats.cache_hits == 3
+    assert stats.deduplicated == 1
+    assert stats.rows_written == 3
+    result = await db_session.execute(select(Pokemon.name).order_by(Pokemon.id))
+    assert list(result.scalars()) == ["pokemon-1", "pokemon-2", "pokemon-3"]
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_scrape_pokemon_links_and_shared_resources(mock_response, db_session):
+    """Test that stats, abilities, moves and species are stored, fetching each shared one once."""
+    from palmon.database.models import Ability, Move, PokemonAbility, PokemonMove, PokemonStat, Species
+
+    base = "https://pokeapi.co/api/v2"
+
+    def payload(pokemon_id, move_ids):
+        return dict(
+            mock_response,
+            id=pokemon_id,
+            name=f"pokemon-{pokemon_id}",
+            stats=[
+                {"base_stat": 45, "effort": 0, "stat": {"name": "hp", "url": f"{base}/stat/1/"}},
+                {"base_stat": 49, "effort": 1, "stat": {"name": "attack", "url": f"{base}/stat/2/"}},
+            ],
+            abilities=[
+                {"ability": {"name": "overgrow", "url": f"{base}/ability/65/"}, "is_hidden": False, "slot": 1},
+                {"ability": {"name": "chlorophyll", "url": f"{base}/ability/34/"}, "is_hidden": True, "slot": 3},
+            ],
+            moves=[
+                {
+                    "move": {"name": f"move-{move_id}", "url": f"{base}/move/{move_id}/"},
+                    "version_group_details": [
+                        {"level_learned_at": 1, "move_learn_method": {"name": "egg"}},
+                        {"level_learned_at": 7, "move_learn_method": {"name": "level-up"}},
+                    ]
+                }
+                for move_id in move_ids
+            ],
+            species={"name": "bulbasaur", "url": f"{base}/pokemon-species/1/"}
+        )
+
+    respx.get(f"{base}/pokemon/1").mock(return_value=httpx.Response(200, json=payload(1, [14, 15])))
+    respx.get(f"{base}/pokemon/2").mock(return_value=httpx.Response(200, json=payload(2, [15])))
+    shared = {
+        f"{base}/ability/65/": {
+            "id": 65, "name": "overgrow", "generation": {"name": "generation-iii"},
+            "effect_entries": [{"short_effect": "Powers up Grass moves.", "language": {"name": "en"}}]
+        },
+        f"{base}/move/14/": {
+            "id": 14, "name": "swords-dance", "type": {"name": "normal"},
+            "damage_class": {"name": "status"}, "power": None, "accuracy": None, "pp": 20
+        },
+        f"{base}/move/15/": {
+            "id": 15, "name": "cut", "type": {"name": "normal"},
+            "damage_class": {"name": "physical"}, "power": 50, "accuracy": 95, "pp": 30
+        },
+        f"{base}/pokemon-species/1/": {
+            "id": 1, "name": "bulbasaur", "generation": {"name": "generation-i"},
+            "is_legendary": False, "is_mythical": False, "capture_rate": 45
+        },
+    }
+    routes = {url: respx.get(url).mock(return_value=httpx.Response(200, json=body)) for url, body in shared.items()}
+    # Upstream failure: the ability keeps the name from the Pokemon payload
+    routes["chlorophyll"] = respx.get(f"{base}/ability/34/").mock(return_value=httpx.Response(404))
+
+    scraper = PokemonScraper(session=db_session)
+    stats = await scraper.scrape_pokemon(ids=[1, 2])
+
+    assert stats.new == 2
+    assert stats.resolved == 4
+    assert all(route.call_count == 1 for route in routes.values())
+    # Two Pokemon and five shared resources; Pokemon 2's four references were already queued
+    assert stats.requests == 7
+    assert stats.deduplicated == 4
+
+    result = await db_session.execute(select(Pokemon.species_id).order_by(Pokemon.id))
+    assert list(result.scalars()) == [1, 1]
+    result = await db_session.execute(
+        select(PokemonStat.stat_name, PokemonStat.base_stat, PokemonStat.effort)
+        .where(PokemonStat.pokemon_id == 1).order_by(PokemonStat.slot)
+    )
+    assert result.all() == [("hp", 45, 0), ("attack", 49, 1)]
+    result = await db_session.execute(
+        select(PokemonAbility.ability_id, PokemonAbility.is_hidden)
+        .where(PokemonAbility.pokemon_id == 2).order_by(PokemonAbility.slot)
+    )
+    assert result.all() == [(65, False), (34, True)]
+    result = await db_session.execute(
+        select(PokemonMove.pokemon_id, PokemonMove.move_id, PokemonMove.learn_method, PokemonMove.level_learned_at)
+        .order_by(PokemonMove.pokemon_id, PokemonMove.move_id)
+    )
+    assert result.all() == [(1, 14, "level-up", 7), (1, 15, "level-up", 7), (2, 15, "level-up", 7)]
+
+    result = await db_session.execute(select(Ability.id, Ability.name, Ability.effect).order_by(Ability.id))
+    assert result.all() == [(34, "chlorophyll", None), (65, "overgrow", "Powers up Grass moves.")]
+    result = await db_session.execute(select(Move.name, Move.power).order_by(Move.id))
+    assert result.all() == [("swords-dance", None), ("cut", 50)]
+    assert (await db_session.execute(select(Species.capture_rate))).scalar_one() == 45
+
+    # Changed Pokemon get their links rewritten, but shared resources
+    # stored by an earlier run are not fetched again; failed ones are retried
+    respx.get(f"{base}/pokemon/1").mock(return_value=httpx.Response(200, json=payload(1, [15])))
+    stats = await scraper.scrape_pokemon(ids=[1, 2])
+    assert stats.updated == 1
+    assert routes[f"{base}/ability/65/"].call_count == 1
+    assert routes["chlorophyll"].call_count == 2
+    assert stats.failures == {f"{base}/ability/34/": "resolve failed"}
+    result = await db_session.execute(select(PokemonMove.move_id).where(PokemonMove.pokemon_id == 1))
+    assert list(result.scalars()) == [15]
+
+    # Unchanged Pokemon do not queue their refs, but the stub is still retried
+    routes["chlorophyll"].mock(return_value=httpx.Response(200, json={
+        "id": 34, "name": "chlorophyll", "generation": {"name": "generation-iii"}, "effect_entries": []
+    }))
+    stats = await scraper.scrape_pokemon(ids=[1, 2])
+    assert stats.skipped == 2
+    assert stats.resolved == 1
+    assert not stats.failures
+    assert routes[f"{base}/ability/65/"].call_count == 1
+    result = await db_session.execute(select(Ability.generation).where(Ability.id == 34))
+    assert result.scalar_one() == "generation-iii"
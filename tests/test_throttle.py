@@ -0,0 +1,46 @@
+import pytest
+from palmon.scraper.throttle import AdaptiveLimiter, parse_retry_after
+
+@pytest.mark.asyncio
+async def test_limiter_increases_on_healthy_window():
+    """Test additive increase after a full window of fast successes."""
+    limiter = AdaptiveLimiter(initial=2, maximum=5)
+
+    for _ in range(2):
+        async with limiter.slot() as slot:
+            limiter.record(slot, 200)
+
+    assert limiter.limit == 3
+
+@pytest.mark.asyncio
+async def test_limiter_backs_off_once_per_window():
+    """Test multiplicative decrease on throttling, once per burst."""
+    limiter = AdaptiveLimiter(initial=8)
+
+    async with limiter.slot() as first:
+        async with limiter.slot() as second:
+            limiter.record(first, 429)
+            limiter.record(second, 503)
+
+    assert limiter.limit == 4
+
+    async with limiter.slot() as slot:
+        limiter.record(slot, None)
+    assert limiter.limit == 2
+
+@pytest.mark.asyncio
+async def test_limiter_respects_bounds():
+    """Test the limit never leaves [minimum, maximum]."""
+    limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=1)
+
+    for status in (200, 200, 500):
+        async with limiter.slot() as slot:
+            limiter.record(slot, status)
+        assert limiter.limit == 1
+
+def test_parse_retry_after():
+    """Test Retry-After parsing for seconds, dates and junk."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0